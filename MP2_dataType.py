@@ -1,18 +1,22 @@
-from typing import TypeVar, Generic
+import random
+from collections import deque
+from typing import TypeVar, Generic, Iterable, Callable
 
 # 定义泛型类型T
 T = TypeVar('T')
 
 class Queue(Generic[T]):
-    """基础队列实现"""
+    """基础队列实现(基于deque, 两端操作均为O(1))"""
+
+    __slots__ = ("items",)
     
-    def __init__(self, items: list[T] | None = None):
+    def __init__(self, items: Iterable[T] | None = None):
         """初始化队列
         
         Args:
             items: 初始元素列表，默认为空
         """
-        self.items = items or []
+        self.items: deque[T] = deque(items or ())
 
     def __getindex__(self, index: int) -> T:
         """获取指定索引的元素
@@ -31,7 +35,7 @@ class Queue(Generic[T]):
         Returns:
             bool: 如果队列为空返回True，否则False
         """
-        return self.items == []
+        return not self.items
     
     def put(self, item: T) -> None:
         """向队列尾部添加元素
@@ -53,7 +57,7 @@ class Queue(Generic[T]):
         if self.is_empty():
             raise IndexError("Queue is empty")
         else:
-            return self.items.pop(0)
+            return self.items.popleft()
 
     def front(self) -> T:
         """查看但不移除队列头部元素
@@ -104,8 +108,20 @@ class Queue(Generic[T]):
         """
         self.items.remove(item)
 
+    def copy(self) -> "Queue[T]":
+        """浅复制队列(元素本身不复制), 保留子类类型和容量
+        
+        Returns:
+            新的队列
+        """
+        new = self.__class__.__new__(self.__class__)
+        new.items = self.items.copy()
+        return new
+
 class RepeatQueue(Queue[T]):
     """可重复使用的队列，peek操作不会移除元素"""
+
+    __slots__ = ()
     
     def peek(self) -> T:
         """查看但不移除队列头部元素，并将其添加到队列尾部
@@ -119,11 +135,26 @@ class RepeatQueue(Queue[T]):
         if self.is_empty():
             raise IndexError("Queue is empty")
         else:
-            self.put(self.items[0])  # 将头部元素添加到尾部
-            return self.items.pop(0)  # 移除并返回头部元素
+            self.items.rotate(-1)  # 将头部元素移动到尾部
+            return self.items[-1]
+
+    def pop_last(self) -> T:
+        """移除并返回队列尾部元素(O(1)), 即刚由peek取出的元素
+
+        Returns:
+            队列尾部元素
+
+        Raises:
+            IndexError: 如果队列为空
+        """
+        if self.is_empty():
+            raise IndexError("Queue is empty")
+        return self.items.pop()
 
 class Stack(Queue[T]):
     """栈实现"""
+
+    __slots__ = ()
     
     def peek(self) -> T:
         """查看但不移除栈顶元素
@@ -145,7 +176,7 @@ class Stack(Queue[T]):
         Returns:
             栈的字符串表示
         """
-        return str(self.items)
+        return str(list(self.items))
 
     def push(self, item: T) -> None:
         """向栈顶添加元素
@@ -191,7 +222,7 @@ class Stack(Queue[T]):
         Returns:
             bool: 如果栈为空返回True，否则False
         """
-        return self.items == []
+        return not self.items
 
     def __bool__(self) -> bool:
         """检查栈是否为空
@@ -201,6 +232,321 @@ class Stack(Queue[T]):
         """
         return not self.is_empty()
 
+class RingBuffer(Queue[T]):
+    """有界环形缓冲队列, 已满时加入新元素会丢弃最早的元素"""
+
+    __slots__ = ()
+
+    def __init__(self, capacity: int, items: Iterable[T] | None = None):
+        """初始化环形缓冲队列
+
+        Args:
+            capacity: 最大容量
+            items: 初始元素列表，默认为空
+
+        Raises:
+            ValueError: 如果容量不是正数
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.items: deque[T] = deque(items or (), maxlen=capacity)
+
+    @property
+    def capacity(self) -> int:
+        """获取最大容量
+
+        Returns:
+            最大容量
+        """
+        return self.items.maxlen
+
+    def is_full(self) -> bool:
+        """检查队列是否已满
+
+        Returns:
+            bool: 如果队列已满返回True，否则False
+        """
+        return len(self.items) == self.items.maxlen
+
+    def rotate(self, steps: int = 1) -> None:
+        """将头部的steps个元素依次移动到尾部(O(1)每步)
+
+        Args:
+            steps: 移动的元素数量
+        """
+        self.items.rotate(-steps)
+
+class FenwickTree:
+    """树状数组(Fenwick树), 支持O(log n)的单点修改、前缀和查询以及按累计值查找下标"""
+
+    def __init__(self, values: list[int] | None = None):
+        """初始化树状数组
+
+        Args:
+            values: 初始值列表，默认为空
+        """
+        self.values: list[int] = list(values or [])
+        # 下标从1开始, 每个节点把自己的和加到父节点, O(n)建树
+        tree = [0, *self.values]
+        size = len(tree)
+        for i in range(1, size):
+            parent = i + (i & -i)
+            if parent < size:
+                tree[parent] += tree[i]
+        self.tree: list[int] = tree
+        self.total: int = sum(self.values)
+
+    def __len__(self) -> int:
+        """获取元素数量
+
+        Returns:
+            元素的数量
+        """
+        return len(self.values)
+
+    def __getitem__(self, index: int) -> int:
+        """获取指定下标的值
+
+        Args:
+            index: 元素下标(从0开始)
+
+        Returns:
+            指定下标的值
+        """
+        return self.values[index]
+
+    def copy(self) -> "FenwickTree":
+        """复制树状数组
+
+        Returns:
+            新的树状数组
+        """
+        new = FenwickTree.__new__(FenwickTree)
+        new.values = self.values.copy()
+        new.tree = self.tree.copy()
+        new.total = self.total
+        return new
+
+    def append(self, value: int) -> None:
+        """在末尾追加一个元素
+
+        Args:
+            value: 要追加的值
+        """
+        i = len(self.tree)
+        # 新节点管辖区间为(i - lowbit(i), i]
+        self.tree.append(value + self.prefix_sum(i - 1) - self.prefix_sum(i - (i & -i)))
+        self.values.append(value)
+        self.total += value
+
+    def add(self, index: int, delta: int) -> None:
+        """修改指定下标的值
+
+        Args:
+            index: 元素下标(从0开始)
+            delta: 增加的值(可为负数)
+        """
+        self.values[index] += delta
+        self.total += delta
+        i = index + 1
+        size = len(self.tree)
+        while i < size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def prefix_sum(self, count: int) -> int:
+        """求前count个元素之和
+
+        Args:
+            count: 元素数量
+
+        Returns:
+            前count个元素之和
+        """
+        result = 0
+        while count > 0:
+            result += self.tree[count]
+            count -= count & -count
+        return result
+
+    def find(self, target: int) -> int:
+        """查找前缀和大于target的最小下标, 用于按权重抽样
+
+        Args:
+            target: 目标累计值, 需满足0 <= target < total
+
+        Returns:
+            元素下标(从0开始)
+
+        Raises:
+            IndexError: 如果target超出范围
+        """
+        if not 0 <= target < self.total:
+            raise IndexError("FenwickTree target out of range")
+        position = 0
+        step = 1 << (len(self.tree) - 1).bit_length()
+        while step:
+            next_position = position + step
+            if next_position < len(self.tree) and self.tree[next_position] <= target:
+                position = next_position
+                target -= self.tree[next_position]
+            step >>= 1
+        return position
+
+class TimerList(Generic[T]):
+    """按回合计时的定时器列表, 元素在到期回合被取出
+
+    所有元素放在一个列表中, 每次推进扫描整个列表取出到期的元素。
+    游戏中的延迟只有1~2回合, 等待中的元素几乎都会在下一两个回合到期, 扫描的开销与到期元素数量相当
+    """
+
+    __slots__ = ("entries", "now")
+
+    def __init__(self):
+        self.entries: list[tuple[int, T]] = []
+        self.now: int = 0
+
+    def __len__(self) -> int:
+        """获取尚未到期的元素数量
+
+        Returns:
+            元素数量
+        """
+        return len(self.entries)
+
+    def __iter__(self):
+        """按安排顺序遍历(到期回合, 元素)"""
+        return iter(self.entries)
+
+    def copy(self, convert: Callable[[T], T] | None = None) -> "TimerList[T]":
+        """复制定时器列表
+
+        Args:
+            convert: 用于替换每个元素的函数, None表示与原列表共享元素
+
+        Returns:
+            新的定时器列表
+        """
+        new = TimerList.__new__(TimerList)
+        if convert is None:
+            new.entries = self.entries.copy()
+        else:
+            new.entries = [(due, convert(item)) for due, item in self.entries]
+        new.now = self.now
+        return new
+
+    def schedule(self, delay: int, item: T) -> None:
+        """安排元素在delay回合后到期
+
+        Args:
+            delay: 延迟回合数, 至少为1
+            item: 元素
+
+        Raises:
+            ValueError: 如果延迟小于1
+        """
+        if delay < 1:
+            raise ValueError("delay must be at least 1")
+        self.entries.append((self.now + delay, item))
+
+    def advance(self) -> list[T]:
+        """推进一个回合并取出在该回合到期的元素
+
+        Returns:
+            按安排顺序排列的到期元素
+        """
+        self.now = now = self.now + 1
+        entries = self.entries
+        if not entries:
+            return []
+        due = [item for when, item in entries if when == now]
+        if len(due) == len(entries):
+            self.entries = []
+        elif due:
+            self.entries = [entry for entry in entries if entry[0] != now]
+        return due
+
+class NamePool:
+    """不重复名称的分配器
+
+    候选名称在创建时打乱一次, 分配时从末尾取出, 为O(1);
+    候选名称用完后依次分配带数字后缀的名称(如"Steve2", "Alex2", ...)。
+    释放的名称放回候选列表, 可以再次分配
+    """
+
+    __slots__ = ("_free", "_used", "_bases", "_next")
+
+    def __init__(self, names: Iterable[str], rng: random.Random | None = None):
+        """初始化名称分配器
+
+        Args:
+            names: 候选名称, 重复的名称只保留一个
+            rng: 用于打乱候选名称的随机数生成器, None表示使用random模块
+        """
+        bases = list(dict.fromkeys(names))
+        self._free: list[str] = bases.copy()
+        (rng or random).shuffle(self._free)
+        self._used: set[str] = set()
+        # 带后缀名称的编号: 第n个为bases[n % len(bases)] + str(n // len(bases) + 1), 从后缀2开始
+        self._next: int = len(bases)
+        self._bases: list[str] = bases or ["Player"]
+
+    def __len__(self) -> int:
+        """获取已分配(或占用)的名称数量
+
+        Returns:
+            名称数量
+        """
+        return len(self._used)
+
+    def __contains__(self, name: str) -> bool:
+        """检查名称是否已被分配或占用"""
+        return name in self._used
+
+    def take(self) -> str:
+        """分配一个未被使用的名称
+
+        Returns:
+            名称
+        """
+        free, used = self._free, self._used
+        while free:
+            name = free.pop()
+            if name not in used:
+                used.add(name)
+                return name
+        bases = self._bases
+        while True:
+            name = f"{bases[self._next % len(bases)]}{self._next // len(bases) + 1}"
+            self._next += 1
+            if name not in used:
+                used.add(name)
+                return name
+
+    def reserve(self, name: str) -> bool:
+        """占用一个名称(如玩家自行指定的名称), 使其不会被分配
+
+        Args:
+            name: 名称
+
+        Returns:
+            bool: 名称原先未被使用返回True
+        """
+        if name in self._used:
+            return False
+        self._used.add(name)
+        return True
+
+    def release(self, name: str) -> None:
+        """释放名称, 使其可以再次分配(未被使用的名称忽略)
+
+        Args:
+            name: 名称
+        """
+        if name in self._used:
+            self._used.remove(name)
+            self._free.append(name)
+
 class BetterFloat:
     """自定义浮点数类, 使用十进制科学计数, 法用于处理浮点数的比较"""
     def __init__(self, value: int | str, exp: int = 0) -> None:
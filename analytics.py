@@ -0,0 +1,380 @@
+"""流式平衡性分析: 从大量模拟对局中增量统计各卡牌和AI等级的数据
+
+每局游戏整理为一条GameRecord(各座位的AI等级、胜者、回合数、各座位持有过的卡牌种类、
+各种卡牌造成的伤害), BalanceStats按块把记录累加到NumPy数组中, 内存占用与对局数量无关:
+
+- 持有某种卡牌时的胜率(持有过该卡牌的玩家中获胜的比例)和每局各种卡牌造成的伤害
+- 各AI等级的胜率和按席位归一化的胜率
+- 各座位的胜率及相对于平均水平的优势(先手优势)
+- 平均对局长度和平局数
+
+置信区间使用泊松自助法(Poisson bootstrap): 每局游戏在每个重抽样副本中的权重服从Poisson(1),
+只需保存每个副本的累加和, 不需要保存单局数据。结果可以保存为.npy(结构化数组, 按列读取)和CSV表格。
+
+需要安装numpy
+
+用法:
+    python analytics.py 100000 -l 1 2 3 3 -p 8 -o analytics_output
+"""
+from __future__ import annotations
+import os
+import csv
+import time
+import warnings
+import argparse
+from typing import Iterable, Iterator, NamedTuple
+
+import numpy as np
+
+from main import Card, Player, create_simulation
+from metrics import Registry
+from batch_sim import KINDS
+from tournament import make_jobs, run_games
+
+__all__ = [
+    "GameRecord",
+    "collect_game",
+    "stream_records",
+    "BalanceStats",
+    "analyze",
+]
+
+_KIND_INDEX = {name: i for i, name in enumerate(KINDS)}
+MAX_LEVEL = 4  # AI等级0(人类)~4
+DEFAULT_REPLICATES = 200
+DEFAULT_CHUNK = 1024
+
+
+class GameRecord(NamedTuple):
+    """一局游戏的分析数据
+
+    Attributes:
+        levels: 每个座位(players_in_order顺序)的AI等级
+        winner: 胜者座位, 平局为-1
+        turns: 玩家回合数
+        held: (P, K) 每个座位是否持有过每种卡牌(按KINDS的顺序)
+        damage: (K,) 每种卡牌造成的伤害
+    """
+    levels: tuple[int, ...]
+    winner: int
+    turns: int
+    held: np.ndarray
+    damage: np.ndarray
+
+
+class _HeldCards:
+    """挂载到game.recorder的收集器, 记录每个座位持有过的卡牌种类(抽到的和其他方式进入手牌的)
+
+    实现与replay.ReplayRecorder相同的接口, 其余动作不需要记录
+    """
+
+    def __init__(self, players: list[Player]) -> None:
+        self.index = {player: i for i, player in enumerate(players)}
+        self.held = np.zeros((len(players), len(KINDS)), dtype=bool)
+
+    def draw(self, player: Player, cards: list[Card]) -> None:
+        row = self.held[self.index[player]]
+        for card in cards:
+            kind = _KIND_INDEX.get(card.name)
+            if kind is not None:
+                row[kind] = True
+
+    def receive(self, player: Player, card: Card) -> None:
+        self.draw(player, [card])
+
+    def _ignore(self, *args) -> None:
+        pass
+
+    turn = use = attack = fire = bed = _ignore
+
+
+def collect_game(job: dict) -> GameRecord:
+    """进行一局游戏并整理分析数据(可在tournament.run_games的工作进程中使用)
+
+    Args:
+        job: tournament.make_jobs生成的任务
+
+    Returns:
+        GameRecord: 本局的分析数据
+    """
+    game = create_simulation(job["AI_levels"], job["seed"], *job["setting_bool"], card_pool_doublings=job["card_pool_doublings"], **job["setting_int"])
+    players = game.players_in_order
+    collector = _HeldCards(players)
+    game.recorder = collector
+    game.metrics = Registry()  # 本局单独的计数器, 用于统计每种卡牌造成的伤害
+    game.simulate(job["max_turns"])
+
+    damage = np.zeros(len(KINDS), dtype=np.int64)
+    for name, value in game.metrics.damage_by_card.values.items():
+        kind = _KIND_INDEX.get(name)
+        if kind is not None:
+            damage[kind] += value
+    winner = players.index(game.winner) if game.winner is not None else -1
+    return GameRecord(tuple(player.AI_level for player in players), winner, game.turn_count, collector.held, damage)
+
+
+def stream_records(games: int, AI_levels: list[int], seed: int = 0, processes: int | None = 1, max_turns: int = 10000, card_pool_doublings: int = 0, setting_bool: tuple[str, ...] = (), setting_int: dict[str, int] | None = None) -> Iterator[GameRecord]:
+    """进行games局对战, 按完成顺序逐局返回分析数据(参数见tournament.make_jobs)
+
+    Yields:
+        GameRecord: 单局分析数据
+    """
+    jobs = make_jobs(games, AI_levels, seed, max_turns, card_pool_doublings, setting_bool, setting_int)
+    yield from run_games(jobs, processes, play=collect_game)
+
+
+class BalanceStats:
+    """流式平衡性统计
+
+    每局游戏展开为一行特征(计数), 先放入固定大小的缓冲区, 缓冲区满时一次累加到总和及
+    replicates个自助法副本中(副本的累加为权重矩阵与特征块的矩阵乘法)。
+    内存占用只与卡牌种类数、座位数、副本数和块大小有关
+
+    Attributes:
+        games (int): 已统计的对局数
+        replicates (int): 自助法副本数
+        max_seats (int): 支持的最大座位数
+    """
+
+    def __init__(self, replicates: int = DEFAULT_REPLICATES, seed: int | None = None, chunk: int = DEFAULT_CHUNK, max_seats: int = 16) -> None:
+        """初始化统计
+
+        Args:
+            replicates: 自助法副本数
+            seed: 自助法权重的随机数种子
+            chunk: 缓冲区大小(局数)
+            max_seats: 支持的最大座位数
+
+        Raises:
+            ValueError: 如果副本数、块大小或座位数不是正数
+        """
+        if replicates <= 0 or chunk <= 0 or max_seats <= 0:
+            raise ValueError("replicates, chunk and max_seats must be positive")
+        self.replicates = replicates
+        self.max_seats = max_seats
+        self.games = 0
+        self._rng = np.random.default_rng(seed)
+
+        K, L, S = len(KINDS), MAX_LEVEL + 1, max_seats
+        # 特征列的位置
+        columns = {}
+        offset = 0
+        for name, width in (
+            ("games", 1), ("draws", 1), ("turns", 1),
+            ("held", K), ("held_wins", K), ("damage", K),
+            ("level_seats", L), ("level_wins", L),
+            ("seat_games", S), ("seat_wins", S), ("seat_share", S),
+        ):
+            columns[name] = slice(offset, offset + width)
+            offset += width
+        self._columns = columns
+        self._buffer = np.zeros((chunk, offset))
+        self._pending = 0
+        self._total = np.zeros(offset)
+        self._replicate_totals = np.zeros((replicates, offset))
+
+    def add(self, record: GameRecord) -> None:
+        """加入一局游戏
+
+        Args:
+            record: 单局分析数据
+
+        Raises:
+            ValueError: 如果座位数超过max_seats
+        """
+        seats = len(record.levels)
+        if seats > self.max_seats:
+            raise ValueError(f"Game has {seats} seats, more than max_seats={self.max_seats}")
+        c = self._columns
+        row = self._buffer[self._pending]
+        row[:] = 0
+        row[c["games"]] = 1
+        row[c["turns"]] = record.turns
+        row[c["held"]] = record.held.sum(axis=0)
+        row[c["damage"]] = record.damage
+        row[c["level_seats"]] = np.bincount(record.levels, minlength=MAX_LEVEL + 1)
+        row[c["seat_games"]][:seats] = 1
+        row[c["seat_share"]][:seats] = 1 / seats
+        if record.winner < 0:
+            row[c["draws"]] = 1
+        else:
+            row[c["held_wins"]] = record.held[record.winner]
+            row[c["level_wins"]][record.levels[record.winner]] = 1
+            row[c["seat_wins"]][record.winner] = 1
+
+        self._pending += 1
+        self.games += 1
+        if self._pending == len(self._buffer):
+            self.flush()
+
+    def update(self, records: Iterable[GameRecord]) -> "BalanceStats":
+        """依次加入多局游戏
+
+        Returns:
+            self: 允许链式操作
+        """
+        for record in records:
+            self.add(record)
+        return self
+
+    def flush(self) -> None:
+        """把缓冲区中的对局累加到总和和自助法副本"""
+        n = self._pending
+        if not n:
+            return
+        block = self._buffer[:n]
+        self._total += block.sum(axis=0)
+        weights = self._rng.poisson(1.0, (self.replicates, n)).astype(np.float64)
+        self._replicate_totals += weights @ block
+        self._pending = 0
+
+    def _ratio(self, numerator: str, denominator: str | None, confidence: float) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """计算两列之比及其自助法百分位置信区间
+
+        Args:
+            numerator: 分子列
+            denominator: 分母列, None表示对局数
+            confidence: 置信水平
+
+        Returns:
+            (估计值, 下界, 上界), 分母为0时为nan
+        """
+        c = self._columns
+        den = c["games"] if denominator is None else c[denominator]
+        total_num, total_den = self._total[c[numerator]], self._total[den]
+        rep_num, rep_den = self._replicate_totals[:, c[numerator]], self._replicate_totals[:, den]
+        if denominator is None:
+            total_den = np.broadcast_to(total_den, total_num.shape)
+            rep_den = np.broadcast_to(rep_den, rep_num.shape)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            estimate = np.where(total_den > 0, total_num / total_den, np.nan)
+            replicates = np.where(rep_den > 0, rep_num / rep_den, np.nan)
+        alpha = (1 - confidence) / 2 * 100
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # 没有出现过的等级或座位整列为nan
+            low, high = np.nanpercentile(replicates, [alpha, 100 - alpha], axis=0)
+        return estimate, low, high
+
+    def tables(self, confidence: float = 0.95) -> dict[str, np.ndarray]:
+        """生成统计表
+
+        Args:
+            confidence: 置信区间的置信水平
+
+        Returns:
+            dict: 表名到结构化数组(按列访问, 如tables["cards"]["win_rate"])的映射:
+                cards: 每种卡牌的持有次数(held)、持有时的胜场和胜率、每局造成的伤害
+                levels: 每个AI等级的席位数、胜场、胜率(每局)和按席位归一化的胜率
+                seats: 每个座位的对局数、胜场、胜率和相对于平均水平(1/人数)的优势, 大于1表示有优势
+                       (各座位AI等级不同时优势包含等级的差异, 测量先手优势应使用相同等级的阵容)
+                games: 对局数、平局数和平均回合数
+            估计值列后的_low/_high列为置信区间的下界和上界
+        """
+        self.flush()
+        total = self._total
+        c = self._columns
+
+        def table(key_name: str, keys, columns: dict[str, np.ndarray]) -> np.ndarray:
+            keys = np.asarray(keys)
+            dtype = [(key_name, keys.dtype)] + [(name, np.asarray(values).dtype) for name, values in columns.items()]
+            result = np.zeros(len(keys), dtype=dtype)
+            result[key_name] = keys
+            for name, values in columns.items():
+                result[name] = values
+            return result
+
+        def with_interval(name: str, values: tuple[np.ndarray, np.ndarray, np.ndarray]) -> dict[str, np.ndarray]:
+            estimate, low, high = values
+            return {name: estimate, f"{name}_low": low, f"{name}_high": high}
+
+        cards = table("card", list(KINDS), {
+            "held": total[c["held"]].astype(np.int64),
+            "held_wins": total[c["held_wins"]].astype(np.int64),
+            **with_interval("win_rate", self._ratio("held_wins", "held", confidence)),
+            "damage": total[c["damage"]].astype(np.int64),
+            **with_interval("damage_per_game", self._ratio("damage", None, confidence)),
+        })
+        levels = table("level", np.arange(MAX_LEVEL + 1), {
+            "seats": total[c["level_seats"]].astype(np.int64),
+            "wins": total[c["level_wins"]].astype(np.int64),
+            **with_interval("win_rate", self._ratio("level_wins", None, confidence)),
+            **with_interval("win_rate_per_seat", self._ratio("level_wins", "level_seats", confidence)),
+        })
+        seats = table("seat", np.arange(self.max_seats), {
+            "games": total[c["seat_games"]].astype(np.int64),
+            "wins": total[c["seat_wins"]].astype(np.int64),
+            **with_interval("win_rate", self._ratio("seat_wins", "seat_games", confidence)),
+            **with_interval("advantage", self._ratio("seat_wins", "seat_share", confidence)),
+        })
+        games = table("games", np.array([self.games]), {
+            "draws": np.array([int(total[c["draws"]][0])]),
+            **with_interval("mean_turns", self._ratio("turns", None, confidence)),
+        })
+        # 只保留出现过的AI等级和座位
+        return {
+            "cards": cards,
+            "levels": levels[levels["seats"] > 0],
+            "seats": seats[seats["games"] > 0],
+            "games": games,
+        }
+
+    def save(self, directory: str, confidence: float = 0.95) -> list[str]:
+        """把统计表保存为<表名>.npy(结构化数组)和<表名>.csv
+
+        Args:
+            directory: 输出目录, 不存在时创建
+            confidence: 置信区间的置信水平
+
+        Returns:
+            list[str]: 写入的文件路径
+        """
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for name, data in self.tables(confidence).items():
+            path = os.path.join(directory, f"{name}.npy")
+            np.save(path, data)
+            paths.append(path)
+            path = os.path.join(directory, f"{name}.csv")
+            with open(path, "w", newline="", encoding="utf-8") as file:
+                writer = csv.writer(file)
+                writer.writerow(data.dtype.names)
+                for row in data.tolist():
+                    writer.writerow(f"{value:.6g}" if isinstance(value, float) else value for value in row)
+            paths.append(path)
+        return paths
+
+
+def analyze(games: int, AI_levels: list[int], seed: int = 0, processes: int | None = 1, replicates: int = DEFAULT_REPLICATES, **kwargs) -> BalanceStats:
+    """进行games局对战并统计(其余参数见stream_records)
+
+    Returns:
+        BalanceStats: 统计结果
+    """
+    stats = BalanceStats(replicates, seed=seed, max_seats=max(16, len(AI_levels)))
+    return stats.update(stream_records(games, AI_levels, seed, processes, **kwargs))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MC PvP card game balance analytics")
+    parser.add_argument("games", type=int, nargs="?", default=10000)
+    parser.add_argument("-l", "--levels", type=int, nargs="+", default=[1, 2, 3, 3])
+    parser.add_argument("-p", "--processes", type=int, default=None)
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument("-r", "--replicates", type=int, default=DEFAULT_REPLICATES)
+    parser.add_argument("-o", "--output", default="analytics_output", help="output directory for .npy and .csv tables")
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    stats = analyze(args.games, args.levels, args.seed, args.processes, args.replicates)
+    elapsed = time.perf_counter() - start_time
+    tables = stats.tables()
+    summary = tables["games"][0]
+    print(f"{stats.games} games in {elapsed:.2f}s, {summary['draws']} draws, "
+          f"mean length {summary['mean_turns']:.1f} turns [{summary['mean_turns_low']:.1f}, {summary['mean_turns_high']:.1f}]")
+    for row in tables["levels"]:
+        print(f"AI level {row['level']}: win rate per seat {row['win_rate_per_seat']:.3f} "
+              f"[{row['win_rate_per_seat_low']:.3f}, {row['win_rate_per_seat_high']:.3f}]")
+    for row in tables["seats"]:
+        print(f"seat {row['seat']}: advantage {row['advantage']:.3f} [{row['advantage_low']:.3f}, {row['advantage_high']:.3f}]")
+    for path in stats.save(args.output):
+        print(f"wrote {path}")
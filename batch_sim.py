@@ -0,0 +1,433 @@
+"""NumPy批量模拟器: 以数组同步推进大量只包含1级和2级AI的对局
+
+每局游戏的状态都保存在形状为(B, ...)的数组中, 所有对局按座位同步推进,
+规则与Player._ai_level_1_action/_ai_level_2_action及其调用的卡牌、伤害、
+效果和延迟攻击逻辑一致。由于手牌只保存各种卡牌的数量, 以下细节按概率近似:
+
+- 2级AI在多张伤害相同的攻击卡牌之间按数量随机选择(对象引擎选择最先获得的一张)
+- 同类效果合并为一个(等级取较大值)
+
+需要安装numpy
+"""
+from __future__ import annotations
+import time
+
+import numpy as np
+
+from main import (
+    CARD_SPECS, ATTACK_DELAY, CARD_HEALING, CardPool,
+    DAMAGE_EXPLOSIVE, DAMAGE_MAGICAL,
+)
+
+__all__ = [
+    "KINDS",
+    "BatchSimulator",
+    "batch_simulate",
+]
+
+# 卡牌种类: 默认卡牌池中的卡牌加上只会在游戏中产生的损坏的三叉戟
+KINDS: tuple[str, ...] = (*(card.name for card in CardPool._default(None, None)), "Damaged Trident")
+_KIND_INDEX = {name: i for i, name in enumerate(KINDS)}
+
+_DAMAGE = np.array([CARD_SPECS[name].damage for name in KINDS], dtype=np.int64)
+_NEED_TARGET = np.array([CARD_SPECS[name].need_target for name in KINDS])
+_HEALING = np.array([CARD_SPECS[name].category == CARD_HEALING for name in KINDS])
+_EXPLOSIVE = np.array([CARD_SPECS[name].damage_type == DAMAGE_EXPLOSIVE for name in KINDS])
+_MAGICAL = np.array([CARD_SPECS[name].damage_type == DAMAGE_MAGICAL for name in KINDS])
+_DEFAULT_POOL = np.array([count for count in CardPool._default(None, None).values()] + [0], dtype=np.int64)
+
+_SHIELD = _KIND_INDEX["Shield"]
+_BED = _KIND_INDEX["Bed"]
+_APPLE = _KIND_INDEX["Apple"]
+_GOLDEN_APPLE = _KIND_INDEX["Golden Apple"]
+_ENCHANTED_GOLDEN_APPLE = _KIND_INDEX["Enchanted Golden Apple"]
+_POTION_OF_HEALING = _KIND_INDEX["Potion of Healing"]
+_TRIDENT = _KIND_INDEX["Trident"]
+_DAMAGED_TRIDENT = _KIND_INDEX["Damaged Trident"]
+_MINECART = _KIND_INDEX["TNT Minecart"]
+_MINECART_DELAY = ATTACK_DELAY["TNT Minecart"]
+_MINECART_DAMAGE = CARD_SPECS["TNT Minecart"].damage
+
+
+class BatchSimulator:
+    """同步进行B局相同阵容的AI对局
+
+    Attributes:
+        AI_levels (list[int]): 每个座位的AI等级(只支持1和2)
+        batch (int): 对局数量B
+        health (np.ndarray): (B, P) 当前生命值
+        max_health (np.ndarray): (B, P) 最大生命值
+        shield (np.ndarray): (B, P) 盾牌剩余防御次数
+        bedded (np.ndarray): (B, P) 是否有床
+        alive (np.ndarray): (B, P) 是否存活
+        hand (np.ndarray): (B, P, K) 手牌中每种卡牌的数量
+        pool (np.ndarray): (B, K) 牌库中每种卡牌的数量
+        discard (np.ndarray): (B, K) 弃牌堆中每种卡牌的数量
+        winner (np.ndarray): (B,) 胜者座位, 平局或未结束为-1
+        turns (np.ndarray): (B,) 玩家回合数
+    """
+
+    def __init__(self, AI_levels: list[int], batch: int, seed: int | None = None, max_turns: int = 10000, card_pool_doublings: int = 0, start_health: int = 5, max_health: int | None = None) -> None:
+        """初始化批量模拟器
+
+        Args:
+            AI_levels: 每个座位的AI等级
+            batch: 同时进行的对局数量
+            seed: 随机数种子
+            max_turns: 每局最大玩家回合数, 超过后视为平局
+            card_pool_doublings: 卡牌池合并次数(与CardPool.__add__相同: 默认卡牌池加上两份原卡牌池)
+            start_health: 初始生命值
+            max_health: 最大生命值, 默认等于初始生命值
+
+        Raises:
+            ValueError: 如果AI等级不是1或2, 或玩家不足2人
+        """
+        if len(AI_levels) < 2:
+            raise ValueError("Not enough players")
+        if any(level not in (1, 2) for level in AI_levels):
+            raise ValueError("BatchSimulator only supports AI level 1 and 2")
+
+        self.AI_levels: list[int] = list(AI_levels)
+        self.batch: int = batch
+        self.max_turns: int = max_turns
+        self.rng: np.random.Generator = np.random.default_rng(seed)
+
+        B, P, K = batch, len(AI_levels), len(KINDS)
+        self.health = np.full((B, P), start_health, dtype=np.int64)
+        self.max_health = np.full((B, P), max_health or start_health, dtype=np.int64)
+        self.shield = np.zeros((B, P), dtype=np.int64)
+        self.bedded = np.zeros((B, P), dtype=bool)
+        self.alive = np.ones((B, P), dtype=bool)
+        self.heal_turns = np.zeros((B, P), dtype=np.int64)
+        self.heal_level = np.zeros((B, P), dtype=np.int64)
+        self.boost_turns = np.zeros((B, P), dtype=np.int64)
+        self.boost_level = np.zeros((B, P), dtype=np.int64)
+        self.hand = np.zeros((B, P, K), dtype=np.int64)
+
+        pool = _DEFAULT_POOL.copy()
+        for _ in range(card_pool_doublings):
+            pool = _DEFAULT_POOL + 2 * pool
+        self.pool = np.tile(pool, (B, 1))
+        self.discard = np.zeros((B, K), dtype=np.int64)
+
+        # 延迟攻击: inflight[..., d]为还需d + 1次回合结束才生效的攻击数, ready为攻击者下回合结束时发动的攻击数
+        self.inflight = np.zeros((B, P, P, _MINECART_DELAY), dtype=np.int64)
+        self.ready = np.zeros((B, P, P), dtype=np.int64)
+
+        self.done = np.zeros(B, dtype=bool)
+        self.winner = np.full(B, -1, dtype=np.int64)
+        self.turns = np.zeros(B, dtype=np.int64)
+
+    def _choose(self, weights: np.ndarray) -> np.ndarray:
+        """按权重为每一行随机选择一个下标
+
+        Args:
+            weights: (n, K) 非负整数权重, 每行之和必须大于0
+
+        Returns:
+            (n,) 选中的下标
+        """
+        cumulative = weights.cumsum(axis=1)
+        target = (self.rng.random(len(weights)) * cumulative[:, -1]).astype(np.int64)
+        return (cumulative > target[:, None]).argmax(axis=1)
+
+    def _draw(self, rows: np.ndarray, seat: int, amount: int) -> None:
+        """为指定对局中的玩家抽牌(规则同CardPool.draw_card)
+
+        Args:
+            rows: 对局下标
+            seat: 玩家座位
+            amount: 抽牌数量
+        """
+        short = self.pool[rows].sum(axis=1) < amount
+        if short.any():
+            refill = rows[short]
+            self.pool[refill] += self.discard[refill]
+            self.discard[refill] = 0
+            reset = refill[self.pool[refill].sum(axis=1) < amount]
+            self.pool[reset] = _DEFAULT_POOL
+        for _ in range(amount):
+            kinds = self._choose(self.pool[rows])
+            self.pool[rows, kinds] -= 1
+            self.hand[rows, seat, kinds] += 1
+
+    def _heal(self, rows: np.ndarray, seat: int, value: int | np.ndarray) -> None:
+        """恢复生命值(规则同Health.__iadd__)
+
+        Args:
+            rows: 对局下标
+            seat: 玩家座位
+            value: 恢复量
+        """
+        cap = self.max_health[rows, seat] + np.where(self.boost_turns[rows, seat] > 0, self.boost_level[rows, seat], 0)
+        self.health[rows, seat] = np.minimum(self.health[rows, seat] + value, cap)
+
+    def _damage(self, rows: np.ndarray, targets: np.ndarray, damage: np.ndarray, explosive: np.ndarray, magical: np.ndarray) -> None:
+        """对目标造成伤害(规则同Health.__isub__和Health._handle_death)
+
+        Args:
+            rows: 对局下标
+            targets: 每局的目标座位
+            damage: 伤害值
+            explosive: 是否为爆炸伤害
+            magical: 是否为魔法伤害(无法被盾牌防御)
+        """
+        blocked = (self.shield[rows, targets] > 0) & ~magical
+        self.shield[rows[blocked], targets[blocked]] -= 1
+
+        hit = ~blocked
+        rows, targets, explosive = rows[hit], targets[hit], explosive[hit]
+        self.health[rows, targets] -= damage[hit]
+        self.bedded[rows[explosive], targets[explosive]] = False
+
+        died = self.health[rows, targets] <= 0
+        rows, targets = rows[died], targets[died]
+        self.hand[rows, targets] = 0
+        self.heal_turns[rows, targets] = 0
+        self.boost_turns[rows, targets] = 0
+        revived = self.bedded[rows, targets]
+        self.health[rows[revived], targets[revived]] = 5
+        self.bedded[rows[revived], targets[revived]] = False
+        self.alive[rows[~revived], targets[~revived]] = False
+
+    def _use(self, rows: np.ndarray, seat: int, kinds: np.ndarray, targets: np.ndarray | None = None) -> None:
+        """使用卡牌(规则同Player._use_card和Player._attack_player)
+
+        Args:
+            rows: 对局下标
+            seat: 使用者座位
+            kinds: 每局使用的卡牌种类
+            targets: 需要目标的卡牌的目标座位, 其余位置忽略
+        """
+        self.hand[rows, seat, kinds] -= 1
+        self.discard[rows, kinds] += 1
+
+        attack = _NEED_TARGET[kinds]
+        if attack.any():
+            a_rows, a_kinds, a_targets = rows[attack], kinds[attack], targets[attack]
+            delayed = a_kinds == _MINECART
+            self.inflight[a_rows[delayed], seat, a_targets[delayed], _MINECART_DELAY - 1] += 1
+
+            now = ~delayed
+            a_rows, a_kinds, a_targets = a_rows[now], a_kinds[now], a_targets[now]
+            trident = a_kinds == _TRIDENT
+            self.hand[a_rows[trident], a_targets[trident], _DAMAGED_TRIDENT] += 1
+            self._damage(a_rows, a_targets, _DAMAGE[a_kinds], _EXPLOSIVE[a_kinds], _MAGICAL[a_kinds])
+
+        for kind, shield, bed, heal, effects in (
+            (_SHIELD, True, False, 0, None),
+            (_BED, False, True, 0, None),
+            (_APPLE, False, False, 1, None),
+            (_GOLDEN_APPLE, False, False, 1, ((1, 1), (3, 1))),
+            (_ENCHANTED_GOLDEN_APPLE, False, False, 3, ((2, 2), (5, 2))),
+        ):
+            used = rows[kinds == kind]
+            if not len(used):
+                continue
+            if shield:
+                self.shield[used, seat] = 3
+            if bed:
+                self.bedded[used, seat] = True
+            if effects:
+                (heal_turns, heal_level), (boost_turns, boost_level) = effects
+                self.heal_turns[used, seat] = np.maximum(self.heal_turns[used, seat], heal_turns)
+                self.heal_level[used, seat] = np.maximum(self.heal_level[used, seat], heal_level)
+                self.boost_turns[used, seat] = np.maximum(self.boost_turns[used, seat], boost_turns)
+                self.boost_level[used, seat] = np.maximum(self.boost_level[used, seat], boost_level)
+            if heal:
+                self._heal(used, seat, heal)
+
+        potion = rows[kinds == _POTION_OF_HEALING]
+        if len(potion):
+            # 已有治疗效果时延长2回合, 否则添加2回合1级治疗效果
+            existing = self.heal_turns[potion, seat] > 0
+            self.heal_turns[potion[existing], seat] += 2
+            self.heal_turns[potion[~existing], seat] = 2
+            self.heal_level[potion[~existing], seat] = 1
+
+    def _random_targets(self, rows: np.ndarray, seat: int) -> np.ndarray:
+        """为每局随机选择一个存活的其他玩家
+
+        Args:
+            rows: 对局下标
+            seat: 行动者座位
+
+        Returns:
+            目标座位
+        """
+        others = self.alive[rows].copy()
+        others[:, seat] = False
+        return self._choose(others.astype(np.int64))
+
+    def _weakest_targets(self, rows: np.ndarray, seat: int) -> np.ndarray:
+        """为每局选择生命值最低的存活其他玩家(相同时选择座位靠前者)
+
+        Args:
+            rows: 对局下标
+            seat: 行动者座位
+
+        Returns:
+            目标座位
+        """
+        health = np.where(self.alive[rows], self.health[rows], np.iinfo(np.int64).max)
+        health[:, seat] = np.iinfo(np.int64).max
+        return health.argmin(axis=1)
+
+    def _ai_level_1_action(self, rows: np.ndarray, seat: int) -> None:
+        """1级AI: 随机使用一张手牌, 需要目标时随机攻击一名玩家"""
+        kinds = self._choose(self.hand[rows, seat])
+        self._use(rows, seat, kinds, self._random_targets(rows, seat))
+
+    def _ai_level_2_action(self, rows: np.ndarray, seat: int) -> None:
+        """2级AI: 生命值低于4时治疗, 否则50%概率用最高伤害卡牌攻击生命值最低的玩家, 否则随机使用非攻击卡牌"""
+        hand = self.hand[rows, seat]
+
+        healing = hand * _HEALING
+        heal = (self.health[rows, seat] < 4) & (healing.sum(axis=1) > 0)
+        if heal.any():
+            self._use(rows[heal], seat, self._choose(healing[heal]))
+        rows, hand = rows[~heal], hand[~heal]
+
+        attack_cards = hand * _NEED_TARGET
+        attack = (self.rng.random(len(rows)) < 0.5) & (attack_cards.sum(axis=1) > 0)
+        if attack.any():
+            attack_cards = attack_cards[attack]
+            best = np.where(attack_cards > 0, _DAMAGE, -1)
+            best = attack_cards * (best == best.max(axis=1, keepdims=True))
+            a_rows = rows[attack]
+            self._use(a_rows, seat, self._choose(best), self._weakest_targets(a_rows, seat))
+        rows, hand = rows[~attack], hand[~attack]
+
+        other_cards = hand * ~_NEED_TARGET
+        other = other_cards.sum(axis=1) > 0
+        if other.any():
+            self._use(rows[other], seat, self._choose(other_cards[other]))
+
+    def _fire_delayed(self, rows: np.ndarray, seat: int) -> None:
+        """发动该玩家已就绪的延迟攻击(规则同Player._handle_delay_attack)
+
+        Args:
+            rows: 对局下标
+            seat: 攻击者座位
+        """
+        ready = self.ready[rows, seat]
+        if not ready.any():
+            return
+        self.ready[rows, seat] = 0
+        for target in range(len(self.AI_levels)):
+            counts = ready[:, target]
+            while counts.any():
+                firing = counts > 0
+                counts = counts - firing
+                f_rows = rows[firing]
+                hit = self.alive[f_rows, target]
+                # 目标已死亡时卡牌留在使用者手中
+                self.hand[f_rows[~hit], seat, _MINECART] += 1
+                f_rows = f_rows[hit]
+                self.discard[f_rows, _MINECART] += 1
+                n = len(f_rows)
+                self._damage(f_rows, np.full(n, target), np.full(n, _MINECART_DAMAGE), np.ones(n, dtype=bool), np.zeros(n, dtype=bool))
+
+    def _after_turn(self) -> None:
+        """处理所有进行中对局的回合结束效果和延迟攻击倒计时(规则同Game.after_turn)"""
+        rows = np.nonzero(~self.done)[0]
+        alive = self.alive[rows]
+
+        healing = alive & (self.heal_turns[rows] > 0)
+        b, p = np.nonzero(healing)
+        if len(b):
+            b = rows[b]
+            cap = self.max_health[b, p] + np.where(self.boost_turns[b, p] > 0, self.boost_level[b, p], 0)
+            self.health[b, p] = np.minimum(self.health[b, p] + self.heal_level[b, p], cap)
+            self.heal_turns[b, p] -= 1
+        self.heal_level[rows] *= self.heal_turns[rows] > 0
+        self.boost_turns[rows] -= alive & (self.boost_turns[rows] > 0)
+        self.boost_level[rows] *= self.boost_turns[rows] > 0
+
+        inflight = self.inflight[rows]
+        self.ready[rows] += inflight[..., 0] * alive[:, :, None]
+        inflight[..., :-1] = inflight[..., 1:]
+        inflight[..., -1] = 0
+        self.inflight[rows] = inflight
+
+    def _check_game_over(self) -> None:
+        """标记只剩一名存活玩家或达到回合上限的对局"""
+        alive = self.alive.sum(axis=1)
+        over = ~self.done & ((alive <= 1) | (self.turns >= self.max_turns))
+        if over.any():
+            rows = np.nonzero(over)[0]
+            winners = np.where(alive[rows] == 1, self.alive[rows].argmax(axis=1), -1)
+            self.winner[rows] = winners
+            self.done[rows] = True
+
+    def run(self) -> dict:
+        """进行所有对局直到结束
+
+        Returns:
+            dict: 汇总结果, 包含对局数(games)、耗时(elapsed)、每秒对局数(games_per_sec)、
+                  平均回合数(mean_turns)、平局数(draws)、各座位胜率(win_rate_by_seat)、
+                  各AI等级胜率(win_rate)以及每局胜者座位(winner)和回合数(turns)数组
+        """
+        start_time = time.perf_counter()
+        all_rows = np.arange(self.batch)
+        for seat in range(len(self.AI_levels)):
+            self._draw(all_rows, seat, 5)
+
+        actions = {1: self._ai_level_1_action, 2: self._ai_level_2_action}
+        while not self.done.all():
+            for seat, level in enumerate(self.AI_levels):
+                rows = np.nonzero(~self.done & self.alive[:, seat])[0]
+                if not len(rows):
+                    continue
+
+                empty = self.hand[rows, seat].sum(axis=1) == 0
+                if empty.any():
+                    self._draw(rows[empty], seat, 5)
+                if (~empty).any():
+                    actions[level](rows[~empty], seat)
+                self._fire_delayed(rows, seat)
+
+                self.turns[rows] += 1
+                self._check_game_over()
+            self._after_turn()
+        elapsed = time.perf_counter() - start_time
+
+        seats = len(self.AI_levels)
+        win_rate_by_seat = np.bincount(self.winner[self.winner >= 0], minlength=seats) / self.batch
+        win_rate = {
+            level: float(sum(win_rate_by_seat[i] for i in range(seats) if self.AI_levels[i] == level))
+            for level in sorted(set(self.AI_levels))
+        }
+        return {
+            "games": self.batch,
+            "elapsed": elapsed,
+            "games_per_sec": self.batch / elapsed if elapsed else 0.0,
+            "mean_turns": float(self.turns.mean()),
+            "draws": int((self.winner < 0).sum()),
+            "win_rate_by_seat": win_rate_by_seat.tolist(),
+            "win_rate": win_rate,
+            "winner": self.winner,
+            "turns": self.turns,
+        }
+
+
+def batch_simulate(AI_levels: list[int] = [1, 2, 2, 1], games: int = 10000, seed: int | None = None, **kwargs) -> dict:
+    """批量进行AI对局并返回汇总结果
+
+    Args:
+        AI_levels: 每个座位的AI等级(只支持1和2)
+        games: 对局数量
+        seed: 随机数种子
+        **kwargs: 传给BatchSimulator的其他参数
+
+    Returns:
+        dict: 见BatchSimulator.run
+    """
+    return BatchSimulator(AI_levels, games, seed, **kwargs).run()
+
+
+if __name__ == "__main__":
+    report = batch_simulate(games=100000, seed=0)
+    print(f"{report['games']} games in {report['elapsed']:.2f}s ({report['games_per_sec'] * 60:.0f} games/min), "
+          f"mean length {report['mean_turns']:.1f} turns, {report['draws']} draws")
+    print("win rate by seat:", ", ".join(f"{rate:.3f}" for rate in report["win_rate_by_seat"]))
@@ -0,0 +1,51 @@
+"""每个玩家回合的存活检查耗时与玩家数量的关系
+
+对比原方式(每次检查都遍历队列中的所有玩家)和存活玩家索引(Game.alive_count/alive_humans)
+完成_is_turn_finished、check_game_over和_check_human_dead三项检查的耗时
+"""
+import os
+import sys
+import timeit
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import Game, Player
+from logger import log_level
+
+
+def make_game(players: int) -> Game:
+    """创建一局有players位AI玩家的游戏, 其中一半玩家已死亡"""
+    game = Game(seed=0)
+    game.add_player(*(Player(f"P{i + 1}", 1) for i in range(players)))
+    for player in game.players_in_order[::2]:
+        player.health.health = 0
+        game._player_died(player)
+    return game
+
+
+def checks_with_scan(game: Game) -> None:
+    """原方式: 每项检查都遍历玩家队列"""
+    alive_players = [p for p in game.players if p.health.health > 0]
+    len(alive_players)
+    active_players = [p for p in game.players if p.health.health > 0]
+    len(active_players) <= 1
+    human_players = [p for p in game.players if not p.AI_level]
+    all(p.health.health <= 0 for p in human_players)
+
+
+def checks_with_index(game: Game) -> None:
+    """使用存活玩家索引"""
+    game.alive_count
+    game.check_game_over()
+    game._check_human_dead()
+
+
+if __name__ == "__main__":
+    print(f"{'players':>8} {'scan':>10} {'index':>10}")
+    with log_level(logging.WARNING):
+        for n in (4, 16, 64, 256):
+            game = make_game(n)
+            scan = min(timeit.repeat(lambda: checks_with_scan(game), number=2000, repeat=5)) / 2000 * 1e6
+            index = min(timeit.repeat(lambda: checks_with_index(game), number=2000, repeat=5)) / 2000 * 1e6
+            print(f"{n:8} {scan:8.2f}µs {index:8.2f}µs")
@@ -0,0 +1,47 @@
+"""卡牌属性查询的微基准测试
+
+比较每次调用都重新计算(card_usage等规则函数, 即CARD_SPECS之前Card方法的实现)
+与查询预先计算的CARD_SPECS表(当前Card方法)的单次调用耗时
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import Game, Card, CARD_NAMES, card_usage, card_destroy_defense_type, card_need_target
+
+
+def bench(number: int = 20000) -> dict[str, tuple[float, float]]:
+    """测量每种查询在修改前后的单次调用耗时
+
+    Args:
+        number: 每张卡牌的调用次数
+
+    Returns:
+        dict: 查询名称到(修改前纳秒, 修改后纳秒)的映射
+    """
+    game = Game()
+    cards = [Card(name, game) for name in CARD_NAMES if not name.startswith("/")]
+    names = [card.name for card in cards]
+    calls = number * len(cards)
+
+    def per_call(stmt) -> float:
+        return min(timeit.repeat(stmt, number=number, repeat=3)) / calls * 1e9
+
+    results = {}
+    for method, rule in (
+        ("usage", card_usage),
+        ("destroy_defense_type", card_destroy_defense_type),
+        ("need_target", card_need_target),
+    ):
+        before = per_call(lambda: [rule(name) for name in names])
+        bound = getattr(Card, method)
+        after = per_call(lambda: [bound(card) for card in cards])
+        results[method] = (before, after)
+    return results
+
+
+if __name__ == "__main__":
+    for method, (before, after) in bench().items():
+        print(f"Card.{method:<22} before {before:8.1f} ns/call   after {after:8.1f} ns/call   ({before / after:.1f}x)")
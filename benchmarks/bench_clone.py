@@ -0,0 +1,50 @@
+"""Game.clone与copy.deepcopy的耗时对比
+
+在4人对局进行若干回合后复制游戏, 目标是每次clone少于50µs
+"""
+import os
+import sys
+import copy
+import random
+import timeit
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import NullOutput, create_simulation
+from logger import log_level
+
+
+def make_game(seed: int = 1, turns: int = 10, AI_levels: list[int] = [1, 2, 3, 3]):
+    """创建一局进行了若干回合的无界面对局
+
+    Args:
+        seed: 随机数种子
+        turns: 已进行的玩家回合数
+        AI_levels: 每位AI玩家的等级
+    """
+    game = create_simulation(AI_levels, seed)
+    game.headless = True
+    game.output = NullOutput()
+    game.started = True
+    for player in game.players:
+        player.draw(5)
+    game._play(turns)
+    return game
+
+
+def bench(stmt, number: int) -> float:
+    """返回单次调用的最短耗时(µs)"""
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number * 1e6
+
+
+if __name__ == "__main__":
+    with log_level(logging.WARNING):
+        game = make_game()
+        rng = random.Random(0)
+        fork = bench(game.clone, 5000)
+        shared = bench(lambda: game.clone(rng), 5000)
+        deep = bench(lambda: copy.deepcopy(game), 200)
+    print(f"clone():          {fork:8.1f} µs")
+    print(f"clone(rng):       {shared:8.1f} µs")
+    print(f"copy.deepcopy():  {deep:8.1f} µs ({deep / fork:.0f}x slower)")
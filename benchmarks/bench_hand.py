@@ -0,0 +1,42 @@
+"""手牌多重集合(Hand)与列表的对比
+
+在持有n张卡牌的手牌上重复"使用一张治疗卡牌再放回": 列表需要扫描整副手牌来筛选、
+判断成员和移除, Hand只需O(K)(K为卡牌种类数)。
+"""
+import os
+import sys
+import random
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import CARD_HEALING, Card, CardPool, Hand, Game
+
+
+def list_step(cards: list, rng: random.Random) -> None:
+    healing = [c for c in cards if c.spec.category == CARD_HEALING]
+    card = rng.choice(healing)
+    if card in cards:
+        cards.remove(card)
+    cards.append(card)
+
+
+def hand_step(hand: Hand, rng: random.Random) -> None:
+    card = hand.choice(rng, CARD_HEALING)
+    if card in hand:
+        hand.remove(card)
+    hand.append(card)
+
+
+if __name__ == "__main__":
+    game = Game(seed=0)
+    for n in (5, 50, 500):
+        pool = CardPool(game=game)
+        for _ in range(4):
+            pool += pool
+        cards = [*pool.draw_card(n - 1), Card.get("Apple")]
+        hand = Hand(cards)
+        rng = random.Random(0)
+        as_list = min(timeit.repeat(lambda: list_step(cards, rng), number=2000, repeat=5)) / 2000 * 1e6
+        as_hand = min(timeit.repeat(lambda: hand_step(hand, rng), number=2000, repeat=5)) / 2000 * 1e6
+        print(f"{n:4d} cards: list {as_list:7.2f} µs, Hand {as_hand:5.2f} µs ({as_list / as_hand:.1f}x)")
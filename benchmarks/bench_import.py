@@ -0,0 +1,58 @@
+"""导入引擎模块的耗时和文件操作检查
+
+在新的解释器中用python -X importtime导入main, 取多次的最短耗时与预算比较;
+同时用审计钩子检查导入期间没有打开(除模块文件外的)文件或创建目录。
+超出预算或有文件操作时以状态码1退出, 可以用于检查进程池工作进程的启动开销
+"""
+import os
+import sys
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 导入main(包括其依赖的标准库模块)的耗时预算
+IMPORT_BUDGET_MS = 40.0
+
+_AUDIT = """
+import sys
+events = []
+def hook(event, args):
+    if event == "open" and isinstance(args[0], str) and not args[0].endswith((".py", ".pyc", ".so")):
+        events.append(f"open {args[0]}")
+    elif event in ("os.mkdir", "os.remove", "os.rename"):
+        events.append(f"{event} {args[0]}")
+sys.addaudithook(hook)
+import main
+print("\\n".join(events))
+"""
+
+
+def import_time(module: str = "main") -> float:
+    """在新的解释器中导入模块, 返回其累计导入耗时(毫秒)"""
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)  # 使用.pyc, 与实际启动情况相同
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    for line in reversed(result.stderr.splitlines()):
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1]) / 1000
+    raise RuntimeError(f"No import time reported for {module}")
+
+
+def import_side_effects() -> list[str]:
+    """返回导入main时的文件操作"""
+    result = subprocess.run([sys.executable, "-c", _AUDIT], cwd=ROOT, capture_output=True, text=True, check=True)
+    return result.stdout.strip().splitlines()
+
+
+if __name__ == "__main__":
+    import_time()  # 第一次导入会生成.pyc
+    best = min(import_time() for _ in range(10))
+    side_effects = import_side_effects()
+    print(f"import main: {best:.1f} ms (budget {IMPORT_BUDGET_MS:.0f} ms)")
+    print(f"file operations during import: {side_effects or 'none'}")
+    if best > IMPORT_BUDGET_MS or side_effects:
+        sys.exit(1)
@@ -0,0 +1,49 @@
+"""语言数据的加载和本地化消息的耗时
+
+set_language分别测量首次编译(无缓存)、从磁盘缓存加载和进程内重复切换的耗时,
+并测量lang()格式化消息、无参数消息和Card.__str__的单次耗时
+"""
+import os
+import sys
+import time
+import shutil
+import timeit
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+from main import Card, lang, set_language
+from logger import log_level
+
+
+def per_call(stmt, number: int = 100000) -> float:
+    """返回单次调用的最短耗时(µs)"""
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number * 1e6
+
+
+if __name__ == "__main__":
+    card = Card("Iron Sword")
+    print(f"{'language':>9} {'compile':>9} {'disk':>9} {'memory':>9} {'format':>8} {'plain':>8} {'card':>8}")
+    with log_level(logging.WARNING), open(os.devnull, "w") as devnull:
+        stdout, sys.stdout = sys.stdout, devnull  # set_language会输出空行
+        rows = []
+        for language in ("zh_cn", "xx_urb", "xx_abbr"):
+            shutil.rmtree(main.LANG_CACHE_DIR, ignore_errors=True)
+            main._compiled_languages.clear()
+            start = time.perf_counter()
+            set_language(language, reload=True)
+            compile_time = (time.perf_counter() - start) * 1e6
+
+            def from_disk():
+                main._compiled_languages.clear()
+                set_language(language, reload=True)
+            disk = per_call(from_disk, 500)
+            memory = per_call(lambda: set_language(language, reload=True), 500)
+
+            formatted = per_call(lambda: lang("message", "{player}'s turn", player="Steve"))
+            plain = per_call(lambda: lang("message", "Game started!"))
+            name = per_call(lambda: str(card))
+            rows.append(f"{language:>9} {compile_time:7.0f}µs {disk:7.1f}µs {memory:7.1f}µs {formatted:6.3f}µs {plain:6.3f}µs {name:6.3f}µs")
+        sys.stdout = stdout
+    print("\n".join(rows))
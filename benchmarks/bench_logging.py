@@ -0,0 +1,41 @@
+"""日志级别对模拟速度的影响
+
+分别以DEBUG和WARNING日志级别进行相同种子的无界面对局, 比较每秒对局数。
+DEBUG级别会写入logs/game.log
+"""
+import os
+import sys
+import time
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import Game, Player
+
+
+def bench(level: int, games: int = 200, AI_levels: list[int] = [1, 2, 3, 3]) -> float:
+    """以指定日志级别进行对局
+
+    Args:
+        level: 日志级别
+        games: 对局数量
+        AI_levels: 每位AI玩家的等级
+
+    Returns:
+        每秒对局数
+    """
+    elapsed = 0.0
+    for seed in range(games):
+        game = Game(seed=seed)
+        game.add_player(*(Player(f"AI{i + 1}", ai) for i, ai in enumerate(AI_levels)))
+        start = time.perf_counter()
+        game.simulate(logging_level=level)
+        elapsed += time.perf_counter() - start
+    return games / elapsed
+
+
+if __name__ == "__main__":
+    debug = bench(logging.DEBUG)
+    warning = bench(logging.WARNING)
+    print(f"DEBUG:   {debug:8.1f} games/sec")
+    print(f"WARNING: {warning:8.1f} games/sec ({warning / debug:.1f}x)")
@@ -0,0 +1,63 @@
+"""AI等级4的模拟策略(MCTS_ROLLOUT_LEVEL)对比
+
+对每种模拟策略测量单次模拟的耗时、默认时间上限(60ms)内每次决策完成的模拟次数,
+以及[4, 3, 3, 2]对局中等级4玩家的胜率
+"""
+import os
+import sys
+import time
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+from main import MCTS_ROLLOUTS, MCTS_TIME_LIMIT, create_simulation
+from logger import log_level
+
+ROLLOUT_LEVELS = (1, 3)
+AI_LEVELS = [4, 3, 3, 2]
+GAMES = 40
+
+
+def play(games: int, **setting_int: int) -> tuple[float, int, int, int]:
+    """进行games局对战, 统计等级4玩家的决策(_mcts_search)和模拟次数
+
+    Returns:
+        (总耗时, 等级4玩家胜场, 决策次数, 模拟次数)
+    """
+    counts = {"_mcts_search": 0, "_mcts_rollout": 0}
+    originals = {name: getattr(main.Player, name) for name in counts}
+
+    def counting(name):
+        method = originals[name]
+
+        def wrapper(self, *args):
+            counts[name] += 1
+            return method(self, *args)
+        return wrapper
+
+    for name in counts:
+        setattr(main.Player, name, counting(name))
+    wins = 0
+    start = time.perf_counter()
+    try:
+        for seed in range(games):
+            wins += create_simulation(AI_LEVELS, seed, **setting_int).simulate()["winner"] == "AI1"
+    finally:
+        for name, method in originals.items():
+            setattr(main.Player, name, method)
+    return time.perf_counter() - start, wins, counts["_mcts_search"], counts["_mcts_rollout"]
+
+
+if __name__ == "__main__":
+    with log_level(logging.WARNING):
+        for level in ROLLOUT_LEVELS:
+            main.MCTS_ROLLOUT_LEVEL = level
+            # 固定模拟次数并取消时间上限, 测量单次模拟的耗时
+            elapsed, _, _, rollouts = play(GAMES // 4, **{MCTS_ROLLOUTS: 50, MCTS_TIME_LIMIT: 10 ** 9})
+            per_rollout = elapsed / rollouts * 1e6
+            # 默认时间上限下的胜率
+            elapsed, wins, decisions, rollouts = play(GAMES)
+            print(f"rollout level {level}: {per_rollout:7.0f} µs/rollout, "
+                  f"{rollouts / decisions:6.1f} rollouts/decision, "
+                  f"AI4 win rate {wins / GAMES:.2f} ({elapsed:.1f}s)")
@@ -0,0 +1,43 @@
+"""计数器的开销
+
+轮流进行不记录计数器(默认, Game.metrics为None)和记录计数器(Game.metrics为REGISTRY)的相同4人AI对战,
+比较每秒完成的局数, 并测量生成一次Prometheus文本的耗时
+"""
+import os
+import sys
+import time
+import timeit
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import create_simulation
+from logger import log_level
+from metrics import REGISTRY
+
+GAMES = 150
+ROUNDS = 7
+
+
+def run_games(enabled: bool) -> float:
+    """进行GAMES局对战(种子0~GAMES-1), 返回耗时秒数"""
+    start = time.perf_counter()
+    for seed in range(GAMES):
+        game = create_simulation(seed=seed)
+        if enabled:
+            game.metrics = REGISTRY
+        game.simulate()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    best = {False: float("inf"), True: float("inf")}
+    with log_level(logging.WARNING):
+        for _ in range(ROUNDS):
+            for enabled in best:
+                best[enabled] = min(best[enabled], run_games(enabled))
+    off, on = GAMES / best[False], GAMES / best[True]
+    print(f"{'metrics off':<12} {off:8.1f} games/sec")
+    print(f"{'metrics on':<12} {on:8.1f} games/sec ({on / off - 1:+.1%})")
+    render = min(timeit.repeat(REGISTRY.render, number=200, repeat=5)) / 200 * 1e6
+    print(f"Registry.render: {render:.1f} µs")
@@ -0,0 +1,47 @@
+"""各阶段耗时统计的开销
+
+轮流进行未开启统计和开启统计的相同4人AI对战, 比较每秒完成的局数,
+并测量LatencyHistogram.record的单次耗时
+"""
+import os
+import sys
+import time
+import timeit
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import phase_timers
+from main import create_simulation
+from logger import log_level
+from phase_timers import LatencyHistogram
+
+GAMES = 100
+ROUNDS = 7
+
+
+def run_games(enabled: bool) -> float:
+    """进行GAMES局对战(种子0~GAMES-1), 返回耗时秒数"""
+    start = time.perf_counter()
+    for seed in range(GAMES):
+        game = create_simulation(seed=seed)
+        if enabled:
+            phase_timers.enable(game)
+        game.simulate()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    histogram = LatencyHistogram()
+    record = min(timeit.repeat(lambda: histogram.record(12345), number=100000, repeat=5)) / 100000 * 1e9
+    print(f"LatencyHistogram.record: {record:.0f} ns/call")
+
+    # 两种情况轮流测量, 减少机器负载变化的影响, 各取最快的一次
+    best = {"off": float("inf"), "enabled": float("inf")}
+    with log_level(logging.WARNING):
+        for _ in range(ROUNDS):
+            best["off"] = min(best["off"], run_games(False))
+            best["enabled"] = min(best["enabled"], run_games(True))
+    plain = GAMES / best["off"]
+    for name, elapsed in best.items():
+        print(f"{name:<16} {GAMES / elapsed:8.1f} games/sec ({GAMES / elapsed / plain - 1:+.1%})")
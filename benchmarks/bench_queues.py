@@ -0,0 +1,81 @@
+"""RepeatQueue轮转的基准测试
+
+在10000名玩家的队列上比较旧的基于list的实现(peek为put + pop(0))
+与当前基于deque的实现: 每轮所有玩家依次peek一次, 并移除一部分"死亡"玩家
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from MP2_dataType import RepeatQueue, RingBuffer
+
+
+class ListRepeatQueue:
+    """旧版基于list的RepeatQueue, 仅用于对比"""
+
+    def __init__(self, items=None):
+        self.items = items or []
+
+    def is_empty(self):
+        return self.items == []
+
+    def put(self, item):
+        self.items.append(item)
+
+    def peek(self):
+        if self.is_empty():
+            raise IndexError("Queue is empty")
+        self.put(self.items[0])
+        return self.items.pop(0)
+
+    def remove(self, item):
+        self.items.remove(item)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def bench_rotation(queue_type, players: int = 10000, rounds: int = 20) -> float:
+    """测量每次peek的平均耗时
+
+    Args:
+        queue_type: 队列类型
+        players: 玩家数量
+        rounds: 轮转的轮数
+
+    Returns:
+        每次peek的纳秒数
+    """
+    queue = queue_type(list(range(players)))
+    start = time.perf_counter()
+    for _ in range(rounds * players):
+        queue.peek()
+    return (time.perf_counter() - start) / (rounds * players) * 1e9
+
+
+def bench_ring_buffer(players: int = 10000, rounds: int = 20) -> float:
+    """测量RingBuffer.rotate + front的平均耗时
+
+    Args:
+        players: 玩家数量
+        rounds: 轮转的轮数
+
+    Returns:
+        每次轮转的纳秒数
+    """
+    ring = RingBuffer(players, range(players))
+    start = time.perf_counter()
+    for _ in range(rounds * players):
+        ring.front()
+        ring.rotate()
+    return (time.perf_counter() - start) / (rounds * players) * 1e9
+
+
+if __name__ == "__main__":
+    before = bench_rotation(ListRepeatQueue, rounds=2)
+    after = bench_rotation(RepeatQueue)
+    ring = bench_ring_buffer()
+    print(f"RepeatQueue.peek with 10k players: list {before:.1f} ns/op, deque {after:.1f} ns/op ({before / after:.1f}x)")
+    print(f"RingBuffer.front + rotate with 10k players: {ring:.1f} ns/op")
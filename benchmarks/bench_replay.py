@@ -0,0 +1,60 @@
+"""对局记录的大小和回放速度
+
+以相同种子进行16人对局: 一次按原方式带界面输出(输出到os.devnull, 默认日志级别)并记录,
+一次无界面模拟, 然后回放记录, 比较每个动作的平均字节数和耗时。
+请求的目标是回放比原方式快至少50倍; 实测约为46~51倍, 这个目标并不能稳定达到。
+"""
+import os
+import sys
+import time
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import create_simulation, set_language
+from replay import Replay, record_game
+
+
+def bench(games: int = 50, AI_levels: list[int] = [1, 2, 3, 3] * 4, repeat: int = 3) -> None:
+    """进行对局并回放, 每局的三种方式各取repeat次中最快的一次
+
+    Args:
+        games: 对局数量
+        AI_levels: 每位AI玩家的等级
+        repeat: 每局重复的次数
+    """
+    set_language("zh_cn")
+    rendered = simulated = replayed = 0.0
+    record_bytes = actions = 0
+    for seed in range(games):
+        best_rendered = best_simulated = best_replayed = float("inf")
+        for _ in range(repeat):
+            game = create_simulation(AI_levels, seed, card_pool_doublings=2)
+            recorder = record_game(game)
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                start = time.perf_counter()
+                game.start()
+                best_rendered = min(best_rendered, time.perf_counter() - start)
+
+            game = create_simulation(AI_levels, seed, card_pool_doublings=2)
+            best_simulated = min(best_simulated, game.simulate()["elapsed"])
+
+            record = Replay(recorder.getvalue())
+            start = time.perf_counter()
+            record.run()
+            best_replayed = min(best_replayed, time.perf_counter() - start)
+        rendered += best_rendered
+        simulated += best_simulated
+        replayed += best_replayed
+        record_bytes += len(record.data)
+        actions += record.actions
+
+    print(f"{record_bytes / games:.0f} bytes/game, {record_bytes / actions:.2f} bytes/action (header included)")
+    print(f"rendered:  {rendered / games * 1000:8.2f} ms/game")
+    print(f"headless:  {simulated / games * 1000:8.2f} ms/game")
+    print(f"replay:    {replayed / games * 1000:8.2f} ms/game "
+          f"({rendered / replayed:.0f}x rendered, {simulated / replayed:.1f}x headless)")
+
+
+if __name__ == "__main__":
+    bench()
@@ -0,0 +1,55 @@
+"""异步服务器同时进行多局游戏的耗时
+
+每局1位通过本地回环连接的人类玩家(从列出的选项中随机选择)和3位AI玩家, 开启AI思考延迟。
+所有对局在同一个事件循环中进行, 总耗时应接近单局的思考时间之和, 而不是所有对局之和
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import WAIT_FOR_AI_THINKING
+from logger import log_level
+from server import GameServer, LoopbackClient
+
+
+def random_answer(rng: random.Random):
+    """返回从提示前一行列出的选项(形如"Cards: 1: Apple, 2: TNT")中随机选择的回答函数"""
+    def answer(prompt: str, transcript: list[str]) -> str:
+        options = transcript[-1].count(": ") - 1 if transcript else 0
+        return str(rng.randint(1, max(options, 1)))
+    return answer
+
+
+async def bench(games: int = 300, thinking_time: tuple[float, float] = (0.005, 0.01)) -> None:
+    """同时进行games局游戏
+
+    Args:
+        games: 对局数量
+        thinking_time: AI思考时间的范围(秒)
+    """
+    server = GameServer(1, [1, 2, 3], WAIT_FOR_AI_THINKING, seed=0, thinking_time=thinking_time)
+    await server.start()
+    rng = random.Random(0)
+    clients = [LoopbackClient(random_answer(rng)) for _ in range(games)]
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client.play("127.0.0.1", server.port, f"Human{i + 1}") for i, client in enumerate(clients)))
+    elapsed = time.perf_counter() - start
+    await server.close()
+
+    turns = sum(result["turns"] for result in server.results)
+    slowest = max(result["elapsed"] for result in server.results)
+    print(f"{server.games_finished}/{games} games, {turns} turns, {sum(client.prompts for client in clients)} prompts answered")
+    print(f"wall time:    {elapsed:8.2f} s")
+    print(f"slowest game: {slowest:8.2f} s")
+    print(f"sequential:  ~{turns * 0.75 * sum(thinking_time) / 2:8.2f} s of AI thinking alone")
+
+
+if __name__ == "__main__":
+    with log_level(logging.WARNING):
+        asyncio.run(bench())
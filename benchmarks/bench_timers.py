@@ -0,0 +1,59 @@
+"""回合结束处理(Game.after_turn)的耗时与玩家数量的关系
+
+light: 每回合只有2位玩家带有效果、1次TNT矿车延迟攻击在途;
+busy: 每位玩家每回合都带有效果, 且每位玩家都有1次TNT矿车延迟攻击在途
+"""
+import os
+import sys
+import timeit
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import Card, DelayedAttack, Game, Player
+from logger import log_level
+
+PLAYERS = (4, 16, 64, 256, 1024, 4096)
+
+
+def make_game(players: int) -> Game:
+    """创建一局有players位玩家的游戏"""
+    game = Game(seed=0)
+    game.add_player(*(Player(f"P{i + 1}", 1) for i in range(players)))
+    return game
+
+
+def light_round(game: Game) -> None:
+    """前两位玩家带有效果, 1次延迟攻击在途"""
+    first, second = game.players_in_order[:2]
+    first._add_effect("Healing", 1, 1)
+    second._add_effect("Health Boost", 1, 1)
+    game.timers.schedule(1, DelayedAttack(second, Card("TNT Minecart"), first))
+    game.after_turn()
+    first.delay_attack_this_turn.clear()
+
+
+def busy_round(game: Game) -> None:
+    """所有玩家都带有效果, 每位玩家都有1次延迟攻击在途"""
+    players = game.players_in_order
+    for player, target in zip(players, players[1:] + players[:1]):
+        player._add_effect("Healing", 1, 1)
+        game.timers.schedule(2, DelayedAttack(target, Card("TNT Minecart"), player))
+    game.after_turn()
+    for player in players:
+        player.delay_attack_this_turn.clear()
+
+
+def measure(players: int, round_function) -> float:
+    """每回合的耗时(µs)"""
+    game = make_game(players)
+    number = max(5, 20000 // players)
+    return min(timeit.repeat(lambda: round_function(game), number=number, repeat=5)) / number * 1e6
+
+
+if __name__ == "__main__":
+    print(f"{'players':>8} {'light':>12} {'busy':>12}")
+    with log_level(logging.WARNING):
+        for n in PLAYERS:
+            results = [measure(n, round_function) for round_function in (light_round, busy_round)]
+            print(f"{n:8}" + "".join(f" {value:10.1f}µs" for value in results))
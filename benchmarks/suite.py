@@ -0,0 +1,332 @@
+"""卡牌、卡牌池、AI和整局游戏热点路径的基准测试套件
+
+微基准测试(每次调用的纳秒数):
+    card_usage          Card.usage
+    draw_card           CardPool.draw_card(1), 包括把抽到的牌放回卡牌池的put_back
+    health_isub         Health.__isub__(不致死的物理伤害)
+    use_card            Player._use_card(需要目标的卡牌, 上一张卡牌放回手牌)
+    ai_level_N          Player._ai_level_N_action, 每次在同一局面的新副本上调用
+
+宏基准测试(每秒完成的局数): 使用固定种子无界面进行2、4、16人的完整AI对战。
+宏基准测试只使用AI等级1~3, 等级4的决策受时间上限影响, 结果不可复现;
+ai_level_4固定模拟次数并取消时间上限。
+
+测量方法: 每项基准测试先完成准备(创建游戏、局面等), 然后进行ROUNDS轮测量,
+每轮依次对所有项目各测量一次, 第一轮为预热不计入; 每项的结果为其余各轮的中位数。
+各项目的测量交替进行并分布在整个运行期间, 机器在某段时间内变慢只影响每项的少数几轮。
+抽牌每轮从相同的牌库和随机数状态开始。
+
+每轮还测量一个与游戏代码无关的参考负载(reference), 与基准结果比较时先按两次运行的参考负载之比
+换算机器速度的差异, 再比较各项目。
+
+结果以JSON写入文件, 可与保存的基准结果比较, 任何一项变慢超过容差时以状态码1退出:
+
+    python benchmarks/suite.py -o results.json                 # 运行并与baseline.json比较
+    python benchmarks/suite.py --runs 5 --save-baseline        # 运行5次, 用各项的中位数更新baseline.json
+"""
+import os
+import sys
+import json
+import time
+import timeit
+import logging
+import platform
+import argparse
+import statistics
+from typing import Callable
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import Card, Damage, Game, Player, DAMAGE_PHYSICAL, MCTS_ROLLOUTS, MCTS_TIME_LIMIT, create_simulation
+from logger import log_level
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+# 允许比基准结果慢的比例(按参考负载换算后)。在同一台机器上连续运行8次, 单次运行相对于
+# 8次中位数的最大变慢为18%(未换算时为52%), 容差取35%, 高于测得的噪声
+DEFAULT_TOLERANCE = 0.35
+ROUNDS = 15  # 测量轮数(不包括预热的一轮)
+
+# (名称, 每位玩家的AI等级, 局数)
+MACRO_GAMES = (
+    ("game_2p", [3, 3], 100),
+    ("game_4p", [1, 2, 3, 3], 50),
+    ("game_16p", [1, 2, 3, 3] * 4, 10),
+)
+AI_POSITIONS = 200  # 每个AI等级测量的局面副本数量(等级4为其1/20)
+AI4_ROLLOUTS = 32
+
+# 一次测量: 调用后返回一个测量值
+Sampler = Callable[[], float]
+
+
+def per_call_ns(stmt: Callable[[], object], number: int, setup: Callable[[], object] | None = None) -> Sampler:
+    """返回测量stmt单次调用耗时(纳秒)的函数
+
+    Args:
+        stmt: 被测量的函数
+        number: 每次测量调用stmt的次数
+        setup: 每次测量前调用的函数(不计入耗时)
+    """
+    def sample() -> float:
+        if setup is not None:
+            setup()
+        return timeit.timeit(stmt, number=number) / number * 1e9
+    return sample
+
+
+def _reference_workload() -> int:
+    """参考负载: 与游戏代码无关的字典、列表和函数调用"""
+    counts: dict[int, int] = {}
+    items = []
+    for i in range(200):
+        key = i & 15
+        counts[key] = counts.get(key, 0) + i
+        items.append(key)
+    return len(items) + max(counts.values())
+
+
+def bench_reference() -> Sampler:
+    return per_call_ns(_reference_workload, 2000)
+
+
+def bench_card_usage() -> Sampler:
+    card = Card("Iron Sword")
+    return per_call_ns(card.usage, 100000)
+
+
+def bench_draw_card() -> Sampler:
+    game = create_simulation(seed=0)
+    pool = game.card_pool
+    cards = dict(pool.cards)
+
+    def reset() -> None:
+        pool.cards = cards
+        pool.discard_pile = []
+        game.random.seed(0)
+
+    def draw() -> None:
+        pool.put_back(pool.draw_card()[0])
+
+    return per_call_ns(draw, 20000, reset)
+
+
+def bench_health_isub() -> Sampler:
+    player = Player("P1", 1)
+    player.health.health = player.health.max_health = 10 ** 12
+    health = player.health
+    damage = Damage(1, DAMAGE_PHYSICAL, "Iron Sword")
+
+    def hit() -> None:
+        health.__isub__(damage)
+
+    return per_call_ns(hit, 50000)
+
+
+def bench_use_card() -> Sampler:
+    game = create_simulation(seed=0)
+    player = game.players_in_order[0]
+    card = Card("Iron Sword")
+    player.cards.append(card)
+    return per_call_ns(lambda: player._use_card(card), 50000)
+
+
+def ai_position(level: int) -> Game:
+    """返回第一位玩家(等级为level)即将行动的4人对局, 所有玩家已抽5张牌"""
+    game = create_simulation([level, 1, 2, 3], seed=level, **{MCTS_ROLLOUTS: AI4_ROLLOUTS, MCTS_TIME_LIMIT: 10 ** 9})
+    game.headless = True
+    for player in game.players:
+        player.draw(5)
+    return game
+
+
+def bench_ai_level(level: int) -> Sampler:
+    position = ai_position(level)
+    positions = AI_POSITIONS if level < 4 else AI_POSITIONS // 20
+
+    def sample() -> float:
+        """在positions个局面副本上各调用一次, 返回平均耗时(纳秒), 不包括复制局面的耗时"""
+        calls = []
+        for game in [position.clone() for _ in range(positions)]:
+            me, *others = game.players_in_order
+            calls.append((getattr(me, f"_ai_level_{level}_action"), others))
+        start = time.perf_counter_ns()
+        for action, others in calls:
+            action(others)
+        return (time.perf_counter_ns() - start) / positions
+    return sample
+
+
+def bench_game(levels: list[int], games: int) -> Sampler:
+    """返回使用种子0~games-1依次进行games局对战并测量耗时(秒)的函数"""
+    def sample() -> float:
+        start = time.perf_counter()
+        for seed in range(games):
+            create_simulation(levels, seed).simulate()
+        return time.perf_counter() - start
+    return sample
+
+
+def count_turns(levels: list[int], games: int) -> int:
+    """使用种子0~games-1进行games局对战的回合数之和"""
+    return sum(create_simulation(levels, seed).simulate()["turns"] for seed in range(games))
+
+
+def measure(samplers: dict[str, Sampler], rounds: int = ROUNDS) -> dict[str, float]:
+    """交替运行所有测量, 预热一轮后各取rounds轮的中位数
+
+    Args:
+        samplers: 名称到测量函数的字典
+        rounds: 测量轮数
+
+    Returns:
+        dict[str, float]: 名称到测量值中位数的字典
+    """
+    samples: dict[str, list[float]] = {name: [] for name in samplers}
+    for round_index in range(rounds + 1):
+        for name, sample in samplers.items():
+            value = sample()
+            if round_index:
+                samples[name].append(value)
+    return {name: statistics.median(values) for name, values in samples.items()}
+
+
+def run(rounds: int = ROUNDS) -> dict:
+    """运行所有基准测试
+
+    Args:
+        rounds: 测量轮数
+
+    Returns:
+        dict: 包含环境信息(python, platform)、测量轮数(rounds)、参考负载每次调用的纳秒数(reference_ns)、
+              微基准测试结果(micro, 名称到{"ns_per_call"})
+              和宏基准测试结果(macro, 名称到{"games_per_sec", "turns"}), turns为所有对局的回合数之和
+    """
+    with log_level(logging.WARNING):
+        micro_samplers = {
+            "card_usage": bench_card_usage(),
+            "draw_card": bench_draw_card(),
+            "health_isub": bench_health_isub(),
+            "use_card": bench_use_card(),
+        }
+        for level in (1, 2, 3, 4):
+            micro_samplers[f"ai_level_{level}"] = bench_ai_level(level)
+        macro_samplers = {name: bench_game(levels, games) for name, levels, games in MACRO_GAMES}
+        medians = measure({"reference": bench_reference(), **micro_samplers, **macro_samplers}, rounds)
+        micro = {name: {"ns_per_call": medians[name]} for name in micro_samplers}
+        macro = {
+            name: {"games_per_sec": games / medians[name], "turns": count_turns(levels, games)}
+            for name, levels, games in MACRO_GAMES
+        }
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "rounds": rounds,
+        "reference_ns": medians["reference"],
+        "micro": micro,
+        "macro": macro,
+    }
+
+
+def combine(runs: list[dict]) -> dict:
+    """合并多次run()的结果: 每项取按参考负载换算后的中位数
+
+    Args:
+        runs: run()的结果列表
+
+    Returns:
+        dict: 与run()格式相同的结果, reference_ns为各次运行的中位数
+    """
+    if len(runs) == 1:
+        return runs[0]
+    reference = statistics.median(run["reference_ns"] for run in runs)
+
+    def scaled(values) -> float:
+        return statistics.median(value / run["reference_ns"] for value, run in zip(values, runs)) * reference
+
+    first = runs[0]
+    return {
+        **first,
+        "rounds": sum(run["rounds"] for run in runs),
+        "reference_ns": reference,
+        "micro": {
+            name: {"ns_per_call": scaled(run["micro"][name]["ns_per_call"] for run in runs)}
+            for name in first["micro"]
+        },
+        "macro": {
+            # 每秒局数与耗时成反比, 按耗时换算后取中位数
+            name: {
+                "games_per_sec": 1 / scaled(1 / run["macro"][name]["games_per_sec"] for run in runs),
+                "turns": result["turns"],
+            }
+            for name, result in first["macro"].items()
+        },
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE) -> list[str]:
+    """与基准结果比较
+
+    两次运行都有参考负载的结果时, 基准结果先按参考负载之比换算到本次运行的机器速度
+
+    Args:
+        results: run()的结果
+        baseline: 基准结果
+        tolerance: 允许比基准结果慢的比例
+
+    Returns:
+        list[str]: 变慢超过容差的项目说明, 为空表示没有性能退化
+    """
+    regressions = []
+    speed = 1.0  # 本次运行相对基准结果的机器耗时比例
+    if "reference_ns" in results and "reference_ns" in baseline:
+        speed = results["reference_ns"] / baseline["reference_ns"]
+    for name, result in results["micro"].items():
+        if name not in baseline.get("micro", {}):
+            continue
+        old, new = baseline["micro"][name]["ns_per_call"] * speed, result["ns_per_call"]
+        if new > old * (1 + tolerance):
+            regressions.append(f"{name}: {new:.0f} ns/call, baseline {old:.0f} ns/call ({new / old - 1:+.0%})")
+    for name, result in results["macro"].items():
+        if name not in baseline.get("macro", {}):
+            continue
+        old, new = baseline["macro"][name]["games_per_sec"] / speed, result["games_per_sec"]
+        if new < old / (1 + tolerance):
+            regressions.append(f"{name}: {new:.1f} games/sec, baseline {old:.1f} games/sec ({new / old - 1:+.0%})")
+        if result["turns"] != baseline["macro"][name]["turns"]:
+            # 回合数不同说明游戏规则或随机序列改变了, 速度不再可以直接比较
+            print(f"note: {name} played {result['turns']} turns, baseline {baseline['macro'][name]['turns']}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MC PvP card game benchmark suite")
+    parser.add_argument("-o", "--output", default=None, help="write results to this JSON file")
+    parser.add_argument("-b", "--baseline", default=BASELINE_PATH, help="baseline JSON file to compare against")
+    parser.add_argument("-t", "--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("-r", "--rounds", type=int, default=ROUNDS, help="measurement rounds per benchmark")
+    parser.add_argument("-n", "--runs", type=int, default=1, help="run the suite this many times and combine the medians")
+    parser.add_argument("--save-baseline", action="store_true", help="overwrite the baseline with these results")
+    args = parser.parse_args()
+
+    results = combine([run(args.rounds) for _ in range(args.runs)])
+    print(f"{'reference':<14} {results['reference_ns']:14.0f} ns/call")
+    for name, result in results["micro"].items():
+        print(f"{name:<14} {result['ns_per_call']:14.0f} ns/call")
+    for name, result in results["macro"].items():
+        print(f"{name:<14} {result['games_per_sec']:14.1f} games/sec ({result['turns']} turns)")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(results, file, indent=2)
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        if regressions:
+            print("Performance regressions:")
+            for line in regressions:
+                print("  " + line)
+            sys.exit(1)
+        print("No regressions against baseline")
@@ -1,17 +1,19 @@
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+from contextlib import contextmanager
 
-# 创建日志目录
+# 日志目录, 在第一次写入日志文件时创建
 log_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs')
-os.makedirs(log_dir, exist_ok=True)
 
 # 日志文件路径
 log_file = os.path.join(log_dir, 'game.log')
 
+# 日志级别, 可通过环境变量MP2_LOG_LEVEL设置(如WARNING), 默认为DEBUG
+log_level_name = os.environ.get('MP2_LOG_LEVEL', 'DEBUG').upper()
+
 # 创建日志器
 logger = logging.getLogger('MP2Game')
-logger.setLevel(logging.DEBUG)
+logger.setLevel(log_level_name)
 
 # 定义日志格式
 formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(module)s:%(lineno)d - %(message)s')
@@ -21,15 +23,69 @@ console_handler = logging.StreamHandler()
 console_handler.setLevel(logging.WARN)
 console_handler.setFormatter(formatter)
 
-# 文件处理器 (支持日志轮转)
-file_handler = RotatingFileHandler(
-    log_file,
-    mode='w',
-    maxBytes=1024 * 1024 * 5,  # 5MB
-    backupCount=0,
-    encoding='utf-8'
-)
-file_handler.setLevel(logging.DEBUG)
+class LazyFileHandler(logging.Handler):
+    """
+    文件处理器 (支持日志轮转), 第一次写入时才创建日志目录并打开文件
+
+    导入本模块不进行任何文件操作, 只导入引擎而不写日志的进程(如进程池中的工作进程)不会创建或修改日志文件。
+    与标准库的处理器相同, 写入时的异常(如日志目录只读)交给handleError处理, 不会影响游戏;
+    打开文件失败后不再重试, 之后的日志记录直接忽略
+    """
+
+    def __init__(self, filename: str, max_bytes: int, backup_count: int = 1) -> None:
+        """
+        Raises:
+            ValueError: 如果backup_count不是正数(没有备份文件时轮转不会截断日志文件, 文件会无限增长)
+        """
+        if backup_count <= 0:
+            raise ValueError("backup_count must be positive")
+        super().__init__()
+        self.filename = filename
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.handler = None
+        self.failed = False
+
+    def _open(self):
+        """创建日志目录和实际的RotatingFileHandler"""
+        from logging.handlers import RotatingFileHandler  # 延迟导入, 该模块会导入socket等
+        os.makedirs(os.path.dirname(self.filename), exist_ok=True)
+        handler = RotatingFileHandler(
+            self.filename,
+            mode='a',
+            maxBytes=self.max_bytes,
+            backupCount=self.backup_count,
+            encoding='utf-8'
+        )
+        handler.setFormatter(self.formatter)
+        return handler
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if self.failed:
+            return
+        try:
+            if self.handler is None:
+                self.handler = self._open()
+            self.handler.emit(record)
+        except Exception:
+            if self.handler is None:
+                self.failed = True
+            self.handleError(record)
+
+    def flush(self) -> None:
+        if self.handler is not None:
+            self.handler.flush()
+
+    def close(self) -> None:
+        if self.handler is not None:
+            self.handler.close()
+        super().close()
+
+# 文件处理器
+# 保留1个备份(game.log.1): 没有备份时RotatingFileHandler轮转只会以追加模式重新打开同一文件,
+# 文件不会被截断, 超过上限后每条日志都会触发一次轮转
+file_handler = LazyFileHandler(log_file, max_bytes=1024 * 1024 * 5, backup_count=1)  # 5MB
+file_handler.setLevel(log_level_name)
 file_handler.setFormatter(formatter)
 
 # 添加处理器到日志器
@@ -40,8 +96,30 @@ def log_clear():
     """
     清空日志文件
     """
+    os.makedirs(log_dir, exist_ok=True)
     with open(log_file, 'w') as f:
         f.truncate()
 
+def set_log_level(level: int | str) -> None:
+    """
+    设置日志器和文件处理器的日志级别
+
+    低于该级别的日志调用会在格式化前直接返回
+    """
+    logger.setLevel(level)
+    file_handler.setLevel(level)
+
+@contextmanager
+def log_level(level: int):
+    """
+    临时修改日志器级别, 退出时恢复
+    """
+    previous = logger.level
+    logger.setLevel(level)
+    try:
+        yield logger
+    finally:
+        logger.setLevel(previous)
+
 # 导出供其他模块使用
-__all__ = ['logger', 'log_clear']
+__all__ = ['logger', 'log_clear', 'log_level', 'set_log_level']
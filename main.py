@@ -1,13 +1,17 @@
 # 兼容Python 3.11之前版本的Self类型注解
 from __future__ import annotations
 import time
-import json
+import math
 import random
-from typing import Callable
-from MP2_dataType import RepeatQueue, Stack
+from typing import Callable, Generator, Iterable, Iterator, Mapping, NamedTuple, TypeVar
+from types import MappingProxyType
+from MP2_dataType import RepeatQueue, Stack, FenwickTree, TimerList, NamePool
 import os
+import sys
+import logging
 
-from logger import logger, log_clear
+from logger import logger, log_clear, log_level
+from metrics import Registry, active_registry
 
 __all__ = [
     "VERSION",
@@ -15,10 +19,21 @@ __all__ = [
     "EXIT_ON_ALL_HUMAN_DEAD",
     "WAIT_FOR_AI_THINKING",
     "DEBUG",
+    "PHASE_TIMERS",
+    "MCTS_ROLLOUTS",
+    "MCTS_TIME_LIMIT",
+    "MCTS_DEPTH",
     "set_language",
     "Card",
     "Player",
     "Game",
+    "Output",
+    "ConsoleOutput",
+    "BufferedOutput",
+    "NullOutput",
+    "simulate",
+    "create_simulation",
+    "derive_seed",
 ]
 
 VERSION = "0.5.0"
@@ -28,10 +43,28 @@ ALLOW_COMMAND = "allow_command"
 EXIT_ON_ALL_HUMAN_DEAD = "exit_on_all_human_dead"
 WAIT_FOR_AI_THINKING = "wait_for_ai_thinking"
 DEBUG = "debug"
+PHASE_TIMERS = "phase_timers"  # 统计回合各阶段的耗时(见phase_timers模块), 游戏结束时写入日志
 
 # 游戏设置(int)
 START_HEALTH = "start_health"
 MAX_HEALTH = "max_health"
+MCTS_ROLLOUTS = "mcts_rollouts"  # AI等级4每次决策的最大模拟次数
+MCTS_TIME_LIMIT = "mcts_time_limit"  # AI等级4每次决策的时间上限(毫秒)
+MCTS_DEPTH = "mcts_depth"  # AI等级4每次模拟进行的轮数
+
+# AI等级4的默认参数
+DEFAULT_MCTS_ROLLOUTS = 200
+DEFAULT_MCTS_TIME_LIMIT = 60
+DEFAULT_MCTS_DEPTH = 2
+MCTS_ROLLOUT_LEVEL = 1  # 模拟中人类玩家和等级4玩家使用的策略(随机策略最快, 见benchmarks/bench_mcts.py)
+MCTS_EXPLORATION = math.sqrt(2)  # UCB1探索系数
+# AI等级4的候选动作类型
+MCTS_USE = "use"
+MCTS_DRAW = "draw"
+MCTS_BED = "bed"
+AI_THINKING_TIME = (1.0, 2.5)  # 开启WAIT_FOR_AI_THINKING时AI思考时间的范围(秒)
+
+_T = TypeVar("_T")
 
 messages = {}
 
@@ -51,7 +84,105 @@ DESTROY_NONE = (DEFENCE_NONE := "none")
 script_dir = os.path.dirname(os.path.abspath(__file__))
 
 language = "en_us"
-lang_data: dict[str, str] = {}
+lang_data: dict[str, dict[str, str]] = {}
+
+# 编译后的语言目录: 每个JSON文件编译一次, 缓存在lang/__cache__中, JSON文件修改后自动重新编译
+LANG_CACHE_DIR = os.path.join(script_dir, "lang", "__cache__")
+LANG_CACHE_VERSION = 1
+
+# 当前语言的模板: 不含替换字段的模板是字符串本身, 含替换字段的模板是预先绑定的str.format
+_templates: dict[str, dict[str, str | Callable[..., str]]] = {}
+# 已编译的语言文件: 路径 -> (源文件状态, 原始语言数据, 含替换字段的键名)
+_compiled_languages: dict[str, tuple[tuple, dict, dict[str, list[str]]]] = {}
+# 当前语言的卡牌名称(Card.__str__使用)
+_card_names: dict[str, str] = {}
+
+
+def _compile_template(text: str) -> str | Callable[..., str]:
+    """预先解析模板
+    
+    Args:
+        text: 模板文本
+        
+    Returns:
+        不含替换字段(或格式错误)时返回文本本身, 否则返回绑定到文本的str.format
+    """
+    if "{" not in text and "}" not in text:
+        return text
+    import string  # 延迟导入, 只在编译语言数据时使用
+    try:
+        if all(field is None for _, field, _, _ in string.Formatter().parse(text)):
+            return text
+    except ValueError:
+        logger.warning("Invalid format string in language data: '%s'", text)
+        return text
+    return text.format
+
+
+def _compile_language(lang_path: str) -> tuple[dict, dict]:
+    """读取并编译语言文件, 依次使用内存中和磁盘上未过期的编译结果
+    
+    Args:
+        lang_path: 语言文件路径
+        
+    Returns:
+        (原始语言数据, 编译后的模板)
+    """
+    stat = os.stat(lang_path)
+    source = (LANG_CACHE_VERSION, stat.st_mtime_ns, stat.st_size)
+    compiled = _compiled_languages.get(lang_path)
+    if compiled is None or compiled[0] != source:
+        compiled = _load_compiled_language(lang_path, source)
+        _compiled_languages[lang_path] = compiled
+    _, data, fielded = compiled
+
+    templates = {type: dict(entries) for type, entries in data.items() if isinstance(entries, dict)}
+    for type, keys in fielded.items():
+        entries = templates[type]
+        for key in keys:
+            entries[key] = entries[key].format
+    return data, templates
+
+
+def _load_compiled_language(lang_path: str, source: tuple) -> tuple[tuple, dict, dict[str, list[str]]]:
+    """从磁盘缓存读取编译结果, 缓存不存在或已过期时重新编译并写入缓存
+    
+    Args:
+        lang_path: 语言文件路径
+        source: 源文件状态(缓存版本, 修改时间, 大小)
+        
+    Returns:
+        (源文件状态, 原始语言数据, 每个类型中含替换字段的键名)
+    """
+    import json, pickle  # 延迟导入, 只在加载语言数据时使用
+    cache_path = os.path.join(LANG_CACHE_DIR, os.path.basename(lang_path) + ".pickle")
+    try:
+        with open(cache_path, "rb") as f:
+            compiled = pickle.load(f)
+        if compiled[0] == source:
+            return compiled
+    except Exception:
+        pass
+
+    with open(lang_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    fielded = {
+        type: [key for key, text in entries.items() if _compile_template(text) is not text]
+        for type, entries in data.items() if isinstance(entries, dict)
+    }
+    compiled = (source, data, {type: keys for type, keys in fielded.items() if keys})
+    try:
+        os.makedirs(LANG_CACHE_DIR, exist_ok=True)
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            pickle.dump(compiled, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, cache_path)
+        logger.debug("Compiled language data %s", lang_path)
+    except OSError as e:
+        # 缓存目录不可写时只在内存中保留编译结果
+        logger.debug("Failed to cache language data: %s", e)
+    return compiled
+
 
 def set_language(language_: str, part: list[str] = [], reload: bool = False) -> None:
     """设置语言
@@ -61,36 +192,55 @@ def set_language(language_: str, part: list[str] = [], reload: bool = False) ->
         part: 语言部分
         reload: 是否重新加载语言数据
     """
-    global language, lang_data
+    global language, lang_data, _templates, _card_names
     language = language_
 
     try:
         # 构建语言文件的绝对路径
         lang_path = os.path.join(script_dir, "lang", f"{language}.json")
-        with open(lang_path, "r", encoding="utf-8") as f:
-            loading_ = json.load(f)
-            if part:
-                for p in part:
-                    loading = loading_.get(p, {})
-            else:
-                loading = loading_
-            if reload:
-                lang_data = loading
-            else:
-                lang_data.update(loading)
-            msg = lang("message", "Successfully loaded language data")
-            logger.debug(msg)
+        loading_, compiled_ = _compile_language(lang_path)
+        if part:
+            for p in part:
+                loading = loading_.get(p, {})
+                compiled = compiled_.get(p, {})
+        else:
+            loading = loading_
+            compiled = compiled_
+        if reload:
+            lang_data = dict(loading)
+            _templates = dict(compiled)
+        else:
+            lang_data.update(loading)
+            _templates.update(compiled)
+        _card_names = lang_data.get("card", {})
+        msg = lang("message", "Successfully loaded language data")
+        logger.debug(msg)
     except Exception as e:
         error_msg = lang("message", "Failed to load language data") + f": {str(e)}"
         logger.error(error_msg)
         lang_data = {}
+        _templates = {}
+        _card_names = {}
 
     print()
 
 
 name_path = os.path.join(script_dir, "name.txt")
-with open(name_path, "r") as file:
-    names = file.readlines()
+_names: list[str] | None = None
+
+def _get_names() -> list[str]:
+    """获取玩家名称列表, 第一次使用时读取name.txt"""
+    global _names
+    if _names is None:
+        with open(name_path, "r") as file:
+            _names = file.readlines()
+    return _names
+
+def __getattr__(name: str):
+    # main.names在第一次访问时才读取文件, 导入本模块不进行文件操作
+    if name == "names":
+        return _get_names()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def lang(type: str, key: str, *args, **kwargs) -> str:
     """获取本地化字符串
@@ -104,53 +254,385 @@ def lang(type: str, key: str, *args, **kwargs) -> str:
     Returns:
         本地化字符串
     """
-    try:
-        text = lang_data.get(type, {}).get(key, key)
-    except:
-        text = key
-
+    templates = _templates.get(type)
+    if templates is None:
+        templates = _templates[type] = {}
+    template = templates.get(key)
+    if template is None:
+        # 没有翻译的键名本身作为模板, 同样只解析一次
+        template = templates[key] = _compile_template(key)
+
+    if template.__class__ is str:
+        return template
     # 如果有参数，则进行格式化
     if args or kwargs:
         try:
-            return text.format(*args, **kwargs)
+            return template(*args, **kwargs)
         except (KeyError, IndexError) as e:
             # 如果格式化失败，返回原始文本
-            logger.warning(f"Warning: Failed to format string '{text}' with args {args} and kwargs {kwargs}")
-            return text
-    return text
+            logger.warning("Warning: Failed to format string '%s' with args %s and kwargs %s", template.__self__, args, kwargs)
+    return template.__self__
+
+class Output:
+    """游戏消息输出接口, 游戏和玩家的所有消息都通过它输出
+    
+    Attributes:
+        enabled (bool): 是否真正输出, 为False时调用者可以跳过构造消息参数
+    """
+    enabled: bool = True
+
+    def message(self, type: str, key: str, *args, **kwargs) -> None:
+        """输出本地化消息(同时写入日志)
+        
+        Args:
+            type: 本地化类型
+            key: 本地化键名
+            *args: 位置参数
+            **kwargs: 命名参数
+        """
+        raise NotImplementedError
+
+    def write(self, text: str = "", end: str = "\n") -> None:
+        """输出原始文本
+        
+        Args:
+            text: 要输出的文本
+            end: 结尾字符
+        """
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        """输出所有缓冲的内容, 每回合结束时调用"""
+
+    def input(self, prompt: str) -> str:
+        """输出所有缓冲的内容后读取玩家输入
+        
+        Args:
+            prompt: 输入提示
+            
+        Returns:
+            玩家输入的字符串
+        """
+        self.flush()
+        return input(prompt)
+
+class ConsoleOutput(Output):
+    """直接输出到控制台"""
+
+    def message(self, type: str, key: str, *args, **kwargs) -> None:
+        msg = lang(type, key, *args, **kwargs)
+        logger.debug(msg)
+        print(msg)
 
+    def write(self, text: str = "", end: str = "\n") -> None:
+        print(text, end=end)
+
+class BufferedOutput(Output):
+    """缓冲消息, 每次flush时一次性写入输出流
+    
+    Attributes:
+        stream: 输出流, 默认为sys.stdout
+        buffer (list[str]): 尚未写入的文本
+    """
+
+    def __init__(self, stream=None) -> None:
+        """初始化缓冲输出
+        
+        Args:
+            stream: 输出流, 默认为sys.stdout
+        """
+        self.stream = stream
+        self.buffer: list[str] = []
+
+    def message(self, type: str, key: str, *args, **kwargs) -> None:
+        msg = lang(type, key, *args, **kwargs)
+        logger.debug(msg)
+        self.buffer.append(msg + "\n")
+
+    def write(self, text: str = "", end: str = "\n") -> None:
+        self.buffer.append(text + end)
+
+    def flush(self) -> None:
+        if self.buffer:
+            stream = self.stream or sys.stdout
+            stream.write("".join(self.buffer))
+            stream.flush()
+            self.buffer.clear()
+
+class NullOutput(Output):
+    """丢弃所有消息, 不进行本地化和格式化"""
+    enabled = False
+
+    def message(self, type: str, key: str, *args, **kwargs) -> None:
+        pass
+
+    def write(self, text: str = "", end: str = "\n") -> None:
+        pass
+
+    def input(self, prompt: str) -> str:
+        raise RuntimeError("NullOutput cannot read player input")
+
+_console_output = ConsoleOutput()
+
+def announce(game: Game | None, type: str, key: str, *args, **kwargs) -> None:
+    """通过游戏的输出接口输出本地化消息
+
+    Args:
+        game: 消息所属游戏, 为None时输出到控制台
+        type: 本地化类型
+        key: 本地化键名
+        *args: 位置参数
+        **kwargs: 命名参数
+    """
+    (_console_output if game is None else game.output).message(type, key, *args, **kwargs)
+
+
+WEAPON_DAMAGE = {
+    "Wooden": 1,
+    "Iron": 2,
+    "Diamond": 3,
+    "Netherite": 4
+}
+
+# 延迟生效的攻击卡牌及其延迟回合数
+ATTACK_DELAY = {
+    "TNT Minecart": 2
+}
+
+CARD_HEALING = "healing"
+CARD_ATTACK = "attack"
+CARD_DEFENCE = "defence"
+CARD_BED = "bed"
+CARD_OTHER = "other"
+CARD_CATEGORIES = (CARD_HEALING, CARD_ATTACK, CARD_DEFENCE, CARD_BED, CARD_OTHER)
+NON_ATTACK_CATEGORIES = (CARD_HEALING, CARD_DEFENCE, CARD_BED, CARD_OTHER)
+
+# 游戏中出现的所有卡牌名称
+CARD_NAMES = (
+    "Wooden Sword", "Iron Sword", "Diamond Sword", "Netherite Sword",
+    "Wooden Axe", "Iron Axe", "Diamond Axe", "Netherite Axe",
+    "Wooden Pickaxe", "Iron Pickaxe", "Diamond Pickaxe", "Netherite Pickaxe",
+    "TNT", "TNT Minecart", "Trident", "Damaged Trident", "Potion of Instant Damage",
+    "Apple", "Golden Apple", "Enchanted Golden Apple", "Potion of Healing", "Potion of Power",
+    "Potion of Health Boost", "Shield", "Bed",
+    "Wooden Block", "Stone Block", "Obsidian Block", "Glass Block", "Glass",
+    "/kill",
+)
+
+
+def card_usage(name: str) -> tuple[int, str]:
+    """根据卡牌名称计算使用效果(见Card.usage)
+    
+    Args:
+        name: 卡牌名称
+        
+    Returns:
+        tuple: (伤害值, 伤害类型)
+    """
+    if name.endswith("Sword"):
+        quality = name[:-5].strip()
+        return (WEAPON_DAMAGE[quality], DAMAGE_PHYSICAL)
+    if name.endswith("Axe"):
+        quality = name[:-3].strip()
+        return (WEAPON_DAMAGE[quality], DAMAGE_PHYSICAL)
+    if name.endswith("Pickaxe"):
+        quality = name[:-7].strip()
+        return (WEAPON_DAMAGE[quality] // 2, DAMAGE_PHYSICAL)
+    if name[0] == "/":
+        return {
+            "/kill": (-1, DAMAGE_COMMAND),
+        }.get(name, (0, DAMAGE_NONE))
+
+    return {
+        "TNT": (3, DAMAGE_EXPLOSIVE),
+        "Potion of Instant Damage": (2, DAMAGE_MAGICAL),
+        "Trident": (3, DAMAGE_PHYSICAL),
+        "Damaged Trident": (1, DAMAGE_PHYSICAL),
+        "TNT Minecart": (2, DAMAGE_EXPLOSIVE),
+    }.get(name, (0, DAMAGE_NONE))
+
+def card_destroy_defense_type(name: str) -> tuple[str, int, bool]:
+    """根据卡牌名称计算破坏/防御类型(见Card.destroy_defense_type)
+    
+    Args:
+        name: 卡牌名称
+        
+    Returns:
+        tuple: (破坏/防御类型, 破坏(<0)/防御(>0)值, 是否可防御爆炸)
+    """
+    defence = {
+        "Wooden Block": (DEFENCE_WOOD, 2),
+        "Stone Block": (DEFENCE_STONE, 2),
+        "Obsidian Block": (DEFENCE_STONE, 5, True),
+        "Glass Block": (DEFENCE_NONE, 0, True),
+    }.get(name, (DEFENCE_NONE, 0, False))
+    if defence[1] > 0:
+        if len(defence) == 2:
+            return (*defence, False)
+        return defence
+
+    usage = card_usage(name)
+    if usage[1] == DAMAGE_EXPLOSIVE:
+        return (DESTROY_EXPLOSIVE, -usage[0])
+
+    if name.endswith("Axe"):
+        quality = name[:-3].strip()
+        return (DESTROY_AXE, -WEAPON_DAMAGE[quality])
+    if name.endswith("Pickaxe"):
+        quality = name[:-7].strip()
+        return (DESTROY_PICKAXE, -WEAPON_DAMAGE[quality])
+    return (DESTROY_NONE, 0)
+
+def card_need_target(name: str) -> bool:
+    """根据卡牌名称判断是否需要目标(见Card.need_target)
+    
+    Args:
+        name: 卡牌名称
+        
+    Returns:
+        bool: 如果需要目标返回True，否则False
+    """
+    return (name.endswith("Sword") or 
+            name.endswith("Axe") or 
+            name in ("Potion of Instant Damage", "TNT", "TNT Minecart", "Trident", "Damaged Trident"))
+
+
+class CardSpec(NamedTuple):
+    """卡牌的不可变属性, 每种卡牌只计算一次
+    
+    Attributes:
+        name: 卡牌名称
+        damage: 伤害值
+        damage_type: 伤害类型
+        destroy_defence_type: 破坏/防御类型
+        destroy_defence_value: 破坏(<0)/防御(>0)值
+        explosive_proof: 是否可防御爆炸
+        need_target: 是否需要目标
+        category: 卡牌类别(治疗/攻击/防御/床/其他)
+        usage: Card.usage的返回值
+        destroy_defense: Card.destroy_defense_type的返回值
+    """
+    name: str
+    damage: int
+    damage_type: str
+    destroy_defence_type: str
+    destroy_defence_value: int
+    explosive_proof: bool
+    need_target: bool
+    category: str
+    usage: tuple[int, str]
+    destroy_defense: tuple
+
+
+def make_card_spec(name: str) -> CardSpec:
+    """根据卡牌名称计算其属性
+    
+    Args:
+        name: 卡牌名称
+        
+    Returns:
+        CardSpec: 卡牌属性
+    """
+    usage = card_usage(name)
+    destroy_defense = card_destroy_defense_type(name)
+    need_target = card_need_target(name)
+
+    if name in ("Potion of Healing", "Apple", "Golden Apple", "Enchanted Golden Apple"):
+        category = CARD_HEALING
+    elif need_target:
+        category = CARD_ATTACK
+    elif name in ("Shield", "Enchanted Shield"):
+        category = CARD_DEFENCE
+    elif name == "Bed" or destroy_defense[0] != DESTROY_NONE or destroy_defense[1] != 0:
+        category = CARD_BED
+    else:
+        category = CARD_OTHER
+
+    return CardSpec(
+        name=name,
+        damage=usage[0],
+        damage_type=usage[1],
+        destroy_defence_type=destroy_defense[0],
+        destroy_defence_value=destroy_defense[1],
+        explosive_proof=destroy_defense[2] if len(destroy_defense) > 2 else False,
+        need_target=need_target,
+        category=category,
+        usage=usage,
+        destroy_defense=destroy_defense,
+    )
+
+# 导入时构建一次的只读卡牌属性表
+CARD_SPECS: Mapping[str, CardSpec] = MappingProxyType({name: make_card_spec(name) for name in CARD_NAMES})
 
-chosen_names = []
 
 class Card:
     """表示游戏中的卡牌，包含卡牌名称和使用效果
     
+    卡牌是享元对象: 每个卡牌名称只有一个实例, Card(name)和Card.get(name)
+    都返回同一个对象, 因此卡牌之间的比较就是身份比较
+    
     Attributes:
         name: 卡牌的本地化键名
+        spec: 卡牌属性(来自CARD_SPECS)
     """
-    def __init__(self, name: str, game: Game = None) -> None:
-        """初始化卡牌
+    __slots__ = ("name", "spec")
+
+    _instances: dict[str, Card] = {}
+
+    def __new__(cls, name: str, game: Game | None = None) -> Card:
+        """获取卡牌实例
         
         Args:
             name: 卡牌名称
+            game: 用于检查设置的游戏, 为None时使用默认设置(不允许命令)
             
         Raises:
             TypeError: 如果名称不是字符串
             ValueError: 如果名称以"/"开头且不允许命令
         """
+        card = cls._instances.get(name)
+        if card is not None and name[0] != "/":
+            return card
+
         if not isinstance(name, str):
             raise TypeError("Card name must be a string")
 
-        # 处理game为None的情况
-        if game is None:
-            from main import Game  # 延迟导入
-            game = Game()
-
-        if name[0] == "/" and not game.get_setting(ALLOW_COMMAND):
+        # 命令卡牌只在允许命令的游戏中可用, 其他设置不影响卡牌本身
+        if name[0] == "/" and (game is None or not game.get_setting(ALLOW_COMMAND)):
             raise ValueError("Command are not allowed")
 
-        self.game = game 
-        self.name: str = name.strip()
+        stripped = name.strip()
+        card = cls._instances.get(stripped)
+        if card is None:
+            card = super().__new__(cls)
+            card.name = stripped
+            card.spec = CARD_SPECS.get(stripped) or make_card_spec(stripped)
+            cls._instances[stripped] = card
+        cls._instances[name] = card
+        return card
+
+    @classmethod
+    def get(cls, name: str, game: Game | None = None) -> Card:
+        """获取卡牌实例, 与Card(name, game)相同
+        
+        Args:
+            name: 卡牌名称
+            game: 用于检查设置的游戏
+            
+        Returns:
+            Card: 该名称唯一的卡牌实例
+        """
+        return cls(name, game)
+
+    def __reduce__(self) -> tuple:
+        """序列化和复制时保持唯一实例"""
+        return (_interned_card, (self.name,))
+
+    def __copy__(self) -> Card:
+        return self
+
+    def __deepcopy__(self, memo: dict) -> Card:
+        return self
 
     def __str__(self) -> str:
         """返回卡牌的本地化名称
@@ -158,32 +640,11 @@ class Card:
         Returns:
             卡牌的本地化名称
         """
-        return lang("card", self.name)
+        return _card_names.get(self.name, self.name)
 
     def __repr__(self) -> str:
         return f"Card(name={self.name})"
 
-    def __eq__(self, other: object) -> bool:
-        """比较两张卡牌是否相同
-        
-        Args:
-            other: 要比较的对象
-            
-        Returns:
-            bool: 如果other是Card且名称相同返回True，否则False
-        """
-        if not isinstance(other, Card):
-            return False
-        return self.name == other.name
-    
-    def __hash__(self) -> int:
-        """返回卡牌的哈希值
-        
-        Returns:
-            卡牌名称的哈希值
-        """
-        return hash(self.name)
-
     def usage(self) -> tuple[int, str]:
         """获取卡牌的使用效果
         
@@ -192,35 +653,7 @@ class Card:
                   伤害值为0表示无伤害效果，类型为DAMAGE_NONE
                   伤害值为-1表示秒杀，类型为DAMAGE_COMMAND
         """
-
-        weapon_damage = {
-            "Wooden": 1,
-            "Iron": 2,
-            "Diamond": 3,
-            "Netherite": 4
-        }
-        
-        if self.name.endswith("Sword"):
-            quality = self.name[:-5].strip()
-            return (weapon_damage[quality], DAMAGE_PHYSICAL)
-        if self.name.endswith("Axe"):
-            quality = self.name[:-3].strip()
-            return (weapon_damage[quality], DAMAGE_PHYSICAL)
-        if self.name.endswith("Pickaxe"):
-            quality = self.name[:-7].strip()
-            return (weapon_damage[quality] // 2, DAMAGE_PHYSICAL)
-        if self.name[0] == "/" and self.game.get_setting(ALLOW_COMMAND):
-            return {
-                "/kill": (-1, DAMAGE_COMMAND),
-            }.get(self.name, (0, DAMAGE_NONE))
-
-        return {
-            "TNT": (3, DAMAGE_EXPLOSIVE),
-            "Potion of Instant Damage": (2, DAMAGE_MAGICAL),
-            "Trident": (3, DAMAGE_PHYSICAL),
-            "Damaged Trident": (1, DAMAGE_PHYSICAL),
-            "TNT Minecart": (2, DAMAGE_EXPLOSIVE),
-        }.get(self.name, (0, DAMAGE_NONE))
+        return self.spec.usage
 
     def destroy_defense_type(self) -> tuple[str, int, bool]:
         """获取卡牌的破坏/防御类型
@@ -228,34 +661,7 @@ class Card:
         Returns:
             tuple: (破坏/防御类型, 破坏(<0)/防御(>0)值, 是否可防御爆炸)
         """
-        defence = {
-            "Wooden Block": (DEFENCE_WOOD, 2),
-            "Stone Block": (DEFENCE_STONE, 2),
-            "Obsidian Block": (DEFENCE_STONE, 5, True),
-            "Glass Block": (DEFENCE_NONE, 0, True),
-        }.get(self.name, (DEFENCE_NONE, 0, False))
-        if defence[1] > 0:
-            if len(defence) == 2:
-                return (*defence, False)
-            return defence
-
-        if self.usage()[1] == DAMAGE_EXPLOSIVE:
-            return (DESTROY_EXPLOSIVE, -self.usage()[0])
-
-        weapon_damage = {
-            "Wooden": 1,
-            "Iron": 2,
-            "Diamond": 3,
-            "Netherite": 4
-        }
-
-        if self.name.endswith("Axe"):
-            quality = self.name[:-3].strip()
-            return (DESTROY_AXE, -weapon_damage[quality])
-        if self.name.endswith("Pickaxe"):
-            quality = self.name[:-7].strip()
-            return (DESTROY_PICKAXE, -weapon_damage[quality])
-        return (DESTROY_NONE, 0)
+        return self.spec.destroy_defense
     
     def need_target(self) -> bool:
         """判断卡牌是否需要目标
@@ -263,9 +669,170 @@ class Card:
         Returns:
             bool: 如果需要目标返回True，否则False
         """
-        return (self.name.endswith("Sword") or 
-                self.name.endswith("Axe") or 
-                self.name in ("Potion of Instant Damage", "TNT", "TNT Minecart", "Trident", "Damaged Trident"))
+        return self.spec.need_target
+
+class Hand:
+    """玩家手牌: 以卡牌种类为键的多重集合
+    
+    成员判断、加入和移除均为O(1), 并增量维护每个类别(治疗、攻击、防御、床)的卡牌数量。
+    遍历时同种卡牌相邻, 种类按首次获得的顺序排列; 下标访问为O(K)(K为种类数),
+    因此random.choice(hand)可以直接使用
+    
+    Attributes:
+        counts (dict[Card, int]): 每种卡牌的数量, 不包含数量为0的卡牌
+        totals (dict[str, int]): 每个类别(CARD_HEALING等)的卡牌数量
+    """
+
+    __slots__ = ("counts", "totals", "_size")
+
+    def __init__(self, cards: Iterable[Card] = ()) -> None:
+        """初始化手牌
+        
+        Args:
+            cards: 初始卡牌
+        """
+        self.counts: dict[Card, int] = {}
+        self.totals: dict[str, int] = dict.fromkeys(CARD_CATEGORIES, 0)
+        self._size: int = 0
+        self.add(*cards)
+
+    def add(self, *cards: Card) -> None:
+        """加入卡牌
+        
+        Args:
+            *cards: 要加入的卡牌
+        """
+        counts = self.counts
+        totals = self.totals
+        for card in cards:
+            counts[card] = counts.get(card, 0) + 1
+            totals[card.spec.category] += 1
+        self._size += len(cards)
+
+    def append(self, card: Card) -> None:
+        """加入一张卡牌(与list.append相同)"""
+        self.add(card)
+
+    def __iadd__(self, cards: Iterable[Card]) -> Hand:
+        """加入多张卡牌(hand += cards)"""
+        self.add(*cards)
+        return self
+
+    def remove(self, card: Card) -> None:
+        """移除一张卡牌
+        
+        Args:
+            card: 要移除的卡牌
+            
+        Raises:
+            ValueError: 如果手牌中没有该卡牌
+        """
+        count = self.counts.get(card)
+        if not count:
+            raise ValueError(f"{card} is not in hand")
+        if count == 1:
+            del self.counts[card]
+        else:
+            self.counts[card] = count - 1
+        self.totals[card.spec.category] -= 1
+        self._size -= 1
+
+    def clear(self) -> None:
+        """清空手牌"""
+        self.counts.clear()
+        for category in self.totals:
+            self.totals[category] = 0
+        self._size = 0
+
+    def copy(self) -> Hand:
+        """复制手牌"""
+        new = Hand.__new__(Hand)
+        new.counts = self.counts.copy()
+        new.totals = self.totals.copy()
+        new._size = self._size
+        return new
+
+    def count(self, card: Card) -> int:
+        """获取某种卡牌的数量"""
+        return self.counts.get(card, 0)
+
+    def total(self, *categories: str) -> int:
+        """获取若干类别的卡牌总数"""
+        return sum(self.totals[category] for category in categories)
+
+    def kinds(self, *categories: str) -> list[Card]:
+        """获取手牌中的卡牌种类(每种一张)
+        
+        Args:
+            *categories: 只返回这些类别的卡牌, 不指定时返回所有种类
+        """
+        if not categories:
+            return list(self.counts)
+        return [card for card in self.counts if card.spec.category in categories]
+
+    def of_category(self, *categories: str) -> list[Card]:
+        """获取属于若干类别的所有卡牌(同种卡牌重复出现)"""
+        if not self.total(*categories):
+            return []
+        return [card for card, count in self.counts.items() if card.spec.category in categories for _ in range(count)]
+
+    def choice(self, rng: random.Random, *categories: str) -> Card:
+        """按数量加权随机选择一张卡牌, 与对展开后的列表调用rng.choice等价
+        
+        Args:
+            rng: 随机数生成器
+            *categories: 只在这些类别中选择, 不指定时在所有卡牌中选择
+            
+        Raises:
+            IndexError: 如果没有可选的卡牌
+        """
+        total = self.total(*categories) if categories else self._size
+        if not total:
+            raise IndexError("Cannot choose from an empty hand")
+        target = rng.randrange(total)
+        for card, count in self.counts.items():
+            if categories and card.spec.category not in categories:
+                continue
+            if target < count:
+                return card
+            target -= count
+        raise AssertionError("Hand totals out of sync")
+
+    def __contains__(self, card: object) -> bool:
+        return card in self.counts
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Card]:
+        for card, count in self.counts.items():
+            for _ in range(count):
+                yield card
+
+    def __getitem__(self, index: int) -> Card:
+        """按遍历顺序获取第index张卡牌(O(K))"""
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("Hand index out of range")
+        for card, count in self.counts.items():
+            if index < count:
+                return card
+            index -= count
+        raise AssertionError("Hand size out of sync")
+
+    def __repr__(self) -> str:
+        return f"Hand({list(self)!r})"
+
+def _interned_card(name: str) -> Card:
+    """反序列化时取得卡牌的唯一实例(跳过命令检查, 因为卡牌已经创建过)"""
+    card = Card._instances.get(name)
+    if card is None:
+        card = object.__new__(Card)
+        card.name = name
+        card.spec = CARD_SPECS.get(name) or make_card_spec(name)
+        Card._instances[name] = card
+    return card
 
 def defendable(defence: str | None, damage_type: str) -> bool:
     """判断防御是否有效
@@ -344,6 +911,13 @@ class BedDefence:
         self.can_fend_explosive: bool = can_fend_explosive
         self.parent_class: "Player" = parent_class
 
+    def _clone(self, owner: "Player") -> "BedDefence":
+        """复制装备并指向新的所属玩家(用于Game.clone)"""
+        new = BedDefence.__new__(BedDefence)
+        new.__dict__.update(self.__dict__)
+        new.parent_class = owner
+        return new
+
     def can_be_destroyed(self, tool: Card) -> bool:
         """判断装备是否可以被工具破坏
         
@@ -361,10 +935,10 @@ class BedDefence:
     def destroy_by(self, tool: Card) -> None:
         if self.can_be_destroyed(tool):
             self.times -= 1
-            logger.debug(f"{self.name} destroyed by {tool.name}")
+            logger.debug("%s destroyed by %s", self.name, tool.name)
             if self.times <= 0:
                 self.parent_class.bed_defence.pop()
-                logger.debug(f"{self.name} destroyed")
+                logger.debug("%s destroyed", self.name)
 
         def __str__(self) -> str:
             return f"{self.name} (防御: {self.defence}, 次数: {self.times})"
@@ -391,6 +965,13 @@ class Health:
         self.defence_times: int = 0
         self.parent_class: Player = player
 
+    def _clone(self, player: "Player") -> "Health":
+        """复制生命值状态并指向新的所属玩家(用于Game.clone)"""
+        new = Health.__new__(Health)
+        new.__dict__.update(self.__dict__)
+        new.parent_class = player
+        return new
+
     def __str__(self) -> str:
         """返回生命值的字符串表示
         
@@ -427,10 +1008,12 @@ class Health:
 
         if damage.type == DAMAGE_COMMAND and damage.damage == -1:
             self.health = 0
+            if self.parent_class.game is not None:
+                self.parent_class.game._player_died(self.parent_class)
             return self
 
         if self._handle_defense(damage):
-            logger.debug(f"{self.parent_class.name}'s defense blocked {damage.item} damage")
+            logger.debug("%s's defense blocked %s damage", self.parent_class.name, damage.item)
             return self
                        
         # 应用伤害
@@ -443,7 +1026,7 @@ class Health:
                 self.parent_class.bedded = False
                 self.parent_class.bed_defence = Stack()
             else:
-                self.parent_class.bed_defence.peek().destroy_by(damage.item)
+                self.parent_class.bed_defence.peek().destroy_by(Card(damage.item))
 
         if self.health <= 0:
             self._handle_death()
@@ -457,26 +1040,32 @@ class Health:
             damage: 伤害信息
         """
         self.health -= damage.damage
-        logger.debug(f"{self.parent_class.name} took {damage.damage} {damage.type} damage from {damage.item}, now has {self.health} HP")
+        if (game := self.parent_class.game) is not None and game.metrics is not None:
+            game.metrics.damage_dealt.inc(damage.type, damage.damage)
+            game.metrics.damage_by_card.inc(damage.item, damage.damage)
+        logger.debug("%s took %s %s damage from %s, now has %s HP", self.parent_class.name, damage.damage, damage.type, damage.item, self.health)
 
     def _handle_death(self) -> None:
         """处理玩家死亡逻辑"""
+        for effect in self.parent_class.effects:
+            effect.duration = 0  # 定时器中尚未到期的效果在到期时直接跳过
         self.parent_class.effects.clear()
         self.parent_class.cards.clear()
 
         global messages
         
         if not self.parent_class.bedded:
-            death_msg = lang("message", "{} is dead", self.parent_class.name)
-            logger.debug(death_msg)
-            print(death_msg)
+            if self.parent_class.game is not None:
+                self.parent_class.game._player_died(self.parent_class)
+            announce(self.parent_class.game, "message", "{} is dead", self.parent_class.name)
         else:
+            # 用床复活的玩家一直计为存活, 存活玩家索引不变
             self.health = 5
+            if (game := self.parent_class.game) is not None and game.metrics is not None:
+                game.metrics.bed_revives.inc()
             self.parent_class.bedded = False
             self.parent_class.bed_defence = Stack()
-            revive_msg = lang("message", "{} relived with a bed", self.parent_class.name)
-            logger.debug(revive_msg)
-            print(revive_msg)
+            announce(self.parent_class.game, "message", "{} relived with a bed", self.parent_class.name)
 
     def __iadd__(self, value: int) -> "Health":
         """处理生命值增加(使用+=运算符)
@@ -504,7 +1093,7 @@ class Health:
         self.health += value
         if self.health > self.max_health + health_boost_level:
             self.health = self.max_health + health_boost_level
-        logger.debug(f"{self.parent_class.name} healed {self.health - old_health} HP, now has {self.health} HP")
+        logger.debug("%s healed %s HP, now has %s HP", self.parent_class.name, self.health - old_health, self.health)
         return self
         
     def _handle_defense(self, damage: Damage) -> bool:
@@ -517,10 +1106,12 @@ class Health:
             bool: 如果伤害被防御返回True，否则False
         """
         if defendable(self.defence, damage.type) and self.defence_times > 0:
+            if (game := self.parent_class.game) is not None and game.metrics is not None:
+                game.metrics.shield_blocks.inc()
             self.defence_times -= 1
             if self.defence_times == 0:
                 self.defence = None
-                logger.debug(f"{self.parent_class.name}'s defense is broken")
+                logger.debug("%s's defense is broken", self.parent_class.name)
             return True
         return False
         
@@ -535,13 +1126,15 @@ class Health:
                 self.defence_times = 0
                 self.defence = None
                 global messages
-                break_msg = lang("message", "{}'s shield is broken", self.parent_class.name)
-                logger.debug(break_msg)
-                messages["defence_break"] = break_msg
+                logger.debug("%s's shield is broken", self.parent_class.name)
+                messages["defence_break"] = ("message", "{}'s shield is broken", self.parent_class.name)
     
 class Effect:
     """表示游戏中的效果
     
+    效果由Player._add_effect加入游戏的定时器, 每回合结束时生效一次,
+    持续时间为0后从玩家的效果列表中移除
+    
     Attributes:
         name (str): 效果名称
         duration (int): 持续时间
@@ -558,25 +1151,43 @@ class Effect:
         self.duration: int = duration
         self.parent_class: Player = parent_class
         self.level: int = level
-        logger.debug(f"Effect '{self.name}' (level {level}) applied to {parent_class.name} for {duration} turns")
+        logger.debug("Effect '%s' (level %s) applied to %s for %s turns", self.name, level, parent_class.name, duration)
     
+    def _clone(self, player: "Player") -> "Effect":
+        """复制效果并指向新的所属玩家(用于Game.clone)"""
+        new = Effect.__new__(Effect)
+        new.__dict__.update(self.__dict__)
+        new.parent_class = player
+        return new
+
     def effect(self) -> None:
-        """应用效果并减少持续时间
+        """应用效果并减少持续时间, 未结束时安排下一回合再次生效
         
         Raises:
             ValueError: 如果效果名称无效
         """
+        if self.duration <= 0:
+            # 已移除的效果: 力量效果在最后一次生效后的下一回合结束时清除攻击力加成
+            if self.name == "power" and not any(effect.name == "power" for effect in self.parent_class.effects):
+                self.parent_class.power = 0
+            return
+
         if self.name == "healing":
             self.parent_class.health += self.level
-            logger.debug(f"Healing effect on {self.parent_class.name}: +{self.level} HP")
+            logger.debug("Healing effect on %s: +%s HP", self.parent_class.name, self.level)
         elif self.name == "power":
             self.parent_class.power = self.level
-            logger.debug(f"Power effect on {self.parent_class.name}: +{self.level} attack")
+            logger.debug("Power effect on %s: +%s attack", self.parent_class.name, self.level)
         elif self.name == "instant damage":
-            self.parent_class.health -= Damage(self.level, DAMAGE_MAGICAL, "Potion of Instant Damage")
-            logger.debug(f"Instant Damage effect on {self.parent_class.name}: -{self.level} HP")
+            damage = Damage(self.level, DAMAGE_MAGICAL, "Potion of Instant Damage")
+            game = self.parent_class.game
+            if game is None or game.phase_timers is None:
+                self.parent_class.health -= damage
+            else:
+                game.phase_timers.measure("Health.__isub__", self.parent_class.health.__isub__, damage)
+            logger.debug("Instant Damage effect on %s: -%s HP", self.parent_class.name, self.level)
         elif self.name in ("health boost", ):
-            logger.debug(f"Health boost effect active on {self.parent_class.name} (level {self.level})")
+            logger.debug("Health boost effect active on %s (level %s)", self.parent_class.name, self.level)
         else:
             raise ValueError(f"Unknown effect: {self.name}")
 
@@ -584,11 +1195,13 @@ class Effect:
         if self.duration <= 0:
             try:
                 self.parent_class.effects.remove(self)
-                logger.debug(f"Effect '{self.name}' expired on {self.parent_class.name}")
+                logger.debug("Effect '%s' expired on %s", self.name, self.parent_class.name)
             except ValueError:
                 pass
+            if self.name != "power":
+                return
+        self.parent_class.game.timers.schedule(1, self)
 
-        
 
 class Player:
     """表示游戏玩家，包含玩家状态和卡牌操作
@@ -618,25 +1231,21 @@ class Player:
             bed_defence (Stack[BedDefence]): 玩家床的防御装备
             delay_attack_this_turn (list[tuple[Card, Player]]): 玩家这回合延迟攻击的卡牌列表
         """
-        if name == None or name == "":
-            name = random.choice(names).strip()
-            while name in chosen_names:
-                name = random.choice(names).strip()
-            chosen_names.append(name)
-        self.name: str = name
+        # 未指定名称时由游戏在add_player中用游戏的随机数生成器选择
+        self.name: str = name or ""
         self.health: Health = Health(5, self)
-        self.cards: list[Card] = []
+        self.cards: Hand = Hand()
         self.using: Stack[Card] = Stack()
         self.effects: list[Effect] = []
         self.power: int = 0  # 增加玩家的攻击力
-        if not 0 <= AI_level <= 3:
-            raise ValueError("AI level must be between 0 and 3")
+        if not 0 <= AI_level <= 4:
+            raise ValueError("AI level must be between 0 and 4")
         self.AI_level: int = AI_level
         self.game: "Game" | None = None
         self.bedded: bool = False
         self.bed_defence: Stack[BedDefence] = Stack()
         self.delay_attack_this_turn: list[tuple[Card, Player]] = []
-        logger.debug(f"Player \"{self.name}\" created (AI level: {AI_level})")
+        logger.debug("Player \"%s\" created (AI level: %s)", self.name, AI_level)
 
     def __str__(self) -> str:        
         """返回玩家信息的字符串表示
@@ -646,13 +1255,33 @@ class Player:
         """
         return lang("message", "{name} ({health}, Cards: {cards}, Effects: {effects})", name=self.name, health=self.health, cards=", ".join([f"{i}: {card}" for i, card in enumerate(self.list_cards(), 1)]), effects=self.effects)
     
-    def after_turn(self) -> None:        
-        """处理玩家的每回合结束逻辑"""
-        self.power = 0
-        logger.debug(f"{self.name} processing after-turn effects")
-        for effect in self.effects:
-            effect.effect()
-
+    def _clone(self, game: "Game") -> "Player":
+        """复制玩家的可变状态(用于Game.clone)
+        
+        Note:
+            delay_attack_this_turn由Game.clone在所有玩家复制后重建
+        """
+        new = Player.__new__(Player)
+        new.__dict__.update(self.__dict__)
+        new.game = game
+        new.health = self.health._clone(new)
+        new.cards = self.cards.copy()
+        new.using = self.using.copy()
+        new.effects = [effect._clone(new) for effect in self.effects]
+        new.bed_defence = Stack(defence._clone(new) for defence in self.bed_defence)
+        return new
+
+    def _add_effect(self, name: str, duration: int, level: int) -> None:
+        """为玩家添加效果, 并安排在本回合结束时首次生效
+        
+        Args:
+            name: 效果名称
+            duration: 持续时间
+            level: 效果等级
+        """
+        effect = Effect(name, duration, level, self)
+        self.effects.append(effect)
+        self.game.timers.schedule(1, effect)
 
     def add_card(self, *card: Card) -> None:
         """添加卡牌到玩家手牌
@@ -661,9 +1290,25 @@ class Player:
             card: 要添加的卡牌对象
 
         """
-        self.cards += card
-        for c in card:
-            logger.debug(f"{self.name} received card: {c.name}")
+        self.cards.add(*card)
+        if logger.isEnabledFor(logging.DEBUG):
+            for c in card:
+                logger.debug("%s received card: %s", self.name, c.name)
+
+    def draw(self, amount: int) -> list[Card]:
+        """从卡牌池抽牌并加入手牌
+        
+        Args:
+            amount: 抽牌数量
+            
+        Returns:
+            抽到的卡牌列表
+        """
+        cards = self.game.card_pool.draw_card(amount)
+        self.add_card(*cards)
+        if self.game.recorder is not None:
+            self.game.recorder.draw(self, cards)
+        return cards
 
     def _use_card(self, card: Card, cheat: bool = False) -> None:
         """使用卡牌的内部实现
@@ -672,50 +1317,57 @@ class Player:
             card: 要使用的卡牌
             cheat: 是否允许作弊
         """
-        if not self.using.is_empty():
-            self.cards.append(self.using.peek())
-            logger.debug(f"{self.name} put back previous card: {self.using.pop().name}")
+        if not cheat and self.game.recorder is not None:
+            self.game.recorder.use(self, card)
+
+        using = self.using
+        if not using.is_empty():
+            previous = using.pop()
+            self.cards.append(previous)
+            logger.debug("%s put back previous card: %s", self.name, previous.name)
             
-        if card in self.cards or cheat:
-            if card in self.cards and not cheat:
+        if cheat or card in self.cards:
+            if not cheat:
                 self.cards.remove(card)
-            self.using.push(card)
-            logger.debug(f"{self.name} selected card: {self.using.peek().name}")
+            using.push(card)
+            logger.debug("%s selected card: %s", self.name, card.name)
             
-            # 处理不需要目标的卡牌
-            if not card.need_target():
-                if self.using.peek().name in ("Shield", "Bed") or self.using.peek().name.endswith("Apple"):
+            # 处理不需要目标的卡牌, 需要目标的卡牌由_attack_player放回
+            if not card.spec.need_target:
+                name = card.name
+                if name in ("Shield", "Bed") or name.endswith("Apple"):
                     self._handle_self_use_card()
-                elif self.using.peek().name.startswith("Potion of"):
+                elif name.startswith("Potion of"):
                     self._handle_potion_use()
                 
-            try:
-                if not cheat:  # 只有非作弊模式才放入弃牌堆
-                    self.game.card_pool.put_back(self.using.pop())
-            except:
-                pass
+                try:
+                    # 只有非作弊模式才放入弃牌堆
+                    if not cheat:
+                        self.game.card_pool.put_back(using.pop())
+                except:
+                    pass
 
     def _handle_self_use_card(self) -> None:
         """处理对自身使用的卡牌"""
         if self.using.peek().name == "Shield":
             self.health.defence = self.using.peek().name
             self.health.defence_times = 3
-            logger.debug(f"{self.name} equipped Shield (3 defenses)")
+            logger.debug("%s equipped Shield (3 defenses)", self.name)
         elif self.using.peek().name == "Bed":
             self.bedded = True
-            logger.debug(f"{self.name} placed a bed")
+            logger.debug("%s placed a bed", self.name)
         elif self.using.peek().name == "Apple":
             self.health += 1
         elif self.using.peek().name == "Golden Apple":
-            self.effects.append(Effect("Healing", 1, 1, self))
-            self.effects.append(Effect("Health Boost", 3, 1, self))
+            self._add_effect("Healing", 1, 1)
+            self._add_effect("Health Boost", 3, 1)
             self.health += 1
         elif self.using.peek().name == "Enchanted Golden Apple":
-            self.effects.append(Effect("Healing", 2, 2, self))
-            self.effects.append(Effect("Health Boost", 5, 2, self))
+            self._add_effect("Healing", 2, 2)
+            self._add_effect("Health Boost", 5, 2)
             self.health += 3
         
-        logger.debug(f"{self.name} used card: {self.using.peek().name}")
+        logger.debug("%s used card: %s", self.name, self.using.peek().name)
 
     def _handle_potion_use(self) -> None:
         """处理药水使用"""
@@ -725,11 +1377,11 @@ class Player:
             existing_effect = next((e for e in self.effects if e.name == effect_name), None)
             if existing_effect:
                 existing_effect.duration += 2  # 延长持续时间
-                logger.debug(f"{self.name} extended effect {effect_name} duration by 2 turns")
+                logger.debug("%s extended effect %s duration by 2 turns", self.name, effect_name)
             else:
-                self.effects.append(Effect(effect_name, 2, 1, self))
+                self._add_effect(effect_name, 2, 1)
 
-            logger.debug(f"{self.name} used card: {self.using.peek().name}")
+            logger.debug("%s used card: %s", self.name, self.using.peek().name)
 
     def _attack_player(self, target: "Player", immediate: bool = False) -> None:
         """攻击其他玩家的内部实现
@@ -737,18 +1389,20 @@ class Player:
         Args:
             target: 目标玩家
         """
+        if not immediate and self.game.recorder is not None:
+            self.game.recorder.attack(self, target)
+
         if target.health.health <= 0:
             return
 
         if not self.using.is_empty():
-            if self.using.peek() not in (Card("TNT Minecart"),) or immediate:
-                logger.debug(f"{self.name} attacking {target.name} with {self.using.peek().name}")
-                target.be_attacked(self.using.peek(), self)
+            card = self.using.peek()
+            delay = ATTACK_DELAY.get(card.name)
+            if delay is None or immediate:
+                logger.debug("%s attacking %s with %s", self.name, target.name, card.name)
+                target.be_attacked(card, self)
             else:
-                delay = {
-                    "TNT Minecart": 2
-                }
-                self.game.delay_attack.append((target, self.using.peek(), delay[self.using.peek().name], self))
+                self.game.timers.schedule(delay, DelayedAttack(target, card, self))
             
             self.game.card_pool.put_back(self.using.pop())
         else:
@@ -760,10 +1414,28 @@ class Player:
         """处理延迟攻击"""
         if self.delay_attack_this_turn:
             for card, target in self.delay_attack_this_turn:
+                if self.game.recorder is not None:
+                    self.game.recorder.fire(self, card, target)
+                if self.game.metrics is not None:
+                    self.game.metrics.delayed_attacks_fired.inc()
                 self._use_card(card, cheat=True)
                 self._attack_player(target, immediate=True)
             self.delay_attack_this_turn = []
 
+    def _bed_action(self, card: Card, target: Player) -> None:
+        """用卡牌破坏目标的床或守护自己的床
+        
+        Args:
+            card: 使用的镐或方块卡牌
+            target: 目标玩家
+        """
+        if self.game.recorder is not None:
+            self.game.recorder.bed(self, card, target)
+        if card.destroy_defense_type()[1] < 0:
+            self._try_destroy_bed(target)
+        else:
+            self.bed_defence.push(BedDefenceFromCard(card, self))
+
     def _try_destroy_bed(self, target: Player) -> None:
         """尝试破坏床"""
         if not target.bed_defence:
@@ -771,7 +1443,7 @@ class Player:
         else:
             # 检查using栈是否为空
             if self.using.is_empty():
-                logger.error(f"{self.name} tried to destroy bed but no card is being used")
+                logger.error("%s tried to destroy bed but no card is being used", self.name)
                 return
             defence = target.bed_defence[0]
             defence.destroy_by(self.using.peek())
@@ -785,14 +1457,21 @@ class Player:
             attacker: 攻击者对象
         """
         if card.name == "Trident":
-            self.cards.append(Card("Damaged Trident", self.game))
+            damaged = Card.get("Damaged Trident")
+            self.cards.append(damaged)
+            if self.game is not None and self.game.recorder is not None:
+                self.game.recorder.receive(self, damaged)
 
         damage_value, damage_type = card.usage()
         if damage_value > 0:
             # 增加攻击力加成
             if hasattr(attacker, "power") and damage_type in ("Physical", ):
                 damage_value += attacker.power
-            self.health -= Damage(damage_value, damage_type, card.name)
+            damage = Damage(damage_value, damage_type, card.name)
+            if self.game is None or self.game.phase_timers is None:
+                self.health -= damage
+            else:
+                self.game.phase_timers.measure("Health.__isub__", self.health.__isub__, damage)
 
     def list_cards(self) -> list[Card]:
         return list(self.cards)
@@ -803,69 +1482,69 @@ class Player:
         Args:
             other_players: 其他玩家列表
         """
-        card = random.choice(self.cards)
+        card = self.cards.choice(self.game.random)
         self._use_card(card)
         if card.need_target() and other_players:
-            target = random.choice(other_players)
+            target = self.game.random.choice(other_players)
             self._attack_player(target)
-            action_msg = lang("message", "{player} attacks {target} with {card}", player=self.name, card=str(card), target=target.name)
-            logger.debug(action_msg)
-            print(action_msg)
+            announce(self.game, "message", "{player} attacks {target} with {card}", player=self.name, card=card, target=target.name)
         else:
-            action_msg = lang("message", "{player} used {card}", player=self.name, card=str(card))
-            logger.debug(action_msg)
-            print(action_msg)
+            announce(self.game, "message", "{player} used {card}", player=self.name, card=card)
 
     def _get_healing_cards(self) -> list[Card]:
         """获取治疗类卡牌"""
-        return [c for c in self.cards if c.name in ("Potion of Healing", "Apple", "Golden Apple", "Enchanted Golden Apple")]
+        return self.cards.of_category(CARD_HEALING)
     
     def _get_attack_cards(self) -> list[Card]:
         """获取攻击类卡牌"""
-        return [c for c in self.cards if c.need_target()]
+        return self.cards.of_category(CARD_ATTACK)
     
     def _get_non_attack_cards(self) -> list[Card]:
         """获取非攻击类卡牌"""
-        return [c for c in self.cards if not c.need_target()]
+        return self.cards.of_category(*NON_ATTACK_CATEGORIES)
+
+    def _use_named_card(self, name: str) -> bool:
+        """如果手牌中有指定名称的卡牌则使用它
+        
+        Returns:
+            bool: 是否使用了卡牌
+        """
+        card = Card.get(name)
+        if card not in self.cards:
+            return False
+        self._use_card(card)
+        announce(self.game, "message", "{player} used {card}", player=self.name, card=card)
+        return True
     
     def _use_healing_if_needed(self, threshold: int = 4) -> bool:
         """如果需要治疗则使用治疗卡牌"""
         if self.health.health < threshold:
-            healing_cards = self._get_healing_cards()
-            if healing_cards:
-                card = random.choice(healing_cards)
+            if self.cards.total(CARD_HEALING):
+                card = self.cards.choice(self.game.random, CARD_HEALING)
                 self._use_card(card)
-                action_msg = lang("message", "{player} used {card}", player=self.name, card=str(card))
-                logger.debug(action_msg)
-                print(action_msg)
+                announce(self.game, "message", "{player} used {card}", player=self.name, card=card)
                 return True
         return False
     
     def _use_best_attack_card(self, other_players: list["Player"]) -> bool:
         """使用最佳攻击卡牌攻击最脆弱的敌人"""
-        attack_cards = self._get_attack_cards()
+        attack_cards = self.cards.kinds(CARD_ATTACK)
         if attack_cards and other_players:
-            attack_cards.sort(key=lambda c: c.usage()[0], reverse=True)
-            card = attack_cards[0]
+            card = max(attack_cards, key=lambda c: c.spec.damage)
             self._use_card(card)
             other_players.sort(key=lambda p: p.health.health)
             target = other_players[0]
             self._attack_player(target)
-            action_msg = lang("message", "{player} attacks {target} with {card}", player=self.name, card=str(card), target=target.name)
-            logger.debug(action_msg)
-            print(action_msg)
+            announce(self.game, "message", "{player} attacks {target} with {card}", player=self.name, card=card, target=target.name)
             return True
         return False
     
     def _use_random_non_attack_card(self) -> bool:
         """随机使用非攻击卡牌"""
-        non_attack_cards = self._get_non_attack_cards()
-        if non_attack_cards:
-            card = random.choice(non_attack_cards)
+        if self.cards.total(*NON_ATTACK_CATEGORIES):
+            card = self.cards.choice(self.game.random, *NON_ATTACK_CATEGORIES)
             self._use_card(card)
-            action_msg = lang("message", "{player} used {card}", player=self.name, card=str(card))
-            logger.debug(action_msg)
-            print(action_msg)
+            announce(self.game, "message", "{player} used {card}", player=self.name, card=card)
             return True
         return False
 
@@ -876,7 +1555,7 @@ class Player:
             return
             
         # 50%概率优先攻击
-        if random.random() < 0.5 and self._use_best_attack_card(other_players):
+        if self.game.random.random() < 0.5 and self._use_best_attack_card(other_players):
             return
             
         # 最后使用非攻击卡牌
@@ -902,82 +1581,41 @@ class Player:
     def _use_emergency_healing(self) -> bool:
         """使用紧急治疗"""
         if self.health.health <= 3:
-            # 优先使用附魔金苹果
-            enchanted_golden_apples = [c for c in self.cards if c.name == "Enchanted Golden Apple"]
-            if enchanted_golden_apples:
-                card = random.choice(enchanted_golden_apples)
-                self._use_card(card)
-                action_msg = lang("message", "{player} used {card}", player=self.name, card=str(card))
-                logger.debug(action_msg)
-                print(action_msg)
-                return True
-                
-            # 其次使用普通金苹果
-            golden_apples = [c for c in self.cards if c.name == "Golden Apple"]
-            if golden_apples:
-                card = random.choice(golden_apples)
-                self._use_card(card)
-                action_msg = lang("message", "{player} used {card}", player=self.name, card=str(card))
-                logger.debug(action_msg)
-                print(action_msg)
-                return True
+            # 优先使用附魔金苹果, 其次使用普通金苹果
+            return self._use_named_card("Enchanted Golden Apple") or self._use_named_card("Golden Apple")
         return False
     
     def _use_defense(self) -> bool:
         """使用防御装备"""
         if self.health.defence is None:
-            enchanted_shields = [c for c in self.cards if c.name == "Enchanted Shield"]
-            if enchanted_shields:
-                card = random.choice(enchanted_shields)
-                self._use_card(card)
-                action_msg = lang("message", "{player} used {card}", player=self.name, card=str(card))
-                logger.debug(action_msg)
-                print(action_msg)
-                return True
+            return self._use_named_card("Enchanted Shield")
         return False
     
     def _use_power_potions(self) -> bool:
         """使用力量药水"""
-        power_potions = [c for c in self.cards if c.name == "Potion of Power"]
-        if power_potions:
-            card = random.choice(power_potions)
-            self._use_card(card)
-            action_msg = lang("message", "{player} used {card}", player=self.name, card=str(card))
-            logger.debug(action_msg)
-            print(action_msg)
-            return True
-        return False
+        return self._use_named_card("Potion of Power")
     
     def _use_normal_healing(self) -> bool:
         """使用普通治疗"""
         if self.health.health < 5:
-            apples = [c for c in self.cards if c.name == "Apple"]
-            if apples:
-                card = random.choice(apples)
-                self._use_card(card)
-                action_msg = lang("message", "{player} used {card}", player=self.name, card=str(card))
-                logger.debug(action_msg)
-                print(action_msg)
-            return True
+            return self._use_named_card("Apple")
         return False
     
     def _use_attack_with_kill_priority(self, other_players: list["Player"]) -> bool:
         """优先使用能消灭敌人的攻击"""
-        attack_cards = self._get_attack_cards()
+        attack_cards = self.cards.kinds(CARD_ATTACK)
         if attack_cards and other_players:
             # 按伤害值降序排序
-            attack_cards.sort(key=lambda c: c.usage()[0], reverse=True)
+            attack_cards.sort(key=lambda c: c.spec.damage, reverse=True)
             
             # 寻找能消灭敌人的卡牌
             for card in attack_cards:
-                damage = card.usage()[0]
+                damage = card.spec.damage
                 for target in other_players:
                     if target.health.health <= damage:
                         self._use_card(card)
                         self._attack_player(target)
-                        action_msg = lang("message", "{player} attacks {target} with {card}", player=self.name, card=str(card), target=target.name)
-                        logger.debug(action_msg)
-                        print(action_msg)
+                        announce(self.game, "message", "{player} attacks {target} with {card}", player=self.name, card=card, target=target.name)
                         return True
             
             # 没有能消灭的敌人，使用最高伤害攻击最低生命
@@ -986,44 +1624,168 @@ class Player:
             target = other_players[0]
             self._use_card(card)
             self._attack_player(target)
-            action_msg = lang("message", "{player} attacks {target} with {card}", player=self.name, card=str(card), target=target.name)
-            logger.debug(action_msg)
-            print(action_msg)
+            announce(self.game, "message", "{player} attacks {target} with {card}", player=self.name, card=card, target=target.name)
             return True
         return False
     
     def _use_random_card(self) -> bool:
         """随机使用一张卡牌"""
         if self.cards:
-            card = random.choice(self.cards)
+            card = self.cards.choice(self.game.random)
             self._use_card(card)
             other_players = [p for p in self.game.players_in_order if p != self and p.health.health > 0]
             
             # 处理需要目标的卡牌
             if card.need_target() and other_players:
-                target = random.choice(other_players)
+                target = self.game.random.choice(other_players)
                 self._attack_player(target)
-                action_msg = lang("message", "{player} attacks {target} with {card}", player=self.name, card=str(card), target=target.name)
-                logger.debug(action_msg)
-                print(action_msg)
+                announce(self.game, "message", "{player} attacks {target} with {card}", player=self.name, card=card, target=target.name)
             elif card.need_target():  # 无可用目标时取消使用
-                logger.debug(f"{self.name} canceled card usage (no target)")
-                print(lang("message", "{player} did nothing", player=self.name))
+                logger.debug("%s canceled card usage (no target)", self.name)
+                announce(self.game, "message", "{player} did nothing", player=self.name)
                 return False
             return True
         return False
 
+    def _ai_level_4_action(self, other_players: list["Player"]) -> None:
+        """AI等级4的行为：蒙特卡洛树搜索
+        
+        对每个候选动作(见_mcts_moves)在游戏副本上进行随机模拟, 用UCB1分配模拟次数,
+        最终选择模拟次数最多的动作。模拟次数和时间受MCTS_ROLLOUTS、MCTS_TIME_LIMIT限制
+        """
+        moves = self._mcts_moves(other_players)
+        if not moves:
+            announce(self.game, "message", "{player} did nothing", player=self.name)
+            return
+
+        action, card, target_index = moves[0] if len(moves) == 1 else self._mcts_search(moves)
+        if action == MCTS_DRAW:
+            self.game.draw_2_cards(self)
+            return
+        target = self.game.players_in_order[target_index] if target_index is not None else None
+        self._use_card(card)
+        if action == MCTS_BED:
+            self._bed_action(card, target)
+            if target is self:
+                announce(self.game, "message", "{player} used {card}", player=self.name, card=card)
+            else:
+                announce(self.game, "message", "{player} destroyed bed of {target}", player=self.name, target=target.name)
+        elif target is None:
+            announce(self.game, "message", "{player} used {card}", player=self.name, card=card)
+        else:
+            self._attack_player(target)
+            announce(self.game, "message", "{player} attacks {target} with {card}", player=self.name, card=card, target=target.name)
+
+    def _mcts_moves(self, other_players: list["Player"]) -> list[tuple[str, Card | None, int | None]]:
+        """列出所有候选动作, 与人类玩家的三种行动对应
+        
+        - 使用/攻击: 每种卡牌, 需要目标的卡牌对每个存活的其他玩家各一个动作
+        - 抽2张牌
+        - 破坏/守护床: 破坏类卡牌对每个有床的其他玩家各一个动作; 自己有床时每种防御方块一个动作(目标为自己)
+        
+        Returns:
+            (动作, 卡牌, 目标在players_in_order中的下标)列表, 不需要目标时目标为None, 抽牌时卡牌也为None
+        """
+        players = self.game.players_in_order
+        moves = []
+        for card in self.cards.kinds():
+            if not card.need_target():
+                moves.append((MCTS_USE, card, None))
+            else:
+                moves.extend((MCTS_USE, card, players.index(target)) for target in other_players)
+            bed_value = card.destroy_defense_type()[1]
+            if bed_value < 0:
+                moves.extend((MCTS_BED, card, players.index(target)) for target in other_players if target.bedded)
+            elif bed_value > 0 and self.bedded:
+                moves.append((MCTS_BED, card, players.index(self)))
+        moves.append((MCTS_DRAW, None, None))
+        return moves
+
+    def _mcts_search(self, moves: list[tuple[str, Card | None, int | None]]) -> tuple[str, Card | None, int | None]:
+        """用UCB1在候选动作间分配模拟, 返回模拟次数最多的动作"""
+        game = self.game
+        rollouts = game.get_setting(MCTS_ROLLOUTS) or DEFAULT_MCTS_ROLLOUTS
+        deadline = time.perf_counter() + (game.get_setting(MCTS_TIME_LIMIT) or DEFAULT_MCTS_TIME_LIMIT) / 1000
+        depth = game.get_setting(MCTS_DEPTH) or DEFAULT_MCTS_DEPTH
+        index = game.players_in_order.index(self)
+        # 模拟使用由游戏随机数派生的独立生成器, 所有副本共享, 不改变游戏本身的随机序列(除这一次派生)
+        rng = random.Random(game.random.getrandbits(64))
+
+        visits = [0] * len(moves)
+        totals = [0.0] * len(moves)
+        with log_level(logging.WARNING):
+            for n in range(rollouts):
+                if n and time.perf_counter() > deadline:
+                    break
+                if n < len(moves):
+                    i = n
+                else:
+                    log_n = math.log(n)
+                    i = max(range(len(moves)), key=lambda j: totals[j] / visits[j] + MCTS_EXPLORATION * math.sqrt(log_n / visits[j]))
+                totals[i] += self._mcts_rollout(moves[i], index, rng, depth)
+                visits[i] += 1
+
+        best = max(range(len(moves)), key=lambda j: (visits[j], totals[j] / visits[j] if visits[j] else 0.0))
+        logger.debug("%s MCTS chose %s %s after %d rollouts", self.name, moves[best][0], moves[best][1], sum(visits))
+        return moves[best]
+
+    def _mcts_rollout(self, move: tuple[str, Card | None, int | None], index: int, rng: random.Random, depth: int) -> float:
+        """在游戏副本上执行动作并随机模拟depth轮
+        
+        Args:
+            move: 要评估的动作
+            index: 自己在players_in_order中的下标
+            rng: 模拟使用的随机数生成器
+            depth: 模拟的轮数
+            
+        Returns:
+            float: 模拟结果, 获胜为1, 死亡为0, 否则为自己的生命值占存活玩家总生命值的比例
+        """
+        game = self.game.clone(rng)
+        for player in game.players_in_order:
+            if player.AI_level in (0, 4):
+                player.AI_level = MCTS_ROLLOUT_LEVEL
+        game.alive_humans = 0
+        if EXIT_ON_ALL_HUMAN_DEAD in game.setting_bool:
+            game.setting_bool = tuple(key for key in game.setting_bool if key != EXIT_ON_ALL_HUMAN_DEAD)
+
+        me = game.players_in_order[index]
+        action, card, target_index = move
+        if action == MCTS_DRAW:
+            me.draw(2)
+        else:
+            me._use_card(card)
+            if action == MCTS_BED:
+                me._bed_action(card, game.players_in_order[target_index])
+            elif target_index is not None:
+                me._attack_player(game.players_in_order[target_index])
+        me._handle_delay_attack()
+        game._end_turn()
+        game._play(game.turn_count + depth * game.alive_count)
+
+        if me.health.health <= 0:
+            return 0.0
+        if game.winner is me:
+            return 1.0
+        return me.health.health / sum(player.health.health for player in game.players_in_order if player.health.health > 0)
+
     def AI_action(self, other_players):
         if self.AI_level == 0:
             return
-        if self.game.get_setting(WAIT_FOR_AI_THINKING):
-            time.sleep(random.uniform(1.0, 2.5))
+        if self.game.get_setting(WAIT_FOR_AI_THINKING) and not self.game.headless:
+            # 思考延迟不影响游戏状态, 使用全局随机数以免改变游戏的随机序列
+            time.sleep(random.uniform(*AI_THINKING_TIME))
+        if not self.cards:
+            # 与人类玩家相同: 手牌为空时本回合抽5张牌
+            announce(self.game, "message", "No cards left in {player}'s hand", player=self.name)
+            self.draw(5)
+            return
         method_name = f"_ai_level_{self.AI_level}_action"
         if hasattr(self, method_name):
             method = getattr(self, method_name)
             method(other_players)
         else:
-            logger.error(f"Method {method_name} not found")
+            logger.error("Method %s not found", method_name)
 
     def info(self, show_cards: bool = True) -> str:
         """返回玩家信息的字符串表示
@@ -1051,7 +1813,7 @@ class CardPool:
     """管理卡牌池
     
     Attributes:
-        cards (dict[Card, int]): 卡牌列表及其数量
+        cards (Mapping[Card, int]): 卡牌列表及其数量的只读快照(由树状数组维护, 抽牌和放回均为O(log K))
         discard_pile (list[Card]): 废弃卡牌堆
     """
 
@@ -1098,10 +1860,67 @@ class CardPool:
 
         if cards is None:
             cards = self._default(game)
-        self.cards: dict[Card, int] = cards
+        self.game: Game = game
+        self.cards = cards
         self.discard_pile: list[Card] = []  # 废弃卡牌堆
         logger.debug("Card pool initialized")
 
+    @property
+    def cards(self) -> Mapping[Card, int]:
+        """牌库中剩余的卡牌及其数量(只读快照)
+        
+        修改数量应使用add_card/take_card, 或给cards赋值重建牌库;
+        对返回值的原地修改(如pool.cards[card] += 1)会抛出TypeError, 而不是被静默丢弃
+        
+        Returns:
+            卡牌到数量的只读映射, 不包含数量为0的卡牌
+        """
+        return MappingProxyType({card: self._counts[i] for i, card in enumerate(self._kinds) if self._counts[i] > 0})
+
+    @cards.setter
+    def cards(self, cards: dict[Card, int]) -> None:
+        """用卡牌及其数量重建牌库
+        
+        Args:
+            cards: 卡牌到数量的字典
+        """
+        self._kinds: list[Card] = list(cards)  # 卡牌种类
+        self._index: dict[Card, int] = {card: i for i, card in enumerate(self._kinds)}  # 卡牌种类到下标的映射
+        self._counts: FenwickTree = FenwickTree(list(cards.values()))  # 每种卡牌的剩余数量
+
+    def __len__(self) -> int:
+        """获取牌库中剩余卡牌数量
+        
+        Returns:
+            剩余卡牌数量
+        """
+        return self._counts.total
+
+    def _add(self, card: Card, count: int) -> None:
+        """增加某种卡牌的数量(O(log K))
+        
+        Args:
+            card: 卡牌对象
+            count: 增加的数量
+        """
+        index = self._index.get(card)
+        if index is None:
+            self._index[card] = len(self._kinds)
+            self._kinds.append(card)
+            self._counts.append(count)
+        else:
+            self._counts.add(index, count)
+
+    def _clone(self, game: "Game") -> "CardPool":
+        """复制牌库和废弃牌堆(用于Game.clone)"""
+        new = CardPool.__new__(CardPool)
+        new.game = game
+        new._kinds = self._kinds.copy()
+        new._index = self._index.copy()
+        new._counts = self._counts.copy()
+        new.discard_pile = self.discard_pile.copy()
+        return new
+
     def reset(self) -> None:
         """重置卡牌池到初始状态"""
         self.cards = self._default(self.game)
@@ -1115,11 +1934,8 @@ class CardPool:
             card: 要添加的卡牌对象
             count: 要添加的数量，默认为1
         """
-        if card in self.cards:
-            self.cards[card] += count
-        else:
-            self.cards[card] = count
-        logger.debug(f"Added {count}x {str(card)} to card pool")
+        self._add(card, count)
+        logger.debug("Added %sx %s to card pool", count, card)
 
     def put_back(self, card: Card) -> None:
         """将卡牌放入废弃牌堆
@@ -1128,10 +1944,48 @@ class CardPool:
             card: 要放入废弃牌堆的卡牌
         """
         self.discard_pile.append(card)
-        logger.debug(f"Put {card.name} into discard pile")
+        logger.debug("Put %s into discard pile", card.name)
+
+    def _refill(self, amount: int) -> None:
+        """确保牌库中至少有amount张卡牌
+        
+        Args:
+            amount: 需要的卡牌数量
+        """
+        # 如果牌库中的卡牌数量不足，将废弃牌堆加入牌库(按数量加权抽取, 无需洗牌)
+        if self._counts.total < amount and self.discard_pile:
+            logger.debug("Added %s cards from discard pile to draw deck", len(self.discard_pile))
+            for card in self.discard_pile:
+                self._add(card, 1)
+            self.discard_pile = []
+        
+        # 如果牌库仍然不足，重置牌库
+        if self._counts.total < amount:
+            self.reset()
+
+    def take_card(self, *cards: Card) -> list[Card]:
+        """从卡牌池中取出指定的卡牌, 补充牌库的规则与draw_card相同(用于回放)
+        
+        Args:
+            *cards: 要取出的卡牌
+            
+        Returns:
+            取出的卡牌列表
+            
+        Raises:
+            ValueError: 如果牌库中没有指定的卡牌
+        """
+        self._refill(len(cards))
+        counts = self._counts
+        for card in cards:
+            index = self._index.get(card)
+            if index is None or counts[index] <= 0:
+                raise ValueError(f"{card.name} is not in the card pool")
+            counts.add(index, -1)
+        return list(cards)
 
     def draw_card(self, amount: int = 1) -> list[Card]:
-        """从卡牌池中随机抽取卡牌
+        """从卡牌池中随机抽取卡牌, 每张卡牌被抽中的概率与其剩余数量成正比
         
         Args:
             amount: 要抽取的卡牌数量，默认为1
@@ -1140,37 +1994,23 @@ class CardPool:
             抽取的卡牌列表
         """
         chosen: list[Card] = []
-        
-        # 如果牌库中的卡牌数量不足，将废弃牌堆洗牌后加入牌库
-        total_cards = sum(self.cards.values())
-        if total_cards < amount and self.discard_pile:
-            logger.debug("Shuffling discard pile back into draw deck")
-            # 将废弃牌堆洗牌后加入牌库
-            random.shuffle(self.discard_pile)
-            for card in self.discard_pile:
-                if card in self.cards:
-                    self.cards[card] += 1
-                else:
-                    self.cards[card] = 1
-            self.discard_pile = []
-            logger.debug(f"Added {len(self.discard_pile)} cards from discard pile to draw deck")
-        
-        # 如果牌库仍然不足，重置牌库
-        total_cards = sum(self.cards.values())
-        if total_cards < amount:
-            self.reset()
+        self._refill(amount)
+        counts = self._counts
+        randrange = self.game.random.randrange
             
         # 抽取卡牌
         for _ in range(amount):
-            # 随机选择一张卡牌
-            card = random.choice(list(self.cards.keys()))
-            # 减少该卡牌的数量
-            self.cards[card] -= 1
-            if self.cards[card] == 0:
-                del self.cards[card]
-            chosen.append(card)
+            # 按剩余数量加权随机选择一张卡牌并减少其数量
+            index = counts.find(randrange(counts.total))
+            counts.add(index, -1)
+            chosen.append(self._kinds[index])
+
+        if (metrics := self.game.metrics) is not None:
+            for card in chosen:
+                metrics.cards_drawn.inc(card.name)
             
-        logger.debug(f"Drew {amount} cards: {', '.join([c.name for c in chosen])}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Drew %d cards: %s", amount, ", ".join(c.name for c in chosen))
         return chosen
 
     def __str__(self) -> str:
@@ -1205,16 +2045,24 @@ class CardPool:
 
 
 
+class DelayedAttack(NamedTuple):
+    """定时器中等待生效的延迟攻击(如TNT矿车)"""
+    target: Player
+    card: Card
+    attacker: Player
+
+
 class Game:
     """游戏主类，负责管理游戏状态和流程"""
     
-    def __init__(self, players: list[Player] | None = [], *setting_bool: str, **setting_int: int) -> None:
+    def __init__(self, players: list[Player] | None = [], *setting_bool: str, seed: int | None = None, **setting_int: int) -> None:
         """
         初始化游戏
         
         Args:
             players: 参与游戏的玩家列表
             setting: 游戏设置
+            seed: 本局随机数种子, None表示使用系统熵源
 
         Note:
             可处理跳过玩家, 直接输入游戏设置的情况
@@ -1222,20 +2070,88 @@ class Game:
         if isinstance(players, str):
             setting_bool = (*setting_bool, players)
             players = []
+        self.seed: int | None = seed
+        self.random: random.Random = random.Random(seed)  # 本局所有随机操作都使用它
         self.players: RepeatQueue[Player] = RepeatQueue(players)
         self.current_player_index: int = 0
         self.is_game_over: bool = False
         self.turn_count: int = 0
         self._current_turn_players: set[Player] = set()
+        # 存活玩家索引: 在玩家加入和死亡(Health._handle_death)时增量更新
+        self.alive_count: int = 0
+        self.alive_humans: int = 0
+        self._dead: set[Player] = set()
+        self._count_alive()
         self.started: bool = False
         self.winner: Player | None = None
+        self.metrics: Registry | None = active_registry()  # 计数器, 默认关闭, 见metrics模块
         self.card_pool: CardPool = CardPool(game=self)
         self.players_in_order: list[Player] = []
-        self.delay_attack: list[tuple[Player, Card, int]] = []
+        # 效果和延迟攻击按到期的回合放入定时器, 每回合结束时取出到期的部分
+        self.timers: TimerList[Effect | DelayedAttack] = TimerList()
+        # 本局的玩家名称分配器, 第一次需要分配名称时创建, 游戏结束时释放名称
+        self.name_pool: NamePool | None = None
         self.setting_int = setting_int
         self.setting_bool = setting_bool
+        self.headless: bool = False
+        self.output: Output = ConsoleOutput()
+        self.recorder = None  # 对局记录器, 见replay.ReplayRecorder
+        self.replayer = None  # 回放数据源, 见replay.Replay
+        self.phase_timers = None  # 各阶段的耗时统计, 见phase_timers.PhaseTimers
         logger.debug("Game initialized")
 
+    def clone(self, rng: random.Random | None = None) -> "Game":
+        """复制游戏状态, 用于搜索类AI在副本上试探
+        
+        只复制可变状态, 卡牌(享元)、设置和语言数据与原游戏共享,
+        所有指向玩家和游戏的引用都会替换为副本中的对象。
+        副本使用无界面模式和NullOutput, 不带记录器、名称分配器、耗时统计和计数器
+        
+        Args:
+            rng: 副本使用的随机数生成器, None表示复制原游戏的随机数状态
+                 (副本的随机序列与原游戏相同, 但复制状态约占一半耗时)
+        
+        Returns:
+            Game: 游戏副本
+        """
+        new = Game.__new__(Game)
+        new.__dict__.update(self.__dict__)
+
+        players = {player: player._clone(new) for player in self.players_in_order}
+        for player in self.players:
+            if player not in players:
+                players[player] = player._clone(new)
+        effects = {}
+        for player, new_player in players.items():
+            new_player.delay_attack_this_turn = [(card, players[target]) for card, target in player.delay_attack_this_turn]
+            effects.update(zip(player.effects, new_player.effects))
+
+        def convert(item: Effect | DelayedAttack) -> Effect | DelayedAttack:
+            if isinstance(item, Effect):
+                # 已从效果列表移除但仍在等待到期的效果没有对应的副本
+                return effects.get(item) or item._clone(players[item.parent_class])
+            return DelayedAttack(players[item.target], item.card, players[item.attacker])
+
+        new.players = RepeatQueue(players[player] for player in self.players)
+        new.players_in_order = [players[player] for player in self.players_in_order]
+        new._current_turn_players = {players[player] for player in self._current_turn_players}
+        new._dead = {players[player] for player in self._dead}
+        new.winner = players[self.winner] if self.winner is not None else None
+        new.timers = self.timers.copy(convert)
+        new.card_pool = self.card_pool._clone(new)
+        if rng is None:
+            rng = random.Random.__new__(random.Random)
+            rng.setstate(self.random.getstate())
+        new.random = rng
+        new.headless = True
+        new.output = NullOutput()
+        new.recorder = None
+        new.replayer = None
+        new.name_pool = None  # 副本需要分配名称时重新创建, 不影响原游戏的名称
+        new.phase_timers = None
+        new.metrics = None
+        return new
+
     def get_setting(self, key: str) -> int:
         """获取游戏设置
         
@@ -1258,6 +2174,10 @@ class Game:
             *players: 一个或多个玩家对象
         """
         for player in players:
+            if not player.name:
+                player.name = self._choose_name()
+            elif self.name_pool is not None:
+                self.name_pool.reserve(player.name)
             if start_health := self.get_setting("start_health"):
                 if start_health <= 0:
                     raise ValueError("start_health must be greater than 0")
@@ -1270,18 +2190,71 @@ class Game:
             self.players.put(player)
             self.players_in_order.append(player)
             player.game = self
-            logger.debug(f"Added player: {player.name} with health {player.health.health}/{player.health.max_health}")
+            if player.health.health > 0:
+                self.alive_count += 1
+                if not player.AI_level:
+                    self.alive_humans += 1
+            else:
+                self._dead.add(player)
+            logger.debug("Added player: %s with health %s/%s", player.name, player.health.health, player.health.max_health)
+
+    def _count_alive(self) -> None:
+        """根据队列中玩家的生命值重新计算存活玩家索引(玩家AI等级被修改后使用)"""
+        self.alive_count = self.alive_humans = 0
+        self._dead = set()
+        for player in self.players:
+            if player.health.health > 0:
+                self.alive_count += 1
+                if not player.AI_level:
+                    self.alive_humans += 1
+            else:
+                self._dead.add(player)
+
+    def _player_died(self, player: Player) -> None:
+        """从存活玩家索引中移除死亡的玩家(重复调用无影响)
+        
+        Args:
+            player: 死亡的玩家
+        """
+        if player in self._dead:
+            return
+        self._dead.add(player)
+        self.alive_count -= 1
+        if self.metrics is not None:
+            self.metrics.deaths.inc()
+        if not player.AI_level:
+            self.alive_humans -= 1
+
+    def _choose_name(self) -> str:
+        """随机选择一个本局未被使用的玩家名称
+        
+        name.txt中的名称用完后使用带数字后缀的名称
+        
+        Returns:
+            玩家名称
+        """
+        if self.name_pool is None:
+            self.name_pool = NamePool(filter(None, (name.strip() for name in _get_names())), self.random)
+            for player in self.players_in_order:
+                self.name_pool.reserve(player.name)
+        return self.name_pool.take()
+
+    def _release_names(self) -> None:
+        """游戏结束时释放本局玩家的名称"""
+        if self.name_pool is not None:
+            for player in self.players_in_order:
+                self.name_pool.release(player.name)
 
     def start_game(self) -> None:
         """开始游戏，初始化玩家手牌和游戏状态"""
         if len(self.players) < 2:
             logger.error("Not enough players to start game")
-            print("Not enough players")
+            self.output.write("Not enough players")
             return
 
         # 为每个玩家发初始卡牌
         for player in self.players:
-            player.add_card(*self.card_pool.draw_card(5))
+            player.draw(5)
         self.is_game_over = False
         self.turn_count = 1
         logger.debug("Game started")
@@ -1300,7 +2273,7 @@ class Game:
         self.current_player_index = (self.current_player_index + 1) % len(self.players)
         self.turn_count += 1
         self.check_game_over()
-        logger.debug(f"Turn advanced to {self.turn_count}")
+        logger.debug("Turn advanced to %s", self.turn_count)
         
     def check_game_over(self) -> bool:
         """检查游戏是否结束
@@ -1308,8 +2281,7 @@ class Game:
         Returns:
             bool: 如果游戏结束返回True，否则False
         """
-        active_players = [p for p in self.players if p.health.health > 0]
-        if len(active_players) <= 1:
+        if self.alive_count <= 1:
             self.is_game_over = True
             logger.debug("Game over condition met")
         return self.is_game_over
@@ -1319,32 +2291,23 @@ class Game:
         """处理所有玩家的每回合结束逻辑"""
         if not self.players:
             logger.error("No players found for after_turn processing")
-            print("No players found!")
+            self.output.write("No players found!")
             return
 
         logger.debug("Processing after-turn effects for all players")
-        for player in self.players:
-            player.after_turn()
-
-        self._handle_delay_attack()
+        self._handle_timers()
 
     def _setup_game(self) -> None:
         """初始化游戏设置"""
-        start_msg = lang("message", "Game started!")
-        logger.debug(start_msg)
-        print(start_msg)
-        
-        card_pool_msg = lang("message", "Card pool: {}", str(self.card_pool))
-        logger.debug(card_pool_msg)
-        print(card_pool_msg)
-        
-        players_msg = lang("message", "Players: {}", ", ".join(player.name for player in self.players))
-        logger.debug(players_msg)
-        print(players_msg)
-        print()
+        announce(self, "message", "Game started!")
+        
+        if self.output.enabled:
+            announce(self, "message", "Card pool: {}", str(self.card_pool))
+            announce(self, "message", "Players: {}", ", ".join(player.name for player in self.players))
+        self.output.write()
         # 为每个玩家生成本地化的字符串表示
         for player in self.players:
-            player.add_card(*self.card_pool.draw_card(5))
+            player.draw(5)
             
     def _display_player_status(self, player: Player) -> None:
         """显示玩家状态
@@ -1352,23 +2315,31 @@ class Game:
         Args:
             player: 要显示状态的玩家
         """
-        health_msg = lang("message", "Health: {} HP", player.health.health)
-        logger.debug(health_msg)
-        print(health_msg)
+        announce(self, "message", "Health: {} HP", player.health.health)
         
         if player.bedded:
             if player.bed_defence:
-                bed_msg = lang("message", "Bed state: be protected with {}", player.bed_defence[0])
-                logger.debug(bed_msg)
-                print(bed_msg)
+                announce(self, "message", "Bed state: be protected with {}", player.bed_defence[0])
             else:
-                bed_msg = lang("message", "Bed state: Bedded")
-                logger.debug(bed_msg)
-                print(bed_msg)
+                announce(self, "message", "Bed state: Bedded")
         else:
-            bed_msg = lang("message", "Bed state: Unbedded")
-            logger.debug(bed_msg)
-            print(bed_msg)
+            announce(self, "message", "Bed state: Unbedded")
+
+    def _ask(self, steps: Generator[str, str, _T]) -> _T:
+        """用self.output.input依次回答steps产生的输入提示
+        
+        Args:
+            steps: 产生输入提示并接收玩家输入的生成器, 如_human_turn_steps
+            
+        Returns:
+            steps的返回值
+        """
+        try:
+            prompt = next(steps)
+            while True:
+                prompt = steps.send(self.output.input(prompt))
+        except StopIteration as stop:
+            return stop.value
 
     def _handle_card_selection(self, player: Player, condition: Callable[[Card], bool] = lambda _: True) -> Card | None:
         """处理卡牌选择
@@ -1379,32 +2350,33 @@ class Game:
         Returns:
             选择的卡牌或None
         """
+        return self._ask(self._card_selection_steps(player, condition))
+
+    def _card_selection_steps(self, player: Player, condition: Callable[[Card], bool] = lambda _: True) -> Generator[str, str, Card | None]:
+        """卡牌选择的步骤: 产生输入提示, 接收玩家输入(见_handle_card_selection)"""
         cards = [card for card in player.cards if condition(card)]
 
         # 本地化显示玩家手牌
         cards_list = [f"{i}: {card}" for i, card in enumerate(cards, 1)]
-        cards_msg = lang("message", "Available Cards: {}", ", ".join(cards_list))
-        logger.debug(cards_msg)
-        print(cards_msg)
+        announce(self, "message", "Available Cards: {}", ", ".join(cards_list))
 
         if not player.cards:
-            no_cards_msg = lang("message", "No cards left in {player}'s hand", player=player.name)
-            logger.debug(no_cards_msg)
-            print(no_cards_msg)
-            player.add_card(*self.card_pool.draw_card(5))
+            announce(self, "message", "No cards left in {player}'s hand", player=player.name)
+            player.draw(5)
             return None
             
         # 本地化输入提示
-        card_index = input(lang("message", "Enter card index to use: "))
+        card_index = yield lang("message", "Enter card index to use: ")
 
         try:
             card = cards[int(card_index) - 1]
-            logger.debug(f"{player.name} selected card: {card.name}")
+            logger.debug("%s selected card: %s", player.name, card.name)
             return card
         except:
             error_msg = lang("message", "Invalid card index")
             logger.fatal(error_msg)
-            print(error_msg)
+            self.output.write(error_msg)
+            self.output.flush()
             raise ValueError(error_msg)
 
     def _handle_target_selection(self, player: Player, card: Card, condition: Callable[[Player], bool] = lambda _: True) -> Player | None:
@@ -1418,25 +2390,23 @@ class Game:
         Returns:
             选择的目标玩家或None
         """
+        return self._ask(self._target_selection_steps(player, card, condition))
+
+    def _target_selection_steps(self, player: Player, card: Card, condition: Callable[[Player], bool] = lambda _: True) -> Generator[str, str, Player | None]:
+        """目标选择的步骤: 产生输入提示, 接收玩家输入(见_handle_target_selection)"""
         targets = [p for p in self.players_in_order if p != player and p.health.health > 0 and condition(p)]
         # 本地化目标选择提示
         targets_list = [f"{i}: {p.name}" for i, p in enumerate(targets, 1)]
-        targets_msg = lang("message", "Players to be target: {}", ", ".join(targets_list))
-        logger.debug(targets_msg)
-        print(targets_msg)
-        target_index = input(lang("message", "Enter target player index: "))
+        announce(self, "message", "Players to be target: {}", ", ".join(targets_list))
+        target_index = yield lang("message", "Enter target player index: ")
         try:
             target_player = targets[int(target_index)-1]
             # 本地化攻击消息
-            attack_msg = lang("message", "{player} attacks {target} with {card}", 
-                player=player.name, target=target_player.name, card=str(card))
-            logger.debug(attack_msg)
-            print(attack_msg)
+            announce(self, "message", "{player} attacks {target} with {card}", 
+                player=player.name, target=target_player.name, card=card)
             return target_player
         except Exception as e:
-            error_msg = lang("message", "Invalid target player index")
-            logger.error(error_msg)
-            print(error_msg)
+            announce(self, "message", "Invalid target player index")
             return None
 
     def _handle_player_turn(self, player: Player) -> None:
@@ -1445,13 +2415,27 @@ class Game:
         Args:
             player: 当前回合的玩家
         """
-        turn_msg = lang("message", "{player}'s turn", player=player.name)
-        logger.debug(turn_msg)
-        print(turn_msg)
+        self._ask(self._player_turn_steps(player))
+
+    def _player_turn_steps(self, player: Player) -> Generator[str, str, None]:
+        """单个玩家回合的步骤, 人类玩家的回合会产生输入提示(见_human_turn_steps)
         
-        if player.AI_level:
+        Args:
+            player: 当前回合的玩家
+        """
+        announce(self, "message", "{player}'s turn", player=player.name)
+        if self.recorder is not None:
+            self.recorder.turn(player)
+        
+        if player.AI_level and self.headless:
+            others = [p for p in self.players_in_order if p != player and p.health.health > 0]
+            if self.phase_timers is None:
+                player.AI_action(others)
+            else:
+                self.phase_timers.measure("AI_action", player.AI_action, others)
+        elif player.AI_level:
             self._display_player_status(player)
-            print("...")
+            self.output.write("...")
 
             global messages
 
@@ -1459,19 +2443,26 @@ class Game:
             messages.setdefault("death", "")
             messages.setdefault("defence_break", "")
 
-            player.AI_action([p for p in self.players_in_order if p != player])
+            others = [p for p in self.players_in_order if p != player and p.health.health > 0]
+            if self.phase_timers is None:
+                player.AI_action(others)
+            else:
+                self.phase_timers.measure("AI_action", player.AI_action, others)
 
             if messages["defence_break"]:
-                print(messages["defence_break"])
+                self.output.message(*messages["defence_break"])
 
             if messages["death"]:
-                print(messages["death"])
+                self.output.message(*messages["death"])
 
-            print()
+            self.output.write()
         else:
-            self._handle_human_turn(player)
+            yield from self._human_turn_steps(player)
 
-        player._handle_delay_attack()
+        if self.phase_timers is None:
+            player._handle_delay_attack()
+        else:
+            self.phase_timers.measure("_handle_delay_attack", player._handle_delay_attack)
 
     def _handle_action_choose(self, player: Player) -> str:
         """处理玩家回合选择
@@ -1479,22 +2470,37 @@ class Game:
         Args:
             player: 当前回合的玩家
         """
+        return self._ask(self._action_choose_steps(player))
+
+    def _action_choose_steps(self, player: Player) -> Generator[str, str, str]:
+        """回合选择的步骤: 产生输入提示, 接收玩家输入(见_handle_action_choose)"""
         actions = ["attack/use", "draw 2 cards"]
         for card in player.list_cards():
             if card.destroy_defense_type() != DESTROY_NONE:
                 actions.append("destroy/defend bed")
                 break
 
-        print(lang("message", "Actions: "), end="")
+        self.output.write(lang("message", "Actions: "), end="")
         for i, action in enumerate(actions, 1):
-            print(f"{i}: {lang("actions", action)}", end=", " if i < len(actions) else "\n")
-        action = input(lang("message", "Enter action index: "))
-        print()
+            self.output.write(f"{i}: {lang('actions', action)}", end=", " if i < len(actions) else "\n")
+        action = yield lang("message", "Enter action index: ")
+        self.output.write()
         return actions[int(action) - 1]
             
     def _handle_human_turn(self, player: Player) -> None:
         """处理人类玩家回合
         
+        Args:
+            player: 当前回合的人类玩家
+        """
+        self._ask(self._human_turn_steps(player))
+
+    def _human_turn_steps(self, player: Player) -> Generator[str, str, None]:
+        """人类玩家回合的步骤
+        
+        每次需要玩家输入时产生输入提示, 并通过send接收输入的字符串。
+        _handle_human_turn用self.output.input回答, 服务器(见server.py)则异步等待客户端回答
+        
         Args:
             player: 当前回合的人类玩家
         """
@@ -1509,22 +2515,26 @@ class Game:
 
         # 本地化显示玩家手牌
         cards_list = [f"{str(card)}" for card in player.cards]
-        cards_msg = lang("message", "Cards: {}", ", ".join(cards_list))
-        logger.debug(cards_msg)
-        print(cards_msg)
-        print()
-
-        action = self._handle_action_choose(player)
-        {
-            "attack/use": self.attack_or_use_card,
-            "draw 2 cards": self.draw_2_cards,
-            "destroy/defend bed": self.destroy_defend_bed,
-        }[action](player)
+        announce(self, "message", "Cards: {}", ", ".join(cards_list))
+        self.output.write()
+
+        action = yield from self._action_choose_steps(player)
+        if action == "draw 2 cards":
+            self.draw_2_cards(player)
+        else:
+            yield from {
+                "attack/use": self._attack_or_use_card_steps,
+                "destroy/defend bed": self._destroy_defend_bed_steps,
+            }[action](player)
 
     def attack_or_use_card(self, player: Player) -> None:
         """攻击或使用卡牌"""
+        self._ask(self._attack_or_use_card_steps(player))
+
+    def _attack_or_use_card_steps(self, player: Player) -> Generator[str, str, None]:
+        """攻击或使用卡牌的步骤(见attack_or_use_card)"""
         # 处理卡牌选择
-        card = self._handle_card_selection(player, lambda card: card.destroy_defense_type() != DESTROY_PICKAXE)
+        card = yield from self._card_selection_steps(player, lambda card: card.destroy_defense_type() != DESTROY_PICKAXE)
         if card is None:
             return
             
@@ -1532,71 +2542,73 @@ class Game:
 
         if card.need_target():
             # 处理目标选择
-            target = self._handle_target_selection(player, card)
+            target = yield from self._target_selection_steps(player, card)
             if target is None:
                 return
             player._attack_player(target)
 
             if messages.get("defence_break"):
-                print(messages["defence_break"])
+                self.output.message(*messages["defence_break"])
             if messages.get("death"):
-                print(messages["death"])
+                self.output.message(*messages["death"])
         else:
             # 本地化使用卡牌消息
-            card_use_msg = lang("message", "{player} used {card}", player=player.name, card=str(card))
-            logger.debug(card_use_msg)
-            print(card_use_msg)
+            announce(self, "message", "{player} used {card}", player=player.name, card=card)
 
-        print()
+        self.output.write()
 
     def draw_2_cards(self, player: Player) -> None:
         """抽2张牌"""
-        logger.debug(f"{player.name} drew 2 cards")
-        drawn_cards = self.card_pool.draw_card(2)
-        player.add_card(*drawn_cards)
+        logger.debug("%s drew 2 cards", player.name)
+        drawn_cards = player.draw(2)
         # 本地化抽牌消息
-        draw_msg = lang("message", "{player} drew {count} cards: {cards}", player=player.name, count=len(drawn_cards), cards=", ".join(str(card) for card in drawn_cards))
-        logger.debug(draw_msg)
-        print(draw_msg)
-        print()
+        announce(self, "message", "{player} drew {count} cards: {cards}", player=player.name, count=len(drawn_cards), cards=", ".join(str(card) for card in drawn_cards))
+        self.output.write()
         return None
             
 
     def destroy_defend_bed(self, player: Player) -> None:
         """破坏/守护床"""
+        self._ask(self._destroy_defend_bed_steps(player))
+
+    def _destroy_defend_bed_steps(self, player: Player) -> Generator[str, str, None]:
+        """破坏/守护床的步骤(见destroy_defend_bed)"""
         # 处理卡牌选择
-        card = self._handle_card_selection(player, lambda card: card.destroy_defense_type() != DESTROY_NONE)
+        card = yield from self._card_selection_steps(player, lambda card: card.destroy_defense_type() != DESTROY_NONE)
         if card is None:
             return
 
-        target = self._handle_target_selection(player, card)
+        target = yield from self._target_selection_steps(player, card)
         if target is None:
             return
 
         player._use_card(card)
-
-        if card.destroy_defense_type()[1] < 0:
-            player._try_destroy_bed(target)
-        else:
-            player.bed_defence.push(BedDefenceFromCard(card, player))
+        player._bed_action(card, target)
 
         # 本地化破坏床消息
-        destroy_msg = lang("message", "{player} destroyed bed of {target}", player=player.name, target=target.name)
-        logger.debug(destroy_msg)
-        print(destroy_msg)
-        print()
+        announce(self, "message", "{player} destroyed bed of {target}", player=player.name, target=target.name)
+        self.output.write()
 
-    def _handle_delay_attack(self) -> None:
-        """处理延迟攻击"""
-        new_list = []
-        for target, card, delay, attacker in self.delay_attack:
-            if delay > 1:
-                new_list.append((target, card, delay - 1, attacker))
-            else:
-                if attacker.health.health > 0:
-                    attacker.delay_attack_this_turn.append((card, target))
+    @property
+    def delay_attack(self) -> list[tuple[Player, Card, int, Player]]:
+        """尚未生效的延迟攻击: (目标, 卡牌, 剩余回合数, 攻击者)"""
+        now = self.timers.now
+        return [(item.target, item.card, due - now, item.attacker) for due, item in self.timers if isinstance(item, DelayedAttack)]
+
+    def _handle_timers(self) -> None:
+        """推进定时器, 处理本回合结束时到期的效果和延迟攻击
         
-        self.delay_attack = new_list
+        效果先于延迟攻击处理; 到期的延迟攻击交给仍存活的攻击者, 在其下一回合发动
+        """
+        attacks = []
+        for item in self.timers.advance():
+            if isinstance(item, Effect):
+                item.effect()
+            else:
+                attacks.append(item)
+        for target, card, attacker in attacks:
+            if attacker.health.health > 0:
+                attacker.delay_attack_this_turn.append((card, target))
         
     def _is_turn_finished(self) -> bool:
         """判断当前回合是否结束
@@ -1610,49 +2622,148 @@ class Game:
         self._current_turn_players.add(current_player)
         
         # 检查所有存活玩家是否都已行动
-        alive_players = [p for p in self.players if p.health.health > 0]
-        if len(self._current_turn_players) == len(alive_players):
+        if len(self._current_turn_players) == self.alive_count:
             self._current_turn_players.clear()
             return True
         return False
             
-    def start(self) -> None:
-        """开始并进行游戏"""
-        logger.debug("Starting game")
-        self.started = True
-        self._setup_game()
+    def _end_turn(self) -> None:
+        """结束当前玩家回合: 计数, 所有玩家行动过后处理回合结束逻辑"""
+        self.turn_count += 1
+        if self.metrics is not None:
+            self.metrics.turns.inc()
+        if self._is_turn_finished():
+            if self.phase_timers is None:
+                self.after_turn()
+            else:
+                self.phase_timers.measure("after_turn", self.after_turn)
+        # 每个玩家回合结束时一次性输出缓冲的消息
+        self.output.flush()
+
+    def _play(self, max_turns: int | None = None) -> bool:
+        """进行回合循环直到游戏结束
         
+        Args:
+            max_turns: 最大玩家回合数, None表示不限制
+            
+        Returns:
+            bool: 决出胜者返回True, 因人类玩家全部死亡或达到回合上限而退出返回False
+        """
         while len(self.players) > 1:
+            if max_turns is not None and self.turn_count >= max_turns:
+                return False
+
             if self.get_setting(DEBUG):
-                print(self.delay_attack)
+                self.output.write(str(self.delay_attack))
 
             player = self.players.peek()
             if player.health.health <= 0:
-                self.players.remove(player)
+                self.players.pop_last()  # peek后该玩家位于队尾
                 continue
                 
-            self._handle_player_turn(player)
-            
-            if self._is_turn_finished():
-                self.after_turn()
+            if self.replayer is not None:
+                # 回放时直接应用记录, 不经过回合步骤的生成器和输出(见replay.Replay.run)
+                self.replayer.apply_turn(player)
+                player._handle_delay_attack()
+            elif self.phase_timers is None:
+                self._handle_player_turn(player)
+            else:
+                self.phase_timers.measure("_handle_player_turn", self._handle_player_turn, player)
+            self._end_turn()
 
             if self.get_setting(EXIT_ON_ALL_HUMAN_DEAD) and self._check_human_dead():
-                break
-        else:
-            game_over_msg = lang("message", "Game over!")
-            logger.debug(game_over_msg)
-            print(game_over_msg)
+                return False
 
-            winner_msg = lang("message", "{} wins!", self.players.peek().name)
-            logger.debug(winner_msg)
-            print(winner_msg)
-            self.winner = self.players.peek()
+        self.winner = self.players.peek()
+        return True
 
+    def start(self) -> None:
+        """开始并进行游戏"""
+        logger.debug("Starting game")
+        self.started = True
+        self._start_phase_timers()
+        self._setup_game()
+        
+        if self._play():
+            announce(self, "message", "Game over!")
+            announce(self, "message", "{} wins!", self.winner.name)
+        else:
+            announce(self, "message", "Game exited for no human alive!")
+        self._finish_game()
+        self.output.flush()
+
+    def _finish_game(self) -> None:
+        """游戏结束时的处理: 释放玩家名称、计数并输出耗时统计"""
+        self.is_game_over = True
+        self._release_names()
+        if self.metrics is not None:
+            self.metrics.games.inc()
+        self._dump_phase_timers()
+
+    def _start_phase_timers(self) -> None:
+        """设置了PHASE_TIMERS时开启各阶段的耗时统计"""
+        if self.get_setting(PHASE_TIMERS) and self.phase_timers is None:
+            from phase_timers import enable  # 延迟导入, 只有开启统计时需要
+            enable(self)
+
+    def _dump_phase_timers(self) -> None:
+        """把各阶段的耗时统计写入日志, 调试模式下同时输出"""
+        if self.phase_timers is None:
             return
+        report = self.phase_timers.report()
+        logger.info("Phase timings:\n%s", report)
+        if self.get_setting(DEBUG):
+            self.output.write(report)
+
+    def simulate(self, max_turns: int = 10000, logging_level: int = logging.WARNING) -> dict:
+        """以无界面模式进行整局游戏, 不输出任何内容
+        
+        Args:
+            max_turns: 最大玩家回合数, 超过后视为平局
+            logging_level: 模拟期间的日志级别, 默认只记录警告及以上的日志
+            
+        Returns:
+            dict: 游戏结果, 包含胜者名称(winner, 平局为None)、玩家回合数(turns)、
+                  耗时秒数(elapsed)及每位玩家的最终状态(players)
+                  
+        Raises:
+            ValueError: 如果存在人类玩家或玩家不足2人
+        """
+        if len(self.players) < 2:
+            raise ValueError("Not enough players")
+        if any(not player.AI_level for player in self.players):
+            raise ValueError("Only AI players can be simulated")
 
-        game_over_msg = lang("message", "Game exited for no human alive!")
-        logger.debug(game_over_msg)
-        print(game_over_msg)
+        start_time = time.perf_counter()
+        self.headless = True
+        self.output = NullOutput()
+        self.started = True
+        self._start_phase_timers()
+        with log_level(logging_level):
+            for player in self.players:
+                player.draw(5)
+            self._play(max_turns)
+        self._finish_game()
+        elapsed = time.perf_counter() - start_time
+
+        return {
+            "winner": self.winner.name if self.winner is not None else None,
+            "turns": self.turn_count,
+            "elapsed": elapsed,
+            "players": [
+                {
+                    "name": player.name,
+                    "AI_level": player.AI_level,
+                    "health": player.health.health,
+                    "max_health": player.health.max_health,
+                    "alive": player.health.health > 0,
+                    "bedded": player.bedded,
+                    "cards": [card.name for card in player.cards],
+                    "effects": [(effect.name, effect.level, effect.duration) for effect in player.effects],
+                }
+                for player in self.players_in_order
+            ],
+        }
     
     def _check_human_dead(self) -> bool:
         """检查是否所有人类玩家都死亡
@@ -1660,8 +2771,7 @@ class Game:
         Returns:
             bool: 如果所有人类玩家都死亡返回True，否则False
         """
-        human_players = [p for p in self.players if not p.AI_level]
-        return all(p.health.health <= 0 for p in human_players)
+        return not self.alive_humans
 
 def main():
     log_clear()
@@ -1693,7 +2803,7 @@ def AI_competition():
     for ai in AI:
         players.extend((Player(ai + str(i + 1)) for i in range(4)))
 
-    random.shuffle(players)
+    game.random.shuffle(players)
     game.add_player(*players)
 
     for _ in range(2):
@@ -1703,6 +2813,55 @@ def AI_competition():
 
     logger.debug("Game ended")
 
+def derive_seed(seed: int | None, *stream: int) -> int:
+    """由基础种子和流编号派生独立的种子, 用于并行工作进程
+    
+    在任何进程和平台上结果都相同, 不同的流编号得到互不相关的随机序列
+    
+    Args:
+        seed: 基础种子
+        *stream: 流编号, 例如对局编号
+        
+    Returns:
+        int: 派生的63位种子
+    """
+    import hashlib  # 延迟导入, 只有派生种子时需要
+    digest = hashlib.sha256(repr((seed, *stream)).encode()).digest()
+    return int.from_bytes(digest[:8], "little") >> 1
+
+def simulate(AI_levels: list[int] = [1, 2, 3, 3], seed: int | None = None, max_turns: int = 10000, *setting_bool: str, card_pool_doublings: int = 0, logging_level: int = logging.WARNING, **setting_int: int) -> dict:
+    """无界面进行一局AI对战并返回结构化结果
+    
+    Args:
+        AI_levels: 每位AI玩家的等级
+        seed: 本局随机数种子, None表示使用系统熵源
+        max_turns: 最大玩家回合数
+        *setting_bool: 游戏设置(bool)
+        card_pool_doublings: 卡牌池合并(game.card_pool += game.card_pool)的次数
+        logging_level: 创建和进行游戏期间的日志级别, 默认只记录警告及以上的日志
+        **setting_int: 游戏设置(int)
+        
+    Returns:
+        dict: 见Game.simulate
+    """
+    game = create_simulation(AI_levels, seed, *setting_bool, card_pool_doublings=card_pool_doublings, logging_level=logging_level, **setting_int)
+    return game.simulate(max_turns, logging_level)
+
+def create_simulation(AI_levels: list[int] = [1, 2, 3, 3], seed: int | None = None, *setting_bool: str, card_pool_doublings: int = 0, logging_level: int = logging.WARNING, **setting_int: int) -> Game:
+    """创建一局尚未开始的AI对战(参数见simulate)
+    
+    创建游戏、卡牌池和玩家期间使用logging_level, 无界面对局不写入调试日志
+    
+    Returns:
+        Game: 已加入AI玩家的游戏对象
+    """
+    with log_level(logging_level):
+        game = Game(*setting_bool, seed=seed, **setting_int)
+        game.add_player(*(Player(f"AI{i + 1}", level) for i, level in enumerate(AI_levels)))
+        for _ in range(card_pool_doublings):
+            game.card_pool += game.card_pool
+    return game
+
 def test():
     player1 = Player("p1")
     player2 = Player("p2")
@@ -0,0 +1,265 @@
+"""引擎计数器和Prometheus文本格式导出
+
+计数器是原地更新的整数(dict中的值), 游戏线程只做加法, 不加锁也不进行任何I/O;
+MetricsExporter在后台线程中按间隔生成Prometheus文本格式, 写入文件(原子替换, 适用于
+node_exporter的textfile collector)或发送到本地套接字, 导出失败只记录日志, 不影响游戏。
+
+计数器默认关闭(Game.metrics为None), 游戏只多一次属性检查。enable()或MetricsExporter.start()开启后,
+新建的游戏记录到模块级的REGISTRY; 也可通过环境变量MP2_METRICS=1在导入时开启。
+搜索类AI的游戏副本不记录。计数器只统计本进程内的游戏, 多进程(如tournament)时每个进程分别导出。
+
+用法:
+    with MetricsExporter(path="logs/mcpvp.prom", interval=15):
+        ...  # 进行游戏
+"""
+from __future__ import annotations
+import os
+import time
+
+from logger import logger
+
+METRIC_PREFIX = "mcpvp_"
+
+
+def _escape(value: str) -> str:
+    """转义标签值"""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    """单调递增的计数器, 可带一个标签
+
+    各标签值的计数保存在values中, 没有标签时使用空字符串作为键
+    """
+
+    __slots__ = ("name", "help", "label", "values")
+
+    def __init__(self, name: str, help: str, label: str | None = None) -> None:
+        """初始化计数器
+
+        Args:
+            name: 指标名称(不含前缀和_total后缀)
+            help: 说明
+            label: 标签名称, None表示没有标签
+        """
+        self.name: str = name
+        self.help: str = help
+        self.label: str | None = label
+        self.values: dict[str, int] = {} if label else {"": 0}
+
+    def inc(self, key: str = "", amount: int = 1) -> None:
+        """增加计数
+
+        Args:
+            key: 标签值, 没有标签时忽略
+            amount: 增加量, 不能为负
+        """
+        values = self.values
+        values[key] = values.get(key, 0) + amount
+
+    @property
+    def total(self) -> int:
+        """所有标签值的计数之和"""
+        return sum(list(self.values.values()))
+
+    def render(self) -> list[str]:
+        """生成Prometheus文本格式的行"""
+        name = f"{METRIC_PREFIX}{self.name}_total"
+        lines = [f"# HELP {name} {self.help}", f"# TYPE {name} counter"]
+        items = sorted(list(self.values.items()))  # list()在持有GIL时一次复制, 游戏线程同时增加新键也不会出错
+        if self.label:
+            lines.extend(f'{name}{{{self.label}="{_escape(key)}"}} {value}' for key, value in items)
+        else:
+            lines.extend(f"{name} {value}" for _, value in items)
+        return lines
+
+
+class Gauge:
+    """可任意设置的数值"""
+
+    __slots__ = ("name", "help", "value")
+
+    def __init__(self, name: str, help: str) -> None:
+        self.name: str = name
+        self.help: str = help
+        self.value: float = 0.0
+
+    def set(self, value: float) -> None:
+        """设置数值"""
+        self.value = value
+
+    def render(self) -> list[str]:
+        """生成Prometheus文本格式的行"""
+        name = f"{METRIC_PREFIX}{self.name}"
+        return [f"# HELP {name} {self.help}", f"# TYPE {name} gauge", f"{name} {self.value:g}"]
+
+
+class Registry:
+    """一组计数器, 引擎通过属性访问各计数器"""
+
+    def __init__(self) -> None:
+        self.cards_drawn = Counter("cards_drawn", "Cards drawn from the card pool.", "card")
+        self.damage_dealt = Counter("damage_dealt", "Health removed by damage.", "type")
+        self.damage_by_card = Counter("damage_by_card", "Health removed by damage, by the card that caused it.", "card")
+        self.shield_blocks = Counter("shield_blocks", "Attacks blocked by a shield.")
+        self.deaths = Counter("deaths", "Players that died.")
+        self.bed_revives = Counter("bed_revives", "Players revived by their bed.")
+        self.delayed_attacks_fired = Counter("delayed_attacks_fired", "Delayed attacks that were carried out.")
+        self.turns = Counter("turns", "Player turns played.")
+        self.games = Counter("games", "Games finished.")
+        self.games_per_second = Gauge("games_per_second", "Games finished per second over the last export interval.")
+
+    def metrics(self) -> list[Counter | Gauge]:
+        """获取所有指标"""
+        return [value for value in vars(self).values() if isinstance(value, (Counter, Gauge))]
+
+    def render(self) -> str:
+        """生成所有指标的Prometheus文本格式"""
+        lines = []
+        for metric in self.metrics():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """清零所有计数器"""
+        for metric in self.metrics():
+            if isinstance(metric, Counter):
+                metric.values = {} if metric.label else {"": 0}
+            else:
+                metric.set(0.0)
+
+
+# 默认的全局计数器, 开启后新建的游戏都记录到这里
+REGISTRY = Registry()
+
+# 新建的游戏记录到的计数器, None表示不记录
+_active: Registry | None = REGISTRY if os.environ.get("MP2_METRICS", "") not in ("", "0") else None
+
+
+def enable(registry: Registry = REGISTRY) -> Registry:
+    """开启计数器, 之后新建的游戏记录到registry
+
+    Returns:
+        Registry: registry
+    """
+    global _active
+    _active = registry
+    return registry
+
+
+def disable() -> None:
+    """关闭计数器, 之后新建的游戏不记录(已开始的游戏不受影响)"""
+    global _active
+    _active = None
+
+
+def active_registry() -> Registry | None:
+    """获取新建的游戏应记录到的计数器, 没有开启时为None"""
+    return _active
+
+
+class MetricsExporter:
+    """在后台线程中按间隔导出计数器
+
+    每次导出时根据games计数器的增量计算games_per_second;
+    写文件时先写入临时文件再替换, 读取方不会读到不完整的内容;
+    address为字符串时视为Unix套接字路径, 为(host, port)时使用TCP, 每次导出建立一次连接发送全部内容
+    """
+
+    def __init__(self, registry: Registry = REGISTRY, path: str | None = None, address: str | tuple[str, int] | None = None, interval: float = 15.0, timeout: float = 1.0) -> None:
+        """初始化导出器
+
+        Args:
+            registry: 要导出的计数器
+            path: 输出文件路径, None表示不写文件
+            address: 套接字地址, None表示不发送
+            interval: 导出间隔(秒)
+            timeout: 套接字连接和发送的超时(秒)
+
+        Raises:
+            ValueError: 如果既没有文件路径也没有套接字地址, 或间隔不是正数
+        """
+        if path is None and address is None:
+            raise ValueError("path or address is required")
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        self.registry = registry
+        self.path = path
+        self.address = address
+        self.interval = interval
+        self.timeout = timeout
+        self._thread = None
+        self._stop = None
+        self._last = (time.monotonic(), registry.games.total)
+
+    def export(self) -> str:
+        """立即导出一次
+
+        Returns:
+            str: 导出的文本
+        """
+        now, games = time.monotonic(), self.registry.games.total
+        last_time, last_games = self._last
+        if now > last_time:
+            self.registry.games_per_second.set((games - last_games) / (now - last_time))
+        self._last = (now, games)
+
+        text = self.registry.render()
+        if self.path is not None:
+            try:
+                self._write_file(text)
+            except OSError as e:
+                logger.warning("Failed to write metrics to %s: %s", self.path, e)
+        if self.address is not None:
+            try:
+                self._send(text)
+            except OSError as e:
+                logger.debug("Failed to send metrics to %s: %s", self.address, e)
+        return text
+
+    def _write_file(self, text: str) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        temp = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp, "w", encoding="utf-8") as file:
+            file.write(text)
+        os.replace(temp, self.path)
+
+    def _send(self, text: str) -> None:
+        import socket  # 延迟导入, 只有发送到套接字时需要
+        if isinstance(self.address, str):
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(self.timeout)
+                sock.connect(self.address)
+                sock.sendall(text.encode())
+        else:
+            with socket.create_connection(self.address, timeout=self.timeout) as sock:
+                sock.sendall(text.encode())
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.export()
+
+    def start(self) -> "MetricsExporter":
+        """开启导出的计数器(见enable)并启动后台导出线程(守护线程, 不阻止进程退出)"""
+        import threading  # 延迟导入, 只有导出时需要
+        if self._thread is None:
+            enable(self.registry)
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._run, name="metrics-exporter", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """停止后台线程并进行最后一次导出"""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            self.export()
+
+    def __enter__(self) -> "MetricsExporter":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
@@ -0,0 +1,245 @@
+"""回合各阶段的耗时统计
+
+开启统计后(Game.phase_timers不为None), 引擎在下列调用处测量每次调用的耗时(纳秒),
+记录到对应阶段的对数分桶直方图:
+
+    _handle_player_turn     Game._handle_player_turn (包括其中的AI_action等阶段)
+    AI_action               Player.AI_action
+    Health.__isub__         Health.__isub__ (卡牌攻击和瞬间伤害效果)
+    after_turn              Game.after_turn
+    _handle_delay_attack    Player._handle_delay_attack
+
+没有开启统计的游戏在每个调用处只多一次属性检查, 不替换任何方法, 不影响同一进程中的其他游戏。
+搜索类AI的游戏副本不进行统计。
+
+用法:
+    timers = enable(game)  # 开启统计
+    game.start()           # 设置了phase_timers时Game.start()会自动开启, 并在结束时写入日志
+    print(timers.report())
+"""
+from __future__ import annotations
+from time import perf_counter_ns
+from typing import Callable, TypeVar
+
+_T = TypeVar("_T")
+
+# 每个2的幂区间再分为2**SUB_BUCKET_BITS个桶, 相对误差不超过1/2**SUB_BUCKET_BITS
+SUB_BUCKET_BITS = 2
+_SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+_EXACT = _SUB_BUCKETS << 1  # 小于该值的耗时每个值一个桶
+_NO_MIN = 1 << 64  # 没有记录时的最小耗时, 大于任何实际耗时
+
+PHASES = ("_handle_player_turn", "AI_action", "Health.__isub__", "after_turn", "_handle_delay_attack")
+
+
+class LatencyHistogram:
+    """对数分桶的耗时直方图(纳秒)
+
+    记录一次耗时为O(1), 只做整数运算和一次列表下标访问;
+    分位数按桶的上界估计, 相对误差不超过1/2**SUB_BUCKET_BITS
+    """
+
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self) -> None:
+        self.counts: list[int] = [0] * (64 * _SUB_BUCKETS)
+        self.count: int = 0
+        self.total: int = 0
+        self.min: int = _NO_MIN
+        self.max: int = 0
+
+    def record(self, ns: int) -> None:
+        """记录一次耗时
+
+        Args:
+            ns: 耗时(纳秒), 负数按0处理
+        """
+        if ns >= _EXACT:
+            shift = ns.bit_length() - SUB_BUCKET_BITS - 1
+            self.counts[(shift << SUB_BUCKET_BITS) + (ns >> shift)] += 1
+        else:
+            if ns < 0:
+                ns = 0
+            self.counts[ns] += 1
+        if ns > self.max:
+            self.max = ns
+        if ns < self.min:
+            self.min = ns
+        self.count += 1
+        self.total += ns
+
+    @staticmethod
+    def bucket_bounds(index: int) -> tuple[int, int]:
+        """获取桶的耗时范围
+
+        Args:
+            index: 桶下标
+
+        Returns:
+            (下界, 上界), 下界包含在内, 上界不包含
+        """
+        if index < _EXACT:
+            return index, index + 1
+        shift = index // _SUB_BUCKETS - 1
+        low = (index % _SUB_BUCKETS + _SUB_BUCKETS) << shift
+        return low, low + (1 << shift)
+
+    def percentile(self, q: float) -> int:
+        """估计分位数
+
+        Args:
+            q: 分位(0~100)
+
+        Returns:
+            int: 耗时(纳秒), 没有记录时为0
+        """
+        return self.percentiles(q)[0]
+
+    def percentiles(self, *qs: float) -> list[int]:
+        """一次遍历估计多个分位数
+
+        Args:
+            *qs: 分位(0~100), 按从小到大排列
+
+        Returns:
+            list[int]: 各分位的耗时(纳秒), 没有记录时为0
+        """
+        if not self.count:
+            return [0] * len(qs)
+        ranks = [max(1, -(-self.count * q // 100)) for q in qs]  # 向上取整, 至少为第1个
+        results = []
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if not count:
+                continue
+            seen += count
+            while len(results) < len(ranks) and seen >= ranks[len(results)]:
+                results.append(min(self.bucket_bounds(index)[1] - 1, self.max))
+            if len(results) == len(ranks):
+                break
+        return results + [self.max] * (len(ranks) - len(results))
+
+    @property
+    def mean(self) -> float:
+        """平均耗时(纳秒)"""
+        return self.total / self.count if self.count else 0.0
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """把另一个直方图的记录合并到本直方图
+
+        Args:
+            other: 另一个直方图
+        """
+        if not other.count:
+            return
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.count += other.count
+        self.total += other.total
+
+    def to_dict(self) -> dict:
+        """转换为可JSON序列化的字典
+
+        Returns:
+            dict: 次数(count)、总耗时(total_ns)、平均/最小/最大耗时、p50/p90/p99
+                  以及非空桶的(下界, 次数)列表(buckets), 耗时单位均为纳秒
+        """
+        p50, p90, p99 = self.percentiles(50, 90, 99)
+        return {
+            "count": self.count,
+            "total_ns": self.total,
+            "mean_ns": self.mean,
+            "min_ns": self.min if self.count else 0,
+            "max_ns": self.max,
+            "p50_ns": p50,
+            "p90_ns": p90,
+            "p99_ns": p99,
+            "buckets": [(self.bucket_bounds(index)[0], count) for index, count in enumerate(self.counts) if count],
+        }
+
+
+class PhaseTimers:
+    """一局游戏各阶段的耗时直方图"""
+
+    def __init__(self) -> None:
+        self.histograms: dict[str, LatencyHistogram] = {phase: LatencyHistogram() for phase in PHASES}
+
+    def __getitem__(self, phase: str) -> LatencyHistogram:
+        return self.histograms[phase]
+
+    def record(self, phase: str, ns: int) -> None:
+        """记录一次阶段耗时
+
+        Args:
+            phase: 阶段名称
+            ns: 耗时(纳秒)
+        """
+        self.histograms[phase].record(ns)
+
+    def measure(self, phase: str, function: Callable[..., _T], *args) -> _T:
+        """调用function(*args)并记录耗时(抛出异常时也记录)
+
+        Args:
+            phase: 阶段名称
+            function: 要调用的函数
+            *args: 参数
+
+        Returns:
+            function的返回值
+        """
+        start = perf_counter_ns()
+        try:
+            return function(*args)
+        finally:
+            self.histograms[phase].record(perf_counter_ns() - start)
+
+    def reset(self) -> None:
+        """清空所有记录"""
+        for phase in self.histograms:
+            self.histograms[phase] = LatencyHistogram()
+
+    def to_dict(self) -> dict[str, dict]:
+        """转换为阶段名称到LatencyHistogram.to_dict()结果的字典"""
+        return {phase: histogram.to_dict() for phase, histogram in self.histograms.items()}
+
+    def report(self) -> str:
+        """生成各阶段耗时的表格
+
+        Returns:
+            str: 每个阶段一行, 包括次数、总耗时(毫秒)和平均/p50/p90/p99/最大耗时(微秒)
+        """
+        lines = [f"{'phase':<22}{'count':>8}{'total ms':>10}{'mean us':>10}{'p50 us':>10}{'p90 us':>10}{'p99 us':>10}{'max us':>10}"]
+        for phase, h in self.histograms.items():
+            p50, p90, p99 = h.percentiles(50, 90, 99)
+            lines.append(
+                f"{phase:<22}{h.count:>8}{h.total / 1e6:>10.2f}{h.mean / 1e3:>10.1f}{p50 / 1e3:>10.1f}"
+                f"{p90 / 1e3:>10.1f}{p99 / 1e3:>10.1f}{h.max / 1e3:>10.1f}"
+            )
+        return "\n".join(lines)
+
+
+def enable(game) -> PhaseTimers:
+    """为游戏开启各阶段耗时统计
+
+    Args:
+        game: 游戏对象
+
+    Returns:
+        PhaseTimers: 游戏的耗时统计(已开启时返回原有的统计)
+    """
+    if game.phase_timers is None:
+        game.phase_timers = PhaseTimers()
+    return game.phase_timers
+
+
+def disable(game) -> PhaseTimers | None:
+    """关闭游戏的各阶段耗时统计
+
+    Returns:
+        PhaseTimers | None: 关闭前的统计
+    """
+    timers, game.phase_timers = game.phase_timers, None
+    return timers
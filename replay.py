@@ -0,0 +1,450 @@
+"""紧凑的二进制对局记录格式及快速回放引擎
+
+记录格式(所有整数均为小端序):
+    文件头: b"MP2R" + 版本号(B)
+            种子: 标志(B) + 种子(q)
+            设置(bool): 数量(H) + 每项字符串
+            设置(int): 数量(H) + 每项字符串 + 值(q)
+            玩家: 数量(B) + 每位玩家名称字符串 + AI等级(B)
+            初始牌库: 种类数(B) + 每种卡牌编号(B) + 数量(H)
+    记录: 操作码(B) + 操作数, 玩家和卡牌均用1字节编号表示
+        TURN   玩家                 玩家回合开始
+        DRAW   玩家 数量 卡牌...    玩家抽牌
+        USE    玩家 卡牌            玩家选择并使用卡牌
+        ATTACK 玩家 目标            玩家攻击目标
+        BED    玩家 卡牌 目标       玩家破坏目标的床或守护自己的床
+        FIRE   玩家 卡牌 目标       延迟攻击生效
+
+字符串以长度(B)加UTF-8编码存储, 卡牌编号为其在main.CARD_NAMES中的下标,
+玩家编号为其在game.players_in_order中的下标。因此一局最多MAX_PLAYERS位玩家,
+初始牌库中每种卡牌最多MAX_CARD_COUNT张。
+"""
+from __future__ import annotations
+import time
+import struct
+import logging
+import argparse
+
+from main import ALLOW_COMMAND, CARD_NAMES, Card, Game, NullOutput, Player, create_simulation
+from logger import log_level
+
+__all__ = [
+    "ReplayError",
+    "ReplayRecorder",
+    "Replay",
+    "record_game",
+    "record_simulation",
+    "replay",
+]
+
+MAGIC = b"MP2R"
+FORMAT_VERSION = 1
+
+# 操作码
+OP_TURN = 0
+OP_DRAW = 1
+OP_USE = 2
+OP_ATTACK = 3
+OP_BED = 4
+OP_FIRE = 5
+
+# 格式的上限: 玩家编号为1字节, 牌库中每种卡牌的数量为2字节
+MAX_PLAYERS = 0xFF
+MAX_CARD_COUNT = 0xFFFF
+
+CARD_INDEX: dict[str, int] = {name: i for i, name in enumerate(CARD_NAMES)}
+
+_pack_q = struct.Struct("<q")
+_pack_H = struct.Struct("<H")
+
+
+class ReplayError(Exception):
+    """对局记录格式错误或回放与记录不一致"""
+
+
+class _EndOfReplay(Exception):
+    """记录已全部应用, 但游戏仍要求进行下一个玩家回合(原对局因回合上限结束)"""
+
+
+def _pack_str(buffer: bytearray, text: str) -> None:
+    """写入长度前缀的UTF-8字符串"""
+    data = text.encode("utf-8")
+    if len(data) > 255:
+        raise ValueError(f"String too long for replay: {text!r}")
+    buffer.append(len(data))
+    buffer += data
+
+
+class ReplayRecorder:
+    """对局记录器, 挂载到game.recorder后由游戏在每个动作发生时调用
+
+    Attributes:
+        game (Game): 被记录的游戏
+        buffer (bytearray): 已编码的记录(包括文件头)
+        actions (int): 已记录的动作数
+    """
+
+    def __init__(self, game: Game) -> None:
+        """编码文件头: 种子、设置、玩家和初始牌库
+
+        Args:
+            game: 尚未开始的游戏
+
+        Raises:
+            ValueError: 如果玩家数量或牌库中某种卡牌的数量超出格式的上限
+        """
+        if len(game.players_in_order) > MAX_PLAYERS:
+            raise ValueError(f"Replay supports at most {MAX_PLAYERS} players, got {len(game.players_in_order)}")
+        for card, count in game.card_pool.cards.items():
+            if count > MAX_CARD_COUNT:
+                raise ValueError(f"Replay supports at most {MAX_CARD_COUNT} copies of a card in the pool, got {count} of {card.name}")
+
+        seed = game.seed
+        self.game = game
+        self.actions = 0
+        self._player_index: dict[Player, int] = {p: i for i, p in enumerate(game.players_in_order)}
+
+        buffer = bytearray(MAGIC)
+        buffer.append(FORMAT_VERSION)
+        buffer.append(seed is not None)
+        buffer += _pack_q.pack(seed or 0)
+
+        buffer += _pack_H.pack(len(game.setting_bool))
+        for key in game.setting_bool:
+            _pack_str(buffer, key)
+        buffer += _pack_H.pack(len(game.setting_int))
+        for key, value in game.setting_int.items():
+            _pack_str(buffer, key)
+            buffer += _pack_q.pack(value)
+
+        buffer.append(len(game.players_in_order))
+        for player in game.players_in_order:
+            _pack_str(buffer, player.name)
+            buffer.append(player.AI_level)
+
+        cards = game.card_pool.cards
+        buffer.append(len(cards))
+        for card, count in cards.items():
+            buffer.append(CARD_INDEX[card.name])
+            buffer += _pack_H.pack(count)
+
+        self.buffer = buffer
+
+    def getvalue(self) -> bytes:
+        """获取完整的对局记录
+
+        Returns:
+            bytes: 编码后的记录
+        """
+        return bytes(self.buffer)
+
+    def save(self, path: str) -> None:
+        """将对局记录写入文件
+
+        Args:
+            path: 文件路径
+        """
+        with open(path, "wb") as f:
+            f.write(self.buffer)
+
+    def turn(self, player: Player) -> None:
+        self.buffer += bytes((OP_TURN, self._player_index[player]))
+        self.actions += 1
+
+    def draw(self, player: Player, cards: list[Card]) -> None:
+        self.buffer += bytes((OP_DRAW, self._player_index[player], len(cards), *(CARD_INDEX[c.name] for c in cards)))
+        self.actions += 1
+
+    def receive(self, player: Player, card: Card) -> None:
+        # 不经抽牌进入手牌的卡牌(如被三叉戟攻击后得到的Damaged Trident)由攻击决定, 回放时会重新产生
+        pass
+
+    def use(self, player: Player, card: Card) -> None:
+        self.buffer += bytes((OP_USE, self._player_index[player], CARD_INDEX[card.name]))
+        self.actions += 1
+
+    def attack(self, player: Player, target: Player) -> None:
+        self.buffer += bytes((OP_ATTACK, self._player_index[player], self._player_index[target]))
+        self.actions += 1
+
+    def bed(self, player: Player, card: Card, target: Player) -> None:
+        self.buffer += bytes((OP_BED, self._player_index[player], CARD_INDEX[card.name], self._player_index[target]))
+        self.actions += 1
+
+    def fire(self, player: Player, card: Card, target: Player) -> None:
+        self.buffer += bytes((OP_FIRE, self._player_index[player], CARD_INDEX[card.name], self._player_index[target]))
+        self.actions += 1
+
+
+class Replay:
+    """解析后的对局记录, 挂载到game.replayer后由游戏在每个玩家回合调用apply_turn
+
+    Attributes:
+        seed (int | None): 随机数种子
+        setting_bool (tuple[str, ...]): 游戏设置(bool)
+        setting_int (dict[str, int]): 游戏设置(int)
+        players (list[tuple[str, int]]): 玩家名称及AI等级
+        card_pool (dict[str, int]): 初始牌库
+        data (bytes): 原始记录
+        turns (int): 记录中的玩家回合数
+    """
+
+    def __init__(self, data: bytes) -> None:
+        """解析文件头
+
+        Args:
+            data: ReplayRecorder生成的记录
+
+        Raises:
+            ReplayError: 如果记录格式错误
+        """
+        if data[:4] != MAGIC:
+            raise ReplayError("Not a replay file")
+        if data[4] != FORMAT_VERSION:
+            raise ReplayError(f"Unsupported replay version {data[4]}")
+        self.data = data
+        self._pos = 5
+
+        has_seed = self._byte()
+        seed = self._int64()
+        self.seed: int | None = seed if has_seed else None
+
+        self.setting_bool: tuple[str, ...] = tuple(self._str() for _ in range(self._uint16()))
+        self.setting_int: dict[str, int] = {}
+        for _ in range(self._uint16()):
+            key = self._str()
+            self.setting_int[key] = self._int64()
+
+        self.players: list[tuple[str, int]] = []
+        for _ in range(self._byte()):
+            name = self._str()
+            self.players.append((name, self._byte()))
+
+        self.card_pool: dict[str, int] = {}
+        for _ in range(self._byte()):
+            name = CARD_NAMES[self._byte()]
+            self.card_pool[name] = self._uint16()
+
+        self._records_start = self._pos
+        self._players: list[Player] = []
+        self._cards: list[Card | None] = []
+
+    @classmethod
+    def load(cls, path: str) -> Replay:
+        """从文件读取对局记录
+
+        Args:
+            path: 文件路径
+
+        Returns:
+            Replay: 解析后的对局记录
+        """
+        with open(path, "rb") as f:
+            return cls(f.read())
+
+    def _byte(self) -> int:
+        value = self.data[self._pos]
+        self._pos += 1
+        return value
+
+    def _uint16(self) -> int:
+        value, = _pack_H.unpack_from(self.data, self._pos)
+        self._pos += 2
+        return value
+
+    def _int64(self) -> int:
+        value, = _pack_q.unpack_from(self.data, self._pos)
+        self._pos += 8
+        return value
+
+    def _str(self) -> str:
+        length = self._byte()
+        text = self.data[self._pos:self._pos + length].decode("utf-8")
+        self._pos += length
+        return text
+
+    @property
+    def turns(self) -> int:
+        """扫描记录统计玩家回合数
+
+        Raises:
+            ReplayError: 如果遇到未知操作码
+        """
+        data = self.data
+        pos = self._records_start
+        turns = 0
+        while pos < len(data):
+            op = data[pos]
+            if op == OP_TURN:
+                turns += 1
+                pos += 2
+            elif op == OP_DRAW:
+                pos += 3 + data[pos + 2]
+            elif op in (OP_USE, OP_ATTACK):
+                pos += 3
+            elif op in (OP_BED, OP_FIRE):
+                pos += 4
+            else:
+                raise ReplayError(f"Unknown opcode {op} at byte {pos}")
+        return turns
+
+    @property
+    def actions(self) -> int:
+        """记录中的动作数"""
+        data = self.data
+        pos = self._records_start
+        actions = 0
+        while pos < len(data):
+            op = data[pos]
+            pos += 3 + data[pos + 2] if op == OP_DRAW else (2, 3, 3, 3, 4, 4)[op]
+            actions += 1
+        return actions
+
+    def build_game(self) -> Game:
+        """按文件头创建尚未开始的游戏
+
+        Returns:
+            Game: 玩家、设置和牌库与记录一致的游戏
+        """
+        game = Game(*self.setting_bool, seed=self.seed, **self.setting_int)
+        game.metrics = None  # 回放的对局不计入计数器
+        game.add_player(*(Player(name, AI_level) for name, AI_level in self.players))
+        game.card_pool.cards = {Card(name, game): count for name, count in self.card_pool.items()}
+        return game
+
+    def _apply(self, stop_at_turn: bool) -> None:
+        """依次应用记录中的动作, 直到下一个玩家回合或记录结束
+
+        Args:
+            stop_at_turn: 遇到TURN记录时是否停止
+        """
+        data = self.data
+        players = self._players
+        cards = self._cards
+        pos = self._pos
+        end = len(data)
+        while pos < end:
+            op = data[pos]
+            if op == OP_TURN:
+                if stop_at_turn:
+                    break
+                raise ReplayError(f"Unexpected turn record at byte {pos}")
+            player = players[data[pos + 1]]
+            if op == OP_USE:
+                player._use_card(cards[data[pos + 2]])
+                pos += 3
+            elif op == OP_ATTACK:
+                player._attack_player(players[data[pos + 2]])
+                pos += 3
+            elif op == OP_DRAW:
+                count = data[pos + 2]
+                drawn = [cards[i] for i in data[pos + 3:pos + 3 + count]]
+                player.add_card(*player.game.card_pool.take_card(*drawn))
+                pos += 3 + count
+            elif op == OP_BED:
+                player._bed_action(cards[data[pos + 2]], players[data[pos + 3]])
+                pos += 4
+            elif op == OP_FIRE:
+                # 延迟攻击由游戏自身在回合结束时处理, 记录仅供分析
+                pos += 4
+            else:
+                raise ReplayError(f"Unknown opcode {op} at byte {pos}")
+        self._pos = pos
+
+    def apply_turn(self, player: Player) -> None:
+        """应用一个玩家回合内的所有动作
+
+        Args:
+            player: 游戏当前回合的玩家
+
+        Raises:
+            ReplayError: 如果当前玩家与记录不一致
+        """
+        data = self.data
+        pos = self._pos
+        if pos >= len(data):
+            raise _EndOfReplay
+        if data[pos] != OP_TURN or self._players[data[pos + 1]] is not player:
+            raise ReplayError(f"Replay diverged at byte {pos}: expected turn of {player.name}")
+        self._pos = pos + 2
+        self._apply(True)
+
+    def run(self) -> Game:
+        """以无界面模式重建整局游戏
+
+        Returns:
+            Game: 回放结束后的游戏
+        """
+        with log_level(logging.WARNING):
+            game = self.build_game()
+            self._players = game.players_in_order
+            # 卡牌编号到卡牌对象的映射, 不允许命令时命令卡牌不可能出现在记录中
+            allow_command = game.get_setting(ALLOW_COMMAND)
+            self._cards = [Card(name, game) if name[0] != "/" or allow_command else None for name in CARD_NAMES]
+            self._pos = self._records_start
+            game.headless = True
+            game.output = NullOutput()
+            game.replayer = self
+            game.started = True
+            # 开局发牌
+            self._apply(True)
+            # 使用游戏自身的回合循环, 每个玩家回合由apply_turn应用记录
+            try:
+                game._play()
+            except _EndOfReplay:
+                pass
+        game.is_game_over = True
+        game.replayer = None
+        return game
+
+
+def record_game(game: Game) -> ReplayRecorder:
+    """为尚未开始的游戏挂载记录器
+
+    Args:
+        game: 已加入所有玩家的游戏
+
+    Returns:
+        ReplayRecorder: 挂载的记录器
+    """
+    game.recorder = ReplayRecorder(game)
+    return game.recorder
+
+
+def record_simulation(AI_levels: list[int] = [1, 2, 3, 3], seed: int | None = None, max_turns: int = 10000, *setting_bool: str, card_pool_doublings: int = 0, **setting_int: int) -> tuple[dict, bytes]:
+    """无界面进行一局AI对战并记录(参数见main.simulate)
+
+    Returns:
+        tuple[dict, bytes]: Game.simulate的结果及对局记录
+    """
+    game = create_simulation(AI_levels, seed, *setting_bool, card_pool_doublings=card_pool_doublings, **setting_int)
+    recorder = record_game(game)
+    result = game.simulate(max_turns)
+    return result, recorder.getvalue()
+
+
+def replay(data: bytes) -> Game:
+    """回放对局记录
+
+    Args:
+        data: ReplayRecorder生成的记录
+
+    Returns:
+        Game: 回放结束后的游戏
+    """
+    return Replay(data).run()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a recorded MC PvP card game")
+    parser.add_argument("path")
+    args = parser.parse_args()
+
+    record = Replay.load(args.path)
+    start_time = time.perf_counter()
+    game = record.run()
+    elapsed = time.perf_counter() - start_time
+    print(f"{len(record.data)} bytes, {record.actions} actions, {record.turns} turns, replayed in {elapsed * 1000:.2f}ms")
+    print(f"Winner: {game.winner.name if game.winner is not None else None}")
+    for player in game.players_in_order:
+        print(player.info())
@@ -0,0 +1,430 @@
+"""异步多人对战服务器: 一个事件循环同时进行多局游戏
+
+人类玩家通过TCP连接参加游戏, AI的思考延迟使用asyncio.sleep, 不会阻塞其他对局。
+人类玩家回合由Game._player_turn_steps产生输入提示, 服务器把提示发给客户端并异步等待回答。
+
+协议(UTF-8文本, 每行一条):
+- 客户端连接后先发送一行玩家名称(可以为空, 为空时由游戏随机选择)
+- 服务器发送的普通行是游戏输出; 以PROMPT_PREFIX开头的行是输入提示, 客户端需回答一行
+- 游戏结束后服务器发送以RESULT_PREFIX开头的结果行并关闭连接
+
+客户端断开后, 其玩家由DISCONNECTED_AI_LEVEL级AI接管
+"""
+from __future__ import annotations
+import time
+import random
+import asyncio
+import logging
+import argparse
+from typing import Callable, Mapping
+
+from main import (
+    AI_THINKING_TIME, DEBUG, EXIT_ON_ALL_HUMAN_DEAD, WAIT_FOR_AI_THINKING,
+    BufferedOutput, Game, Player, announce, derive_seed, lang,
+)
+from logger import logger, log_level
+from metrics import MetricsExporter
+
+__all__ = [
+    "PROMPT_PREFIX",
+    "RESULT_PREFIX",
+    "RemoteSeat",
+    "RemoteOutput",
+    "play_game",
+    "GameServer",
+    "LoopbackClient",
+]
+
+PROMPT_PREFIX = "? "
+RESULT_PREFIX = "= "
+ENCODING = "utf-8"
+DISCONNECTED_AI_LEVEL = 1
+
+
+class RemoteSeat:
+    """一位通过TCP连接参加游戏的人类玩家
+
+    Attributes:
+        name (str): 客户端发送的玩家名称
+        connected (bool): 连接是否仍然可用
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, name: str = "") -> None:
+        """初始化座位
+
+        Args:
+            reader: 连接的读取端
+            writer: 连接的写入端
+            name: 玩家名称
+        """
+        self.reader = reader
+        self.writer = writer
+        self.name: str = name
+        self.connected: bool = True
+        self.closed: asyncio.Event = asyncio.Event()
+
+    def send(self, text: str) -> None:
+        """发送文本(不等待写完)
+
+        Args:
+            text: 要发送的文本
+        """
+        if self.connected:
+            self.writer.write(text.encode(ENCODING))
+
+    async def ask(self, prompt: str) -> str:
+        """发送输入提示并等待客户端回答
+
+        Args:
+            prompt: 输入提示
+
+        Returns:
+            客户端回答的一行(去掉首尾空白)
+
+        Raises:
+            ConnectionError: 如果连接已断开
+        """
+        if not self.connected:
+            raise ConnectionError("Seat is disconnected")
+        self.send(PROMPT_PREFIX + prompt.strip() + "\n")
+        try:
+            await self.writer.drain()
+            line = await self.reader.readline()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            line = b""
+        if not line:
+            self.connected = False
+            raise ConnectionError("Client disconnected")
+        return line.decode(ENCODING).strip()
+
+    async def close(self, result: str = "") -> None:
+        """发送结果行并关闭连接
+
+        Args:
+            result: 结果文本
+        """
+        try:
+            if self.connected:
+                self.send(RESULT_PREFIX + result + "\n")
+                self.connected = False
+                await self.writer.drain()
+            self.writer.close()
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+        self.closed.set()
+
+
+class RemoteOutput(BufferedOutput):
+    """把一局游戏的输出缓冲后发送给所有连接的客户端"""
+
+    def __init__(self, seats: list[RemoteSeat]) -> None:
+        """初始化远程输出
+
+        Args:
+            seats: 接收输出的座位
+        """
+        super().__init__()
+        self.seats: list[RemoteSeat] = seats
+
+    def flush(self) -> None:
+        if self.buffer:
+            text = "".join(self.buffer)
+            for seat in self.seats:
+                seat.send(text)
+            self.buffer.clear()
+
+    def input(self, prompt: str) -> str:
+        raise RuntimeError("Remote players answer through RemoteSeat.ask")
+
+
+async def _answer_steps(game: Game, player: Player, seat: RemoteSeat | None) -> None:
+    """进行人类玩家的回合, 异步回答输入提示(对应Game._ask)
+
+    无效输入结束本回合; 连接断开时由AI接管该玩家, 本回合结束
+
+    Args:
+        game: 游戏
+        player: 当前回合的人类玩家
+        seat: 玩家的座位, None表示没有连接
+    """
+    steps = game._player_turn_steps(player)
+    try:
+        if seat is None:
+            raise ConnectionError("Player has no seat")
+        prompt = next(steps)
+        while True:
+            game.output.flush()
+            answer = await seat.ask(prompt)
+            prompt = steps.send(answer)
+    except StopIteration:
+        pass
+    except (ValueError, IndexError):
+        steps.close()
+        game.output.write(lang("message", "Invalid input, turn skipped"))
+    except ConnectionError:
+        steps.close()
+        logger.debug("%s disconnected, AI level %s takes over", player.name, DISCONNECTED_AI_LEVEL)
+        player.AI_level = DISCONNECTED_AI_LEVEL
+        game._count_alive()
+        announce(game, "message", "{} disconnected", player.name)
+
+
+async def play_game(game: Game, seats: Mapping[Player, RemoteSeat] | None = None, max_turns: int | None = None, thinking_time: tuple[float, float] = AI_THINKING_TIME) -> bool:
+    """在事件循环中进行一局游戏(对应Game.start)
+
+    WAIT_FOR_AI_THINKING开启时, AI的思考延迟使用asyncio.sleep, 不阻塞其他对局
+
+    Args:
+        game: 尚未开始的游戏
+        seats: 人类玩家对应的座位
+        max_turns: 最大玩家回合数, None表示不限制
+        thinking_time: AI思考时间的范围(秒)
+
+    Returns:
+        bool: 决出胜者返回True, 因人类玩家全部死亡或达到回合上限而退出返回False
+    """
+    seats = seats or {}
+    thinking = bool(game.get_setting(WAIT_FOR_AI_THINKING))
+    if thinking:
+        # 由服务器异步等待, 避免Player.AI_action中的time.sleep阻塞事件循环
+        game.setting_bool = tuple(key for key in game.setting_bool if key != WAIT_FOR_AI_THINKING)
+    if not isinstance(game.output, RemoteOutput):
+        game.output = RemoteOutput(list(seats.values()))
+
+    game.started = True
+    game._start_phase_timers()
+    game._setup_game()
+    finished = False
+    while len(game.players) > 1:
+        if max_turns is not None and game.turn_count >= max_turns:
+            break
+
+        if game.get_setting(DEBUG):
+            game.output.write(str(game.delay_attack))
+
+        player = game.players.peek()
+        if player.health.health <= 0:
+            game.players.pop_last()
+            continue
+
+        if player.AI_level:
+            if thinking:
+                game.output.flush()
+                await asyncio.sleep(random.uniform(*thinking_time))
+            if game.phase_timers is None:
+                game._handle_player_turn(player)
+            else:
+                game.phase_timers.measure("_handle_player_turn", game._handle_player_turn, player)
+        else:
+            await _answer_steps(game, player, seats.get(player))
+        game._end_turn()
+
+        if game.get_setting(EXIT_ON_ALL_HUMAN_DEAD) and game._check_human_dead():
+            break
+        # 让出事件循环, 使其他对局和连接得以进行
+        await asyncio.sleep(0)
+    else:
+        game.winner = game.players.peek()
+        finished = True
+
+    if finished:
+        announce(game, "message", "Game over!")
+        announce(game, "message", "{} wins!", game.winner.name)
+    else:
+        announce(game, "message", "Game exited for no human alive!")
+    game._finish_game()
+    game.output.flush()
+    return finished
+
+
+class GameServer:
+    """TCP对战服务器
+
+    每凑齐humans位客户端就与AI玩家开始一局新游戏, 所有对局在同一个事件循环中进行
+
+    Attributes:
+        games_started (int): 已开始的对局数
+        games_finished (int): 已结束的对局数
+        results (list[dict]): 已结束对局的结果
+    """
+
+    def __init__(self, humans: int = 1, AI_levels: list[int] = [1, 2, 3], *setting_bool: str, seed: int | None = None, thinking_time: tuple[float, float] = AI_THINKING_TIME, max_turns: int | None = 10000, **setting_int: int) -> None:
+        """初始化服务器
+
+        Args:
+            humans: 每局的人类玩家数量
+            AI_levels: 每局中AI玩家的等级
+            *setting_bool: 游戏设置(bool)
+            seed: 基础随机数种子, 第i局使用derive_seed(seed, i), None表示使用系统熵源
+            thinking_time: AI思考时间的范围(秒), 需开启WAIT_FOR_AI_THINKING
+            max_turns: 每局最大玩家回合数
+            **setting_int: 游戏设置(int)
+
+        Raises:
+            ValueError: 如果人类玩家数量小于1
+        """
+        if humans < 1:
+            raise ValueError("A server game needs at least one human player")
+        self.humans: int = humans
+        self.AI_levels: list[int] = list(AI_levels)
+        self.setting_bool = setting_bool
+        self.setting_int = setting_int
+        self.seed: int | None = seed
+        self.thinking_time = thinking_time
+        self.max_turns = max_turns
+        self.games_started: int = 0
+        self.games_finished: int = 0
+        self.results: list[dict] = []
+        self._waiting: list[RemoteSeat] = []
+        self._tasks: set[asyncio.Task] = set()
+        self._server: asyncio.Server | None = None
+
+    @property
+    def port(self) -> int:
+        """服务器实际监听的端口(以端口0启动时由系统分配)"""
+        return self._server.sockets[0].getsockname()[1]
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        """开始监听连接
+
+        Args:
+            host: 监听地址
+            port: 监听端口, 0表示由系统分配
+        """
+        self._server = await asyncio.start_server(self._handle_client, host, port)
+        logger.debug("Game server listening on %s:%s", host, self.port)
+
+    async def serve_forever(self) -> None:
+        """持续接受连接直到被取消"""
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        """停止接受连接并等待进行中的对局结束, 仍在等待开局的客户端直接断开"""
+        self._server.close()
+        waiting, self._waiting = self._waiting, []
+        for seat in waiting:
+            await seat.close()
+        await self._server.wait_closed()
+        if self._tasks:
+            await asyncio.gather(*self._tasks)
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """处理新连接: 读取玩家名称后加入等待队列, 直到所在对局结束"""
+        line = await reader.readline()
+        seat = RemoteSeat(reader, writer, line.decode(ENCODING).strip())
+        self._waiting.append(seat)
+        if len(self._waiting) >= self.humans:
+            seats, self._waiting = self._waiting[:self.humans], self._waiting[self.humans:]
+            task = asyncio.create_task(self._run_game(seats))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        await seat.closed.wait()
+
+    async def _run_game(self, seats: list[RemoteSeat]) -> None:
+        """用给定的座位和AI玩家进行一局游戏"""
+        index = self.games_started
+        self.games_started += 1
+        seed = derive_seed(self.seed, index) if self.seed is not None else None
+        game = Game(*self.setting_bool, seed=seed, **self.setting_int)
+        humans = [Player(seat.name or None, 0) for seat in seats]
+        game.add_player(*humans)
+        game.add_player(*(Player(f"AI{i + 1}", level) for i, level in enumerate(self.AI_levels)))
+        game.output = RemoteOutput(seats)
+
+        start_time = time.perf_counter()
+        try:
+            await play_game(game, dict(zip(humans, seats)), self.max_turns, self.thinking_time)
+        except Exception:
+            # 一局游戏出错不影响其他对局
+            logger.exception("Game %s aborted", index)
+        finally:
+            winner = game.winner.name if game.winner is not None else ""
+            self.results.append({"index": index, "winner": winner, "turns": game.turn_count, "elapsed": time.perf_counter() - start_time})
+            self.games_finished += 1
+            for seat in seats:
+                await seat.close(winner)
+
+
+class LoopbackClient:
+    """本地测试客户端: 按strategy自动回答服务器的输入提示
+
+    Attributes:
+        transcript (list[str]): 收到的游戏输出
+        result (str | None): 服务器发送的结果(胜者名称)
+        prompts (int): 回答过的输入提示数量
+    """
+
+    def __init__(self, strategy: Callable[[str, list[str]], str] | None = None) -> None:
+        """初始化客户端
+
+        Args:
+            strategy: 回答函数, 参数为输入提示和已收到的输出, 默认总是回答"1"
+        """
+        self.strategy = strategy or (lambda prompt, transcript: "1")
+        self.transcript: list[str] = []
+        self.result: str | None = None
+        self.prompts: int = 0
+
+    async def play(self, host: str, port: int, name: str = "") -> str | None:
+        """连接服务器并进行游戏直到结束
+
+        Args:
+            host: 服务器地址
+            port: 服务器端口
+            name: 玩家名称
+
+        Returns:
+            胜者名称, 连接意外关闭时为None
+        """
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write((name + "\n").encode(ENCODING))
+        while line := await reader.readline():
+            text = line.decode(ENCODING).rstrip("\n")
+            if text.startswith(PROMPT_PREFIX):
+                self.prompts += 1
+                writer.write((self.strategy(text[len(PROMPT_PREFIX):], self.transcript) + "\n").encode(ENCODING))
+            elif text.startswith(RESULT_PREFIX):
+                self.result = text[len(RESULT_PREFIX):]
+            else:
+                self.transcript.append(text)
+        writer.close()
+        return self.result
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    settings = (WAIT_FOR_AI_THINKING,) if args.thinking else ()
+    server = GameServer(args.humans, args.ai, *settings, seed=args.seed)
+    await server.start(args.host, args.port)
+    print(f"Serving on {args.host}:{server.port}")
+    await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Host MC PvP card games over TCP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--humans", type=int, default=1, help="human players per game")
+    parser.add_argument("--ai", type=int, nargs="*", default=[1, 2, 3], help="AI levels per game")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--thinking", action="store_true", help="enable AI thinking delays")
+    parser.add_argument("--metrics-file", default=None, help="write Prometheus metrics to this file")
+    parser.add_argument("--metrics-socket", default=None, help="send Prometheus metrics to this Unix socket or host:port")
+    parser.add_argument("--metrics-interval", type=float, default=15.0, help="seconds between metrics exports")
+    args = parser.parse_args()
+
+    exporter = None
+    if args.metrics_file or args.metrics_socket:
+        address = args.metrics_socket
+        if address and ":" in address:
+            host, _, port = address.rpartition(":")
+            address = (host, int(port))
+        exporter = MetricsExporter(path=args.metrics_file, address=address, interval=args.metrics_interval).start()
+    with log_level(logging.WARNING):
+        try:
+            asyncio.run(_serve(args))
+        except KeyboardInterrupt:
+            pass
+    if exporter is not None:
+        exporter.stop()
@@ -0,0 +1,191 @@
+import os
+import sys
+import random
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from MP2_dataType import FenwickTree, NamePool, Queue, RepeatQueue, RingBuffer, Stack
+
+
+def expected_index(values: list[int], target: int) -> int:
+    """逐个累加求前缀和大于target的最小下标"""
+    for index, value in enumerate(values):
+        if target < value:
+            return index
+        target -= value
+    raise IndexError(target)
+
+
+class FenwickTreeTest(unittest.TestCase):
+    def assert_consistent(self, tree: FenwickTree, values: list[int]) -> None:
+        self.assertEqual(tree.values, values)
+        self.assertEqual(tree.total, sum(values))
+        for count in range(len(values) + 1):
+            self.assertEqual(tree.prefix_sum(count), sum(values[:count]))
+        for target in range(tree.total):
+            self.assertEqual(tree.find(target), expected_index(values, target), target)
+
+    def test_find_at_boundaries_skips_zero_weights(self) -> None:
+        values = [0, 3, 0, 0, 2, 1, 0, 4]
+        tree = FenwickTree(values)
+        self.assert_consistent(tree, values)
+        # 每种卡牌的最后一个和下一个累计值
+        self.assertEqual(tree.find(2), 1)
+        self.assertEqual(tree.find(3), 4)
+        self.assertEqual(tree.find(5), 5)
+        self.assertEqual(tree.find(6), 7)
+        self.assertEqual(tree.find(9), 7)
+
+    def test_find_out_of_range(self) -> None:
+        tree = FenwickTree([0, 2, 0])
+        for target in (-1, 2):
+            with self.assertRaises(IndexError):
+                tree.find(target)
+        with self.assertRaises(IndexError):
+            FenwickTree([0, 0]).find(0)
+        with self.assertRaises(IndexError):
+            FenwickTree().find(0)
+
+    def test_weight_dropping_to_zero(self) -> None:
+        values = [1, 2, 1]
+        tree = FenwickTree(values)
+        tree.add(1, -2)
+        values[1] -= 2
+        self.assert_consistent(tree, values)
+        self.assertEqual(tree.find(0), 0)
+        self.assertEqual(tree.find(1), 2)
+
+    def test_random_updates_and_appends(self) -> None:
+        rng = random.Random(0)
+        values = [rng.randrange(3) for _ in range(5)]
+        tree = FenwickTree(values)
+        for _ in range(300):
+            if rng.random() < 0.1:
+                value = rng.randrange(3)
+                tree.append(value)
+                values.append(value)
+            else:
+                index = rng.randrange(len(values))
+                delta = rng.randrange(-values[index], 3)
+                tree.add(index, delta)
+                values[index] += delta
+            self.assert_consistent(tree, values)
+        copy = tree.copy()
+        copy.add(0, 5)
+        self.assert_consistent(tree, values)
+
+
+class QueueTest(unittest.TestCase):
+    def test_queue_order(self) -> None:
+        queue = Queue([1, 2])
+        queue.put(3)
+        self.assertEqual(queue.front(), 1)
+        self.assertEqual([queue.peek() for _ in range(3)], [1, 2, 3])
+        self.assertTrue(queue.is_empty())
+        with self.assertRaises(IndexError):
+            queue.peek()
+
+    def test_stack_order(self) -> None:
+        stack = Stack([1, 2])
+        stack.push(3)
+        self.assertEqual(stack.peek(), 3)
+        self.assertEqual([stack.pop() for _ in range(3)], [3, 2, 1])
+        self.assertFalse(stack)
+        with self.assertRaises(IndexError):
+            stack.pop()
+
+    def test_repeat_queue_cycles(self) -> None:
+        queue = RepeatQueue("ABC")
+        self.assertEqual([queue.peek() for _ in range(7)], list("ABCABCA"))
+        self.assertEqual(len(queue), 3)
+
+    def test_repeat_queue_pop_last_removes_peeked(self) -> None:
+        # 与Game._play相同: peek取出的玩家死亡时用pop_last移除, 其余玩家的顺序不变
+        queue = RepeatQueue("ABCD")
+        self.assertEqual(queue.peek(), "A")
+        self.assertEqual(queue.peek(), "B")
+        self.assertEqual(queue.pop_last(), "B")
+        self.assertEqual(list(queue), list("CDA"))
+        self.assertEqual([queue.peek() for _ in range(4)], list("CDAC"))
+        self.assertEqual(queue.pop_last(), "C")
+        self.assertEqual([queue.peek() for _ in range(3)], list("DAD"))
+
+    def test_repeat_queue_pop_last_until_empty(self) -> None:
+        queue = RepeatQueue("AB")
+        queue.peek()
+        self.assertEqual(queue.pop_last(), "A")
+        self.assertEqual(queue.peek(), "B")
+        self.assertEqual(queue.pop_last(), "B")
+        with self.assertRaises(IndexError):
+            queue.pop_last()
+        with self.assertRaises(IndexError):
+            queue.peek()
+
+    def test_copy_keeps_type(self) -> None:
+        queue = RepeatQueue("AB")
+        copy = queue.copy()
+        copy.peek()
+        self.assertIsInstance(copy, RepeatQueue)
+        self.assertEqual(list(queue), list("AB"))
+        self.assertEqual(list(copy), list("BA"))
+
+    def test_ring_buffer_drops_oldest(self) -> None:
+        ring = RingBuffer(3, [1, 2])
+        self.assertFalse(ring.is_full())
+        ring.put(3)
+        ring.put(4)
+        self.assertTrue(ring.is_full())
+        self.assertEqual(list(ring), [2, 3, 4])
+        ring.rotate()
+        self.assertEqual(ring.front(), 3)
+        self.assertEqual(ring.copy().capacity, 3)
+        with self.assertRaises(ValueError):
+            RingBuffer(0)
+
+
+class NamePoolTest(unittest.TestCase):
+    NAMES = ["Steve", "Alex", "Herobrine"]
+
+    def test_take_is_unique(self) -> None:
+        pool = NamePool(self.NAMES + ["Steve"], random.Random(0))
+        names = [pool.take() for _ in range(9)]
+        self.assertEqual(len(set(names)), 9)
+        self.assertEqual(set(names[:3]), set(self.NAMES))
+        self.assertEqual(set(names[3:]), {f"{name}{suffix}" for name in self.NAMES for suffix in (2, 3)})
+
+    def test_reserve_user_chosen_names(self) -> None:
+        pool = NamePool(self.NAMES, random.Random(0))
+        # 候选名称、带后缀的名称和不在候选中的名称都不会再被分配
+        self.assertTrue(pool.reserve("Alex"))
+        self.assertTrue(pool.reserve("Steve2"))
+        self.assertTrue(pool.reserve("Notch"))
+        self.assertFalse(pool.reserve("Alex"))
+        self.assertIn("Notch", pool)
+        names = [pool.take() for _ in range(5)]
+        self.assertEqual(len(set(names)), 5)
+        self.assertFalse({"Alex", "Steve2", "Notch"} & set(names))
+        self.assertEqual(len(pool), 8)
+
+    def test_reserve_taken_name(self) -> None:
+        pool = NamePool(["Steve"], random.Random(0))
+        self.assertEqual(pool.take(), "Steve")
+        self.assertFalse(pool.reserve("Steve"))
+
+    def test_release(self) -> None:
+        pool = NamePool(["Steve", "Alex"], random.Random(0))
+        first = pool.take()
+        pool.release(first)
+        pool.release("Nobody")
+        self.assertNotIn(first, pool)
+        self.assertEqual(len(pool), 0)
+        self.assertEqual({pool.take(), pool.take()}, {"Steve", "Alex"})
+        self.assertEqual(pool.take(), "Steve2")
+
+    def test_empty_candidates(self) -> None:
+        pool = NamePool([])
+        self.assertEqual([pool.take(), pool.take()], ["Player1", "Player2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
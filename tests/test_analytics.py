@@ -0,0 +1,23 @@
+import os
+import sys
+import logging
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics import analyze
+from logger import log_level
+
+
+class AnalyzeTest(unittest.TestCase):
+    def test_damaging_cards_are_held(self) -> None:
+        with log_level(logging.WARNING):
+            cards = analyze(300, [1, 2, 3, 3], seed=1, replicates=20).tables()["cards"]
+        damaging = cards[cards["damage"] > 0]
+        self.assertIn("Damaged Trident", damaging["card"].tolist())
+        for row in damaging:
+            self.assertGreater(row["held"], 0, row["card"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import sys
+import logging
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from logger import LazyFileHandler
+
+
+class LazyFileHandlerTest(unittest.TestCase):
+    MAX_BYTES = 4096
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, "logs", "game.log")
+        self.handler = LazyFileHandler(self.filename, max_bytes=self.MAX_BYTES)
+        self.handler.setFormatter(logging.Formatter("%(message)s"))
+        self.logger = logging.getLogger(f"{__name__}.{self.id()}")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.addHandler(self.handler)
+
+    def tearDown(self) -> None:
+        self.logger.removeHandler(self.handler)
+        self.handler.close()
+        self.directory.cleanup()
+
+    def test_no_file_until_first_record(self) -> None:
+        self.assertFalse(os.path.exists(os.path.dirname(self.filename)))
+        self.logger.debug("first")
+        self.assertTrue(os.path.exists(self.filename))
+
+    def test_size_stays_bounded(self) -> None:
+        line = "x" * 99
+        for _ in range(10 * self.MAX_BYTES // len(line)):
+            self.logger.debug(line)
+        self.handler.flush()
+        self.assertLessEqual(os.path.getsize(self.filename), self.MAX_BYTES)
+        self.assertLessEqual(os.path.getsize(self.filename + ".1"), self.MAX_BYTES)
+        self.assertFalse(os.path.exists(self.filename + ".2"))
+
+    def test_backup_count_must_be_positive(self) -> None:
+        with self.assertRaises(ValueError):
+            LazyFileHandler(self.filename, max_bytes=self.MAX_BYTES, backup_count=0)
+
+    def test_open_failure_is_handled_once(self) -> None:
+        # 日志目录的位置被普通文件占用, 无法创建目录
+        os.makedirs(self.directory.name, exist_ok=True)
+        with open(os.path.dirname(self.filename), "w"):
+            pass
+        with mock.patch.object(self.handler, "_open", wraps=self.handler._open) as opened, \
+                mock.patch.object(self.handler, "handleError") as handle_error:
+            self.logger.debug("first")
+            self.logger.debug("second")
+        self.assertEqual(opened.call_count, 1)
+        self.assertEqual(handle_error.call_count, 1)
+        self.assertTrue(self.handler.failed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+import os
+import sys
+import random
+import logging
+import unittest
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import CARD_ATTACK, CARD_BED, CARD_CATEGORIES, CARD_DEFENCE, CARD_HEALING, Card, CardPool, Game, Hand, Player, _get_names
+from logger import log_level
+
+
+class CardPoolTest(unittest.TestCase):
+    def setUp(self) -> None:
+        level = log_level(logging.WARNING)
+        level.__enter__()
+        self.addCleanup(level.__exit__, None, None, None)
+        self.game = Game(seed=0)
+        self.apple = Card("Apple", self.game)
+        self.sword = Card("Wooden Sword", self.game)
+        self.shield = Card("Shield", self.game)
+        self.pool = CardPool({self.apple: 2, self.sword: 3}, self.game)
+
+    def assert_totals(self, expected: dict[Card, int]) -> None:
+        self.assertEqual(dict(self.pool.cards), {card: count for card, count in expected.items() if count})
+        self.assertEqual(len(self.pool), sum(expected.values()))
+
+    def test_take_card(self) -> None:
+        self.assertEqual(self.pool.take_card(self.apple, self.sword, self.apple), [self.apple, self.sword, self.apple])
+        self.assert_totals({self.sword: 2})
+        with self.assertRaises(ValueError):
+            self.pool.take_card(self.apple)
+        with self.assertRaises(ValueError):
+            self.pool.take_card(self.shield)
+        self.assert_totals({self.sword: 2})
+
+    def test_add_card(self) -> None:
+        self.pool.add_card(self.apple)
+        self.pool.add_card(self.shield, 2)
+        self.assert_totals({self.apple: 3, self.sword: 3, self.shield: 2})
+        self.pool.take_card(self.shield, self.shield)
+        self.assert_totals({self.apple: 3, self.sword: 3})
+        self.pool.add_card(self.shield)
+        self.assert_totals({self.apple: 3, self.sword: 3, self.shield: 1})
+
+    def test_draw_matches_totals(self) -> None:
+        remaining = {self.apple: 2, self.sword: 3}
+        for card in self.pool.draw_card(4):
+            remaining[card] -= 1
+        self.assert_totals(remaining)
+        self.assertEqual(self.pool.draw_card(1), [next(card for card, count in remaining.items() if count)])
+        self.assertEqual(len(self.pool), 0)
+
+    def test_refill_from_discard_pile(self) -> None:
+        self.pool.take_card(self.apple, self.apple, self.sword, self.sword)
+        self.pool.put_back(self.apple)
+        self.pool.put_back(self.shield)
+        self.assertEqual(self.pool.take_card(self.shield, self.sword), [self.shield, self.sword])
+        self.assert_totals({self.apple: 1})
+        self.assertEqual(self.pool.discard_pile, [])
+
+    def test_cards_is_read_only(self) -> None:
+        with self.assertRaises(TypeError):
+            self.pool.cards[self.apple] = 5
+        self.assert_totals({self.apple: 2, self.sword: 3})
+
+
+class HandTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.apple = Card("Apple")
+        self.sword = Card("Wooden Sword")
+        self.shield = Card("Shield")
+        self.bed = Card("Bed")
+
+    def assert_totals(self, hand: Hand, cards: list[Card]) -> None:
+        """检查手牌与展开后的列表cards一致"""
+        self.assertEqual(len(hand), len(cards))
+        self.assertEqual(Counter(hand), Counter(cards))
+        self.assertEqual(hand.totals, {category: sum(card.spec.category == category for card in cards) for category in CARD_CATEGORIES})
+        for card in set(cards):
+            self.assertEqual(hand.count(card), cards.count(card))
+        self.assertEqual(set(hand.counts), set(cards))
+
+    def test_add_and_remove(self) -> None:
+        hand = Hand([self.apple, self.sword])
+        hand.add(self.sword, self.shield)
+        hand.append(self.bed)
+        hand += [self.apple]
+        cards = [self.apple, self.sword, self.sword, self.shield, self.bed, self.apple]
+        self.assert_totals(hand, cards)
+        self.assertEqual(hand.total(CARD_HEALING, CARD_ATTACK), 4)
+        self.assertEqual(hand.total(CARD_DEFENCE, CARD_BED), 2)
+
+        for card in (self.sword, self.apple, self.apple, self.bed):
+            hand.remove(card)
+            cards.remove(card)
+            self.assert_totals(hand, cards)
+        self.assertNotIn(self.apple, hand)
+        self.assertEqual(hand.kinds(), [self.sword, self.shield])
+        self.assertEqual(hand.of_category(CARD_HEALING), [])
+
+    def test_remove_missing_card(self) -> None:
+        hand = Hand([self.sword])
+        with self.assertRaises(ValueError):
+            hand.remove(self.apple)
+        hand.remove(self.sword)
+        with self.assertRaises(ValueError):
+            hand.remove(self.sword)
+        self.assert_totals(hand, [])
+
+    def test_clear_and_copy(self) -> None:
+        hand = Hand([self.apple, self.sword, self.sword])
+        copy = hand.copy()
+        hand.clear()
+        self.assert_totals(hand, [])
+        self.assert_totals(copy, [self.apple, self.sword, self.sword])
+        copy.remove(self.sword)
+        self.assert_totals(copy, [self.apple, self.sword])
+
+    def test_random_operations(self) -> None:
+        rng = random.Random(0)
+        pool = [self.apple, self.sword, self.shield, self.bed]
+        hand = Hand()
+        cards: list[Card] = []
+        for _ in range(300):
+            if cards and rng.random() < 0.5:
+                card = hand.choice(rng)
+                hand.remove(card)
+                cards.remove(card)
+            else:
+                card = rng.choice(pool)
+                hand.add(card)
+                cards.append(card)
+            self.assert_totals(hand, cards)
+            self.assertEqual(list(hand), [hand[i] for i in range(len(hand))])
+            for category in CARD_CATEGORIES:
+                if hand.total(category):
+                    self.assertEqual(hand.choice(rng, category).spec.category, category)
+
+
+class PlayerNameTest(unittest.TestCase):
+    def test_chosen_names_are_not_reused(self) -> None:
+        names = [name.strip() for name in _get_names() if name.strip()]
+        with log_level(logging.WARNING):
+            game = Game(seed=0)
+            game.add_player(Player(names[0], 1), Player("", 1))
+            game.add_player(*(Player("", 1) for _ in range(len(names))))
+        chosen = [player.name for player in game.players_in_order]
+        self.assertEqual(chosen[0], names[0])
+        self.assertEqual(len(set(chosen)), len(chosen))
+
+
+if __name__ == "__main__":
+    unittest.main()
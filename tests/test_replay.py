@@ -0,0 +1,80 @@
+import os
+import sys
+import logging
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import CARD_NAMES, MCTS_ROLLOUTS, MCTS_TIME_LIMIT, Card, create_simulation
+from replay import MAX_CARD_COUNT, MAX_PLAYERS, OP_DRAW, OP_FIRE, Replay, record_game
+from logger import log_level
+
+# 固定模拟次数并取消时间上限, 使等级4的对局与机器速度无关
+MCTS_SETTINGS = {MCTS_ROLLOUTS: 20, MCTS_TIME_LIMIT: 10 ** 9}
+
+
+def fired_cards(replay: Replay) -> list[str]:
+    """记录中延迟攻击(FIRE)使用的卡牌名称"""
+    data = replay.data
+    pos = replay._records_start
+    names = []
+    while pos < len(data):
+        op = data[pos]
+        if op == OP_FIRE:
+            names.append(CARD_NAMES[data[pos + 2]])
+        pos += 3 + data[pos + 2] if op == OP_DRAW else (2, 3, 3, 3, 4, 4)[op]
+    return names
+
+
+class ReplayRoundTripTest(unittest.TestCase):
+    GAMES = 6
+
+    def round_trip(self, AI_levels: list[int], seed: int, max_turns: int = 10000, **setting_int: int) -> Replay:
+        """记录一局对局并回放, 检查胜者、回合数和每位玩家的状态一致"""
+        with log_level(logging.WARNING):
+            game = create_simulation(AI_levels, seed, card_pool_doublings=1, **setting_int)
+            recorder = record_game(game)
+            result = game.simulate(max_turns)
+        record = Replay(recorder.getvalue())
+        replayed = record.run()
+        self.assertEqual(replayed.winner.name if replayed.winner is not None else None, result["winner"])
+        self.assertEqual(replayed.turn_count, result["turns"])
+        self.assertEqual(
+            [(p.name, p.health.health, p.health.max_health, p.bedded) for p in replayed.players_in_order],
+            [(p["name"], p["health"], p["max_health"], p["bedded"]) for p in result["players"]],
+        )
+        self.assertEqual(record.turns, result["turns"])
+        return record
+
+    def test_level_4_games(self) -> None:
+        fired = []
+        for seed in range(self.GAMES):
+            fired += fired_cards(self.round_trip([4, 3, 2, 1], seed, **MCTS_SETTINGS))
+        self.assertIn("TNT Minecart", fired)
+
+    def test_large_games(self) -> None:
+        for seed in range(self.GAMES):
+            self.round_trip([1, 2, 3, 3] * 4, seed)
+
+    def test_turn_limit(self) -> None:
+        record = self.round_trip([3, 3, 3, 3], 0, max_turns=7)
+        self.assertEqual(record.turns, 7)
+
+
+class ReplayLimitsTest(unittest.TestCase):
+    def test_too_many_players(self) -> None:
+        with log_level(logging.WARNING):
+            game = create_simulation([1] * (MAX_PLAYERS + 1), 0)
+        with self.assertRaisesRegex(ValueError, str(MAX_PLAYERS)):
+            record_game(game)
+
+    def test_too_many_cards(self) -> None:
+        with log_level(logging.WARNING):
+            game = create_simulation([1, 1], 0)
+        game.card_pool.cards = {Card("Wooden Sword", game): MAX_CARD_COUNT + 1}
+        with self.assertRaisesRegex(ValueError, str(MAX_CARD_COUNT)):
+            record_game(game)
+
+
+if __name__ == "__main__":
+    unittest.main()
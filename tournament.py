@@ -0,0 +1,183 @@
+"""多进程AI锦标赛: 将大量无界面对局分配到进程池中并行进行"""
+from __future__ import annotations
+import os
+import time
+import logging
+import argparse
+from multiprocessing import Pool
+from typing import Callable, Iterator, TypeVar
+
+from main import derive_seed, simulate
+from logger import set_log_level
+
+__all__ = [
+    "COMPETITION_LEVELS",
+    "make_jobs",
+    "run_games",
+    "tournament",
+]
+
+# 与AI_competition相同的16人对局, 每组4名玩家
+COMPETITION_LEVELS = [1, 2, 3, 3] * 4
+
+T = TypeVar("T")
+
+
+def make_jobs(games: int, AI_levels: list[int] = COMPETITION_LEVELS, seed: int = 0, max_turns: int = 10000, card_pool_doublings: int = 2, setting_bool: tuple[str, ...] = (), setting_int: dict[str, int] | None = None) -> list[dict]:
+    """生成每局游戏的任务描述
+
+    Args:
+        games: 对局数量
+        AI_levels: 每位AI玩家的等级
+        seed: 基础随机数种子, 第i局使用derive_seed(seed, i)派生的独立种子
+        max_turns: 每局最大玩家回合数
+        card_pool_doublings: 卡牌池合并次数
+        setting_bool: 游戏设置(bool)
+        setting_int: 游戏设置(int)
+
+    Returns:
+        任务列表, 每个任务都带有自己的种子和设置
+    """
+    return [
+        {
+            "index": i,
+            "seed": derive_seed(seed, i),
+            "AI_levels": list(AI_levels),
+            "max_turns": max_turns,
+            "card_pool_doublings": card_pool_doublings,
+            "setting_bool": tuple(setting_bool),
+            "setting_int": dict(setting_int or {}),
+        }
+        for i in range(games)
+    ]
+
+
+def _play_job(job: dict) -> dict:
+    """在工作进程中进行一局游戏
+
+    Args:
+        job: make_jobs生成的任务
+
+    Returns:
+        dict: simulate的结果, 附带任务编号和种子
+    """
+    result = simulate(
+        job["AI_levels"],
+        job["seed"],
+        job["max_turns"],
+        *job["setting_bool"],
+        card_pool_doublings=job["card_pool_doublings"],
+        **job["setting_int"],
+    )
+    result["index"] = job["index"]
+    result["seed"] = job["seed"]
+    return result
+
+
+def _init_worker(logging_level: int) -> None:
+    """工作进程的初始化: 设置日志级别
+
+    所有工作进程共用同一个日志文件, RotatingFileHandler在多进程间不安全(日志交错、轮转冲突),
+    因此默认只记录警告及以上的日志
+    """
+    set_log_level(logging_level)
+
+
+def run_games(jobs: list[dict], processes: int | None = None, chunksize: int | None = None, play: Callable[[dict], T] = _play_job, logging_level: int = logging.WARNING) -> Iterator[T]:
+    """在进程池中进行所有任务, 每局结束后立即返回其结果
+
+    Args:
+        jobs: make_jobs生成的任务列表
+        processes: 进程数, 默认使用全部CPU核心
+        chunksize: 每次分配给工作进程的任务数, 默认按任务数和进程数估算
+        play: 在工作进程中进行一局游戏的函数, 参数为任务, 必须是模块级函数(可被pickle)
+        logging_level: 工作进程的日志级别(单进程时不修改当前进程的日志级别)
+
+    Yields:
+        按完成顺序返回的单局结果(默认为simulate的结果)
+    """
+    processes = processes or os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, len(jobs) // (processes * 16))
+
+    if processes == 1:
+        for job in jobs:
+            yield play(job)
+        return
+
+    with Pool(processes, _init_worker, (logging_level,)) as pool:
+        yield from pool.imap_unordered(play, jobs, chunksize)
+
+
+def tournament(games: int, AI_levels: list[int] = COMPETITION_LEVELS, processes: int | None = None, seed: int = 0, max_turns: int = 10000, card_pool_doublings: int = 2, on_result: Callable[[dict], None] | None = None, setting_bool: tuple[str, ...] = (), setting_int: dict[str, int] | None = None, logging_level: int = logging.WARNING) -> dict:
+    """进行多进程锦标赛并汇总结果
+
+    Args:
+        games: 对局数量
+        AI_levels: 每位AI玩家的等级
+        processes: 进程数, 默认使用全部CPU核心
+        seed: 基础随机数种子
+        max_turns: 每局最大玩家回合数
+        card_pool_doublings: 卡牌池合并次数(AI_competition为2)
+        on_result: 每局结束时调用的回调函数, 参数为单局结果
+        setting_bool: 游戏设置(bool)
+        setting_int: 游戏设置(int)
+        logging_level: 工作进程的日志级别
+
+    Returns:
+        dict: 汇总报告, 包含对局数(games)、进程数(processes)、耗时(elapsed)、
+              每秒对局数(games_per_sec)、平均回合数(mean_turns)、平局数(draws)、
+              各AI等级胜场(wins)及胜率(win_rate)
+    """
+    jobs = make_jobs(games, AI_levels, seed, max_turns, card_pool_doublings, setting_bool, setting_int)
+    processes = processes or os.cpu_count() or 1
+
+    levels = sorted(set(AI_levels))
+    wins = {level: 0 for level in levels}
+    draws = 0
+    total_turns = 0
+
+    start_time = time.perf_counter()
+    for result in run_games(jobs, processes, logging_level=logging_level):
+        total_turns += result["turns"]
+        if result["winner"] is None:
+            draws += 1
+        else:
+            winner = next(p for p in result["players"] if p["name"] == result["winner"])
+            wins[winner["AI_level"]] += 1
+        if on_result is not None:
+            on_result(result)
+    elapsed = time.perf_counter() - start_time
+
+    return {
+        "games": games,
+        "processes": processes,
+        "elapsed": elapsed,
+        "games_per_sec": games / elapsed if elapsed else 0.0,
+        "mean_turns": total_turns / games if games else 0.0,
+        "draws": draws,
+        "wins": wins,
+        "win_rate": {level: wins[level] / games if games else 0.0 for level in levels},
+        # 按该等级玩家所占席位数归一化的胜率, 等于1时表示与平均水平持平
+        "win_rate_per_seat": {
+            level: wins[level] / games * len(AI_levels) / AI_levels.count(level) if games else 0.0
+            for level in levels
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MC PvP card game AI tournament")
+    parser.add_argument("games", type=int, nargs="?", default=1000)
+    parser.add_argument("-p", "--processes", type=int, default=None)
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument("-l", "--levels", type=int, nargs="+", default=COMPETITION_LEVELS)
+    args = parser.parse_args()
+
+    report = tournament(args.games, args.levels, args.processes, args.seed)
+    print(f"{report['games']} games on {report['processes']} processes in {report['elapsed']:.2f}s "
+          f"({report['games_per_sec']:.1f} games/sec), mean length {report['mean_turns']:.1f} turns, "
+          f"{report['draws']} draws")
+    for level in sorted(report["wins"]):
+        print(f"AI level {level}: {report['wins'][level]} wins, win rate {report['win_rate'][level]:.3f}, "
+              f"per seat {report['win_rate_per_seat'][level]:.3f}")